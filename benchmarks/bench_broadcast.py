@@ -0,0 +1,104 @@
+"""
+Бенчмарк рассылки "Вопрос дня" (``broadcast.run_broadcast``).
+
+Поднимает фейковый Bot API (``fake_telegram.py``), подписывает в хранилище
+SQLite ``--subscribers`` чатов, доля ``--blocked`` которых заблокировала
+бота (ответ 403), и рассылает вопрос дня через бота с планировщиком
+исходящих запросов. Рассылка прерывается через ``--interrupt`` секунд, как
+при перезапуске бота, и продолжается с сохраненного прогресса. Выводятся
+скорость отправки, доля недоставленных сообщений, число отписанных чатов
+и чатов, получивших вопрос дважды.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_broadcast.py [--subscribers N] [--rate N] [--interrupt S]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.environ.setdefault("BOT_TOKEN", "1:fake")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from fake_telegram import FakeTelegram  # noqa: E402
+from telegram.ext import ExtBot  # noqa: E402
+from telegram.request import HTTPXRequest  # noqa: E402
+
+from mylife3000.broadcast import run_broadcast  # noqa: E402
+from mylife3000.locales import get_catalogue  # noqa: E402
+from mylife3000.outbound import OutboundScheduler  # noqa: E402
+from mylife3000.storage import FIRST_POSITION, SQLiteStorage  # noqa: E402
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    telegram = FakeTelegram(0, 0, flood_limit=args.flood_limit)
+    rng = random.Random(1)
+    chat_ids = rng.sample(range(1, 10 * args.subscribers), args.subscribers)
+    telegram.blocked = set(rng.sample(chat_ids, int(args.subscribers * args.blocked)))
+    server = await asyncio.start_server(telegram.handle_api, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    # Пул соединений как у бота, созданного Application.builder()
+    bot = ExtBot("1:fake", base_url=f"http://127.0.0.1:{port}/bot", request=HTTPXRequest(connection_pool_size=256),
+                 rate_limiter=OutboundScheduler(args.rate, 1, 3, 20, max_retries=3))
+    catalogue = get_catalogue("ru")
+    day = date(2026, 1, 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        storage = SQLiteStorage(os.path.join(directory, "bench.sqlite3"))
+        await storage.init_pool()
+        for chat_id in chat_ids:
+            await storage.subscribe(chat_id)
+
+        async with server, bot:
+            started = time.perf_counter()
+            run = asyncio.create_task(run_broadcast(
+                bot, storage, catalogue, day, args.workers, args.page_size, args.checkpoint_interval
+            ))
+            await asyncio.sleep(args.interrupt)
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            saved = await storage.load_broadcast(day)
+            print(f"interrupted after {args.interrupt:.0f} s: {telegram.calls['sendMessage']} sent, "
+                  f"progress saved at {saved.sent + saved.failed}")
+
+            progress = await run_broadcast(
+                bot, storage, catalogue, day, args.workers, args.page_size, args.checkpoint_interval
+            )
+            elapsed = time.perf_counter() - started
+        remaining = len(await storage.subscribers_after(FIRST_POSITION, args.subscribers))
+        await storage.close()
+
+    received = [replies.qsize() for replies in telegram._replies.values()]
+    attempts = telegram.calls["sendMessage"]
+    print(f"{args.subscribers} subscribers, {len(telegram.blocked)} blocked the bot, "
+          f"{args.workers} workers, rate {args.rate:.0f}/s")
+    print(f"  {attempts} sendMessage in {elapsed:.1f} s: {attempts / elapsed:.0f} messages/s, "
+          f"{telegram.flood_responses} responses 429")
+    print(f"  {progress.sent} delivered, {progress.failed} failed "
+          f"({progress.failed / (progress.sent + progress.failed):.1%}), "
+          f"{args.subscribers - remaining} unsubscribed")
+    print(f"  {len(received)} chats received the question, {sum(n > 1 for n in received)} twice")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, default=20_000, help="Подписанных чатов")
+    parser.add_argument("--blocked", type=float, default=0.05, help="Доля чатов, заблокировавших бота")
+    parser.add_argument("--rate", type=float, default=1000, help="OUTBOUND_GLOBAL_RATE планировщика")
+    parser.add_argument("--flood-limit", type=int, default=0, help="Сообщений в секунду до ответа 429")
+    parser.add_argument("--workers", type=int, default=16, help="BROADCAST_WORKERS")
+    parser.add_argument("--page-size", type=int, default=1000, help="BROADCAST_PAGE_SIZE")
+    parser.add_argument("--checkpoint-interval", type=float, default=5, help="BROADCAST_CHECKPOINT_INTERVAL")
+    parser.add_argument("--interrupt", type=float, default=8, help="Прервать рассылку через, секунды")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
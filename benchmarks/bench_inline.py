@@ -0,0 +1,141 @@
+"""
+Бенчмарк встроенного режима ``InlineQuestions``.
+
+Пользователи набирают запросы по буквам: слова берутся из вопросов банка
+с распределением Ципфа (популярные темы запрашивают чаще), и каждое
+изменение текста - отдельный запрос, как присылает Telegram.
+
+1. Пропускная способность подбора страницы результатов: поиск и сборка
+   ``InlineQueryResultArticle`` на каждый запрос против ``InlineQuestions.page``
+   с кэшем результатов.
+2. Набор текста ``--users`` пользователями с интервалом ``--keystroke``
+   секунд между буквами через ``InlineQuestions.answer``: сколько запросов
+   получают ответ при интервале INLINE_QUERY_DEBOUNCE.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_inline.py [--queries N] [--users N] [--debounce S]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+os.environ.setdefault("BOT_TOKEN", "1:fake")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent  # noqa: E402
+
+from mylife3000.locales import get_catalogue  # noqa: E402
+from mylife3000.search import _WORD_RE  # noqa: E402
+from mylife3000.sharing import PAGE_SIZE, InlineQuestions  # noqa: E402
+
+
+def typed_queries(questions, count: int, rng: random.Random) -> list:
+    """Запросы, которые Telegram присылает при наборе слов по буквам."""
+
+    words = sorted({word for question in questions for word in _WORD_RE.findall(question.lower()) if len(word) > 3})
+    rng.shuffle(words)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    queries = []
+    while len(queries) < count:
+        word = rng.choices(words, weights)[0]
+        queries.extend(word[:length] for length in range(1, len(word) + 1))
+    return queries[:count]
+
+
+def naive_page(catalogue, text: str) -> list:
+    """Страница без кэша: поиск и новые результаты на каждый запрос."""
+
+    return [
+        InlineQueryResultArticle(id=str(i), title=question, input_message_content=InputTextMessageContent(question))
+        for i, question in enumerate(catalogue.questionary.search(text, PAGE_SIZE))
+    ]
+
+
+def lookup(args: argparse.Namespace, catalogue, queries: list) -> None:
+    """Сравнивает подбор страницы без кэша и с кэшем."""
+
+    inline = InlineQuestions(args.cache_size, 300, 0, 100)
+    asyncio.run(catalogue.questionary.prepare_search_index())  # индекс строится до замера
+
+    started = time.perf_counter()
+    for text in queries:
+        naive_page(catalogue, text)
+    naive = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for text in queries:
+        inline.page(catalogue, text, 0)
+    cached = time.perf_counter() - started
+
+    hits = inline._hits.value
+    print(f"{len(queries)} typed queries, {len(set(queries))} distinct, cache hits {hits / len(queries):.0%}")
+    print(f"  search + build per query: {len(queries) / naive:,.0f} queries/s")
+    print(f"  InlineQuestions.page:     {len(queries) / cached:,.0f} queries/s")
+
+
+async def type_query(inline: InlineQuestions, user_id: int, word: str, keystroke: float, answered: list) -> None:
+    """Пользователь набирает слово по буквам; каждая буква - встроенный запрос."""
+
+    async def answer(results, **kwargs):
+        answered.append(user_id)
+
+    context = SimpleNamespace(user_data={})
+    tasks = []
+    for length in range(1, len(word) + 1):
+        query = SimpleNamespace(
+            id=f"{user_id}:{length}", query=word[:length], offset="", answer=answer,
+            from_user=SimpleNamespace(id=user_id),
+        )
+        update = SimpleNamespace(inline_query=query, effective_user=SimpleNamespace(language_code="ru"))
+        # Обработчик не блокирующий: каждый запрос - отдельная задача
+        tasks.append(asyncio.create_task(inline.answer(update, context)))
+        await asyncio.sleep(keystroke)
+    await asyncio.gather(*tasks)
+
+
+async def typing(args: argparse.Namespace, catalogue, rng: random.Random) -> None:
+    """Одновременный набор запросов пользователями с интервалом ответов и без него."""
+
+    words = [query for query in typed_queries(catalogue.questionary.questions, args.users * 20, rng)
+             if len(query) >= 6][:args.users]
+    for debounce in (0, args.debounce):
+        inline = InlineQuestions(args.cache_size, 300, debounce, 100)
+        # Метрики общие для процесса: каждый замер считает с нуля
+        inline._queries.value = inline._superseded.value = 0
+        answered: list = []
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            type_query(inline, user_id, word, args.keystroke, answered) for user_id, word in enumerate(words)
+        ))
+        elapsed = time.perf_counter() - started
+        received = inline._queries.value
+        print(f"  debounce {debounce:.2f} s: {received} queries in {elapsed:.1f} s, "
+              f"{len(answered)} answered ({len(answered) / received:.0%}), "
+              f"{inline._superseded.value} superseded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=50_000, help="Запросов в замере подбора страницы")
+    parser.add_argument("--cache-size", type=int, default=10_000, help="INLINE_QUERY_CACHE_SIZE")
+    parser.add_argument("--users", type=int, default=1000, help="Пользователей, набирающих запрос")
+    parser.add_argument("--keystroke", type=float, default=0.12, help="Интервал между буквами, секунды")
+    parser.add_argument("--debounce", type=float, default=0.3, help="INLINE_QUERY_DEBOUNCE")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    catalogue = get_catalogue("ru")
+    lookup(args, catalogue, typed_queries(catalogue.questionary.questions, args.queries, rng))
+    print(f"{args.users} users typing, {args.keystroke:.2f} s per keystroke:")
+    asyncio.run(typing(args, catalogue, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Бенчмарк планировщика исходящих запросов ``OutboundScheduler``.
+
+Поднимает фейковый Bot API (``fake_telegram.py``) с ограничениями частоты,
+как у Telegram, и отправляет через бота с планировщиком массовую рассылку
+из ``--bulk`` сообщений разным чатам. Одновременно раз в ``--interval``
+секунд отправляется ответ пользователю. Выводятся задержки в очереди по
+классам приоритета, число ответов 429 и неудачных запросов.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_outbound.py [--bulk N] [--interactive N] [--flood-limit N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from fake_telegram import FakeTelegram  # noqa: E402
+from telegram.error import RetryAfter  # noqa: E402
+from telegram.ext import ExtBot  # noqa: E402
+
+from mylife3000.outbound import BULK, INTERACTIVE, OutboundScheduler  # noqa: E402
+
+
+async def send(bot: ExtBot, chat_id: int, priority: int, latencies: list) -> bool:
+    """Отправляет сообщение и записывает время до ответа; False - запрос не выполнен."""
+
+    started = time.perf_counter()
+    try:
+        await bot.send_message(chat_id, "Вопрос дня", rate_limit_args=priority)
+    except RetryAfter:
+        return False
+    latencies.append(time.perf_counter() - started)
+    return True
+
+
+async def interactive(bot: ExtBot, count: int, interval: float, latencies: list) -> list:
+    """Отправляет ``count`` ответов пользователям раз в ``interval`` секунд."""
+
+    tasks = []
+    for i in range(count):
+        tasks.append(asyncio.create_task(send(bot, 1_000_000 + i, INTERACTIVE, latencies)))
+        await asyncio.sleep(interval)
+    return await asyncio.gather(*tasks)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    telegram = FakeTelegram(0, 0, flood_limit=args.flood_limit, chat_flood_limit=3, retry_after=1)
+    server = await asyncio.start_server(telegram.handle_api, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    scheduler = OutboundScheduler(args.rate, 1, 3, 20, max_retries=3)
+    bot = ExtBot("1:fake", base_url=f"http://127.0.0.1:{port}/bot", rate_limiter=scheduler)
+
+    async with server, bot:
+        bulk_latencies: list = []
+        interactive_latencies: list = []
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(send(bot, chat_id, BULK, bulk_latencies) for chat_id in range(1, args.bulk + 1)),
+            interactive(bot, args.interactive, args.interval, interactive_latencies),
+        )
+        elapsed = time.perf_counter() - started
+
+    failed = results[:-1].count(False) + results[-1].count(False)
+    print(f"{args.bulk} bulk + {args.interactive} interactive messages in {elapsed:.1f} s, "
+          f"{telegram.flood_responses} responses 429, {failed} failed")
+    for name, latencies in (("interactive", interactive_latencies), ("bulk", bulk_latencies)):
+        latencies.sort()
+        print(f"{name:>11}: median {statistics.median(latencies) * 1e3:.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:.0f} ms, max {latencies[-1] * 1e3:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bulk", type=int, default=600, help="Сообщений массовой рассылки")
+    parser.add_argument("--interactive", type=int, default=40, help="Ответов пользователям")
+    parser.add_argument("--interval", type=float, default=0.25, help="Интервал между ответами, секунды")
+    parser.add_argument("--rate", type=float, default=28, help="OUTBOUND_GLOBAL_RATE планировщика")
+    parser.add_argument("--flood-limit", type=int, default=30, help="Сообщений в секунду до ответа 429")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
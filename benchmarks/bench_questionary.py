@@ -0,0 +1,80 @@
+"""
+Микробенчмарк выбора вопросов в Questionary.
+
+Сравнивает стоимость одного вызова ``get_random_question``, ``get_themes``
+и ``get_all_sections`` в прежней реализации (``random.choice`` по агрегату
+"Случайный вопрос" или по списку, собираемому на каждый вызов) и в
+скомпилированном плоском индексе.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_questionary.py [--number N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mylife3000.questionary import Questionary  # noqa: E402
+
+
+def legacy_random_question(questions_dict, theme=None):
+    """Прежний выбор вопроса: ``random.choice`` по спискам словаря."""
+    if theme and theme in questions_dict:
+        return random.choice(questions_dict[theme])
+    # Ветка без агрегата "Случайный вопрос": сборка списка на каждый вызов
+    all_questions = []
+    for theme_questions in questions_dict.values():
+        if isinstance(theme_questions, list):
+            all_questions.extend(theme_questions)
+    return random.choice(all_questions) if all_questions else None
+
+
+def legacy_themes(questions_dict):
+    """Прежний список тем: новый список на каждый вызов."""
+    return [key for key in questions_dict.keys() if key != "Случайный вопрос"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200_000, help="Число вызовов на замер")
+    args = parser.parse_args()
+
+    questionary = Questionary()
+    section = questionary.get_all_sections()[0]
+    theme = questionary.get_themes(section)[0]
+    questions_dict = {key: list(value) for key, value in questionary.get_section_questions(section).items()}
+
+    aggregate = [q for theme_questions in questions_dict.values() for q in theme_questions]
+
+    cases = [
+        ("random question (aggregate)",
+         lambda: random.choice(aggregate),
+         lambda: questionary.get_random_question(section)),
+        ("random question (fallback)",
+         lambda: legacy_random_question(questions_dict),
+         lambda: questionary.get_random_question(section)),
+        ("random question (theme)",
+         lambda: legacy_random_question(questions_dict, theme),
+         lambda: questionary.get_random_question(section, theme)),
+        ("themes",
+         lambda: legacy_themes(questions_dict),
+         lambda: questionary.get_themes(section)),
+        ("sections",
+         lambda: list(questionary.sections.keys()),
+         questionary.get_all_sections),
+    ]
+
+    print(f"{'case':<28}{'before, ns':>12}{'after, ns':>12}{'speedup':>10}")
+    for name, before, after in cases:
+        before_ns = min(timeit.repeat(before, number=args.number, repeat=5)) / args.number * 1e9
+        after_ns = min(timeit.repeat(after, number=args.number, repeat=5)) / args.number * 1e9
+        print(f"{name:<28}{before_ns:>12.0f}{after_ns:>12.0f}{before_ns / after_ns:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Микробенчмарк подготовки ответов обработчиков.
+
+Сравнивает стоимость и число выделений памяти на один ответ при сборке
+``ReplyKeyboardMarkup`` и текста меню раздела на каждый вызов (прежняя
+реализация) и при выборке готовых объектов из кэша каталога
+``Catalogue.render``.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_render.py [--number N]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+# Модуль config требует токен при импорте; бенчмарк к Telegram не обращается
+os.environ.setdefault("BOT_TOKEN", "benchmark")
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from telegram import ReplyKeyboardMarkup, ReplyKeyboardRemove  # noqa: E402
+
+from mylife3000.locales import get_catalogue  # noqa: E402
+
+
+def allocations(func, number):
+    """Число выделенных блоков памяти на вызов по данным tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [func() for _ in range(number)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del results
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return blocks / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=50_000, help="Число вызовов на замер")
+    args = parser.parse_args()
+
+    remove_keyboard = ReplyKeyboardRemove()
+    catalogue = get_catalogue("ru")
+    questionary = catalogue.questionary
+    section = questionary.get_all_sections()[0]
+
+    def legacy_theme_menu():
+        keyboard = [[theme] for theme in questionary.get_themes(section)]
+        keyboard.append([catalogue.messages['back_button'], catalogue.messages['main_menu_button']])
+        return ReplyKeyboardMarkup(keyboard, input_field_placeholder=catalogue.text('theme_placeholder'))
+
+    cases = [
+        ("main menu",
+         lambda: ReplyKeyboardMarkup(catalogue.main_menu_keyboard(),
+                                     input_field_placeholder=catalogue.text('main_menu_placeholder')),
+         lambda: catalogue.render().main_menu),
+        ("section menu",
+         lambda: (catalogue.text('section_menu', description=questionary.get_section_description(section)),
+                  ReplyKeyboardMarkup(catalogue.section_menu_keyboard,
+                                      input_field_placeholder=catalogue.text('section_menu_placeholder'))),
+         lambda: (catalogue.render().section_texts[section], catalogue.section_menu_markup)),
+        ("theme menu",
+         legacy_theme_menu,
+         lambda: catalogue.render().theme_menus[section]),
+        ("result menu",
+         lambda: ReplyKeyboardMarkup(catalogue.result_menu_keyboard),
+         lambda: catalogue.result_menu_markup),
+        ("remove keyboard",
+         ReplyKeyboardRemove,
+         lambda: remove_keyboard),
+    ]
+
+    print(f"{'case':<18}{'before, ns':>12}{'after, ns':>12}{'speedup':>10}{'blocks before':>15}{'after':>8}")
+    for name, before, after in cases:
+        before_ns = min(timeit.repeat(before, number=args.number, repeat=5)) / args.number * 1e9
+        after_ns = min(timeit.repeat(after, number=args.number, repeat=5)) / args.number * 1e9
+        before_blocks = allocations(before, args.number // 10)
+        after_blocks = allocations(after, args.number // 10)
+        print(f"{name:<18}{before_ns:>12.0f}{after_ns:>12.0f}{before_ns / after_ns:>9.1f}x"
+              f"{before_blocks:>15.1f}{after_blocks:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Бенчмарк сохранения сессий ``SessionPersistence``.
+
+Создает файл с ``--sessions`` сессиями, типичными для бота (состояние
+диалога, раздел, тема, последний вопрос и курсоры выбора вопросов), и
+измеряет:
+
+- запись прохода приложения из ``--batch`` измененных сессий одной
+  транзакцией и, для сравнения, отдельной транзакцией на каждую сессию;
+- восстановление сессий при запуске (``get_user_data`` и
+  ``get_conversations``) и загрузку ``user_data`` пользователя перед его
+  первым обновлением (``refresh_user_data``);
+- размер файла на одну сессию.
+
+Запуск из корня репозитория::
+
+    python benchmarks/bench_sessions.py [--sessions N] [--batch N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mylife3000.persistence import SessionPersistence  # noqa: E402
+
+
+def session(user_id: int) -> dict:
+    """user_data пользователя в середине диалога."""
+
+    return {
+        "dialog_id": user_id * 7,
+        "current_section": "Отношения",
+        "last_theme": "Дружба",
+        "last_section": "Отношения",
+        "last_question": ["3f9a2c1b7d4e5f60", random.randrange(30000)],
+        "question_cursors": {"version": "3f9a2c1b7d4e5f60", "120:180": [random.getrandbits(32), 4]},
+    }
+
+
+async def fill(persistence: SessionPersistence, sessions: int, batch: int) -> None:
+    """Создает сессии проходами по ``batch`` пользователей."""
+
+    for start in range(1, sessions + 1, batch):
+        for user_id in range(start, min(start + batch, sessions + 1)):
+            await persistence.update_user_data(user_id, session(user_id))
+            await persistence.update_conversation("dialog", (user_id, user_id), 3)
+        await persistence._write_task
+
+
+async def bench_write(persistence: SessionPersistence, sessions: int, batch: int) -> float:
+    """Время записи одного прохода из ``batch`` измененных сессий, секунды."""
+
+    started = time.perf_counter()
+    for user_id in random.sample(range(1, sessions + 1), batch):
+        await persistence.update_conversation("dialog", (user_id, user_id), 1)
+        await persistence.update_user_data(user_id, dict(session(user_id), current_section="Работа"))
+    await persistence._write_task
+    return time.perf_counter() - started
+
+
+async def bench_write_each(persistence: SessionPersistence, sessions: int, batch: int) -> float:
+    """Время записи тех же изменений отдельной транзакцией на сессию, секунды."""
+
+    started = time.perf_counter()
+    for user_id in random.sample(range(1, sessions + 1), batch):
+        await persistence.update_conversation("dialog", (user_id, user_id), 2)
+        await persistence.update_user_data(user_id, dict(session(user_id), current_section="Семья"))
+        await persistence._write_task
+    return time.perf_counter() - started
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.sqlite3")
+        persistence = SessionPersistence(path, update_interval=10)
+        await persistence.get_user_data()
+        started = time.perf_counter()
+        await fill(persistence, args.sessions, 10000)
+        print(f"created {args.sessions} sessions in {time.perf_counter() - started:.2f} s")
+
+        coalesced = await bench_write(persistence, args.sessions, args.batch)
+        each = await bench_write_each(persistence, args.sessions, args.batch)
+        print(f"write {args.batch} sessions: one transaction {coalesced * 1e3:.1f} ms, "
+              f"transaction per session {each * 1e3:.1f} ms")
+        await persistence.flush()
+        size = os.path.getsize(path)
+        # Восстановление измеряется без объектов первого экземпляра, как при новом запуске
+        del persistence
+
+        restored = SessionPersistence(path, update_interval=10)
+        started = time.perf_counter()
+        await restored.get_user_data()
+        conversations = await restored.get_conversations("dialog")
+        elapsed = time.perf_counter() - started
+        print(f"restore {len(conversations)} conversations in {elapsed:.2f} s")
+
+        user_ids = random.sample(range(1, args.sessions + 1), args.batch)
+        started = time.perf_counter()
+        for user_id in user_ids:
+            user_data: dict = {}
+            await restored.refresh_user_data(user_id, user_data)
+            assert user_data["current_section"], user_id
+        elapsed = time.perf_counter() - started
+        await restored.flush()
+        print(f"first-update load of user_data: {elapsed / args.batch * 1e6:.0f} us per user")
+        print(f"file {size / 2 ** 20:.1f} MiB, {size / args.sessions:.0f} bytes per session")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=300000, help="Число сохраненных сессий")
+    parser.add_argument("--batch", type=int, default=1000, help="Число сессий, измененных за проход")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Фейковый Telegram Bot API для локальной проверки режима webhook.
+
+Сервер отвечает на вызовы Bot API (``getMe``, ``setWebhook``,
+``sendMessage`` и другие) и, получив ``setWebhook``, отправляет на адрес
+бота обновления от имени нескольких пользователей: каждый начинает с
+/start и затем нажимает случайную кнопку из последней клавиатуры бота
+(кнопку инлайн-клавиатуры - обновлением ``callback_query``). Перед этим проверяется, что запрос с неверным секретом отклоняется.
+Выводятся задержки от отправки обновления до ответа бота. Параметр
+``--api-delay`` добавляет задержку к каждому вызову Bot API, как у
+настоящего Telegram, что позволяет сравнить последовательную и
+параллельную обработку обновлений (UPDATE_CONCURRENCY).
+
+Параметры ``--flood-limit`` и ``--chat-flood-limit`` включают ограничения
+частоты сообщений, как у Telegram: запрос сверх числа запросов с
+``chat_id`` за последнюю секунду (всего и в один чат) получает ответ 429 с
+``retry_after``. Число таких ответов выводится в конце вместе с числом
+вызовов Bot API каждого метода на пользователя.
+
+Запуск из корня репозитория в двух терминалах::
+
+    python benchmarks/fake_telegram.py --port 8081 --users 50 --steps 5
+
+    BOT_TOKEN=1:fake STORAGE_BACKEND=memory TELEGRAM_API_URL=http://127.0.0.1:8081 \\
+    WEBHOOK_URL=http://127.0.0.1:8443 WEBHOOK_SECRET_TOKEN=local PYTHONPATH=src python -m mylife3000
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import random
+import statistics
+import time
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "MyLife3000", "username": "mylife3000_bot"}
+
+
+class FakeTelegram:
+    """
+    Фейковый Bot API и генератор обновлений webhook.
+
+    Attributes:
+        users (int): Число пользователей
+        steps (int): Число нажатий кнопок после /start
+        api_delay (float): Задержка ответа на вызов Bot API, секунды
+        flood_limit (int): Запросов с ``chat_id`` в секунду всего до ответа 429 (0 - без ограничения)
+        chat_flood_limit (int): Запросов в секунду в один чат до ответа 429 (0 - без ограничения)
+        retry_after (int): Значение ``retry_after`` в ответе 429, секунды
+        flood_responses (int): Число ответов 429
+        blocked (Set[int]): Чаты, заблокировавшие бота: запросы в них получают ответ 403
+        calls (Counter): Число вызовов каждого метода Bot API
+        webhook (Optional[Tuple[str, str]]): Адрес webhook и секрет из setWebhook
+        latencies (List[float]): Задержки ответов бота, секунды
+    """
+
+    def __init__(
+        self, users: int, steps: int, api_delay: float = 0.0,
+        flood_limit: int = 0, chat_flood_limit: int = 0, retry_after: int = 1,
+    ):
+        self.users = users
+        self.steps = steps
+        self.api_delay = api_delay
+        self.flood_limit = flood_limit
+        self.chat_flood_limit = chat_flood_limit
+        self.retry_after = retry_after
+        self.flood_responses = 0
+        self.blocked: Set[int] = set()
+        self.calls: collections.Counter = collections.Counter()
+        self._sent: Deque[float] = collections.deque()
+        self._chat_sent: Dict[int, Deque[float]] = {}
+        self.webhook: Optional[Tuple[str, str]] = None
+        self.latencies: List[float] = []
+        self._replies: Dict[int, asyncio.Queue] = {}
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._webhook_set = asyncio.Event()
+
+    async def handle_api(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Обслуживает соединение клиента Bot API (HTTP/1.1 с keep-alive)."""
+
+        try:
+            while True:
+                request = await read_http(reader)
+                if request is None:
+                    break
+                _, target, headers, body = request
+                method = target.rsplit("/", 1)[-1]
+                if self.api_delay:
+                    await asyncio.sleep(self.api_delay)
+                params = parse_params(headers, body)
+                self.calls[method] += 1
+                if "chat_id" in params and int(params["chat_id"]) in self.blocked:
+                    write_http(writer, "403 Forbidden", json.dumps({
+                        "ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user",
+                    }).encode())
+                elif self.flooded(params):
+                    self.flood_responses += 1
+                    write_http(writer, "429 Too Many Requests", json.dumps({
+                        "ok": False, "error_code": 429,
+                        "description": f"Too Many Requests: retry after {self.retry_after}",
+                        "parameters": {"retry_after": self.retry_after},
+                    }).encode())
+                else:
+                    result = self.call(method, params)
+                    write_http(writer, "200 OK", json.dumps({"ok": True, "result": result}).encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Бот разорвал соединение или фейковый сервер завершает работу
+            pass
+        finally:
+            writer.close()
+
+    def flooded(self, params: Dict[str, object]) -> bool:
+        """Проверяет ограничения частоты для запроса с ``chat_id`` и учитывает его."""
+
+        if "chat_id" not in params or not (self.flood_limit or self.chat_flood_limit):
+            return False
+        now = time.monotonic()
+        chat_sent = self._chat_sent.setdefault(int(params["chat_id"]), collections.deque())
+        for sent in (self._sent, chat_sent):
+            while sent and sent[0] <= now - 1:
+                sent.popleft()
+        if (self.flood_limit and len(self._sent) >= self.flood_limit) or (
+            self.chat_flood_limit and len(chat_sent) >= self.chat_flood_limit
+        ):
+            return True
+        self._sent.append(now)
+        chat_sent.append(now)
+        return False
+
+    def call(self, method: str, params: Dict[str, object]) -> object:
+        """Выполняет вызов Bot API и возвращает его результат."""
+
+        if method == "getMe":
+            return BOT_USER
+        if method == "setWebhook":
+            self.webhook = (str(params["url"]), str(params.get("secret_token", "")))
+            print(f"setWebhook {params['url']} allowed_updates={params.get('allowed_updates')}")
+            self._webhook_set.set()
+            return True
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params["chat_id"])
+            message_id = int(params["message_id"]) if method == "editMessageText" else next(self._message_ids)
+            markup = params.get("reply_markup") or {}
+            # Пользователь видит последнюю клавиатуру: обычную или инлайн сообщения message_id
+            self._replies.setdefault(chat_id, asyncio.Queue()).put_nowait(
+                (message_id, markup.get("inline_keyboard") or markup.get("keyboard"))
+            )
+            return {
+                "message_id": message_id, "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "from": BOT_USER, "text": params.get("text", ""),
+            }
+        return True
+
+    async def post_update(self, text: str, user_id: int, secret: Optional[str] = None) -> int:
+        """Отправляет на webhook сообщение пользователя и возвращает HTTP-статус."""
+
+        url, token = self.webhook
+        message = {
+            "message_id": next(self._message_ids), "date": int(time.time()), "text": text,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "User", "language_code": "ru"},
+        }
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        body = json.dumps({"update_id": next(self._update_ids), "message": message}).encode()
+        return await post_json(url, body, token if secret is None else secret)
+
+    async def post_callback(self, data: str, message_id: int, user_id: int) -> int:
+        """Отправляет на webhook нажатие инлайн-кнопки и возвращает HTTP-статус."""
+
+        url, token = self.webhook
+        user = {"id": user_id, "is_bot": False, "first_name": "User", "language_code": "ru"}
+        callback_query = {
+            "id": str(next(self._update_ids)), "from": user, "chat_instance": str(user_id), "data": data,
+            "message": {
+                "message_id": message_id, "date": int(time.time()), "text": "",
+                "chat": {"id": user_id, "type": "private"}, "from": BOT_USER,
+            },
+        }
+        body = json.dumps({"update_id": next(self._update_ids), "callback_query": callback_query}).encode()
+        return await post_json(url, body, token)
+
+    async def run_user(self, user_id: int) -> None:
+        """Проводит диалог одного пользователя, нажимая случайные кнопки."""
+
+        replies = self._replies.setdefault(user_id, asyncio.Queue())
+        text, callback = "/start", None
+        for _ in range(self.steps + 1):
+            started = time.perf_counter()
+            if callback is None:
+                await self.post_update(text, user_id)
+            else:
+                await self.post_callback(callback[0], callback[1], user_id)
+            message_id, keyboard = await asyncio.wait_for(replies.get(), timeout=10)
+            self.latencies.append(time.perf_counter() - started)
+            button = random.choice([button for row in keyboard or () for button in row] or ["/start"])
+            if isinstance(button, dict) and "callback_data" in button:
+                callback = (button["callback_data"], message_id)
+            else:
+                text, callback = button["text"] if isinstance(button, dict) else button, None
+
+    async def drive(self) -> None:
+        """Ждет setWebhook, проверяет секрет и запускает пользователей."""
+
+        await self._webhook_set.wait()
+        # Дать серверу webhook бота начать прием соединений
+        await asyncio.sleep(0.5)
+        status = await self.post_update("/start", 0, secret="wrong")
+        print(f"wrong secret token: HTTP {status} ({'ok' if status == 403 else 'EXPECTED 403'})")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(self.run_user(user_id) for user_id in range(1, self.users + 1)))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(self.latencies)
+        print(f"{len(latencies)} updates in {elapsed:.2f} s ({len(latencies) / elapsed:.0f}/s)")
+        print(f"latency, ms: median {statistics.median(latencies) * 1e3:.1f}, "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1e3:.1f}, max {latencies[-1] * 1e3:.1f}")
+        if self.flood_limit or self.chat_flood_limit:
+            print(f"429 responses: {self.flood_responses}")
+        print("Bot API calls per user: " + ", ".join(
+            f"{method} {count / self.users:.1f}" for method, count in self.calls.most_common()
+            if method not in ("getMe", "setWebhook", "deleteWebhook")
+        ))
+
+
+async def read_http(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Читает HTTP-запрос или ответ: первую строку, заголовки и тело."""
+
+    line = await reader.readline()
+    if not line:
+        return None
+    first, rest = line.decode().split(" ", 1)
+    headers = {}
+    while True:
+        header = (await reader.readline()).decode().strip()
+        if not header:
+            break
+        name, value = header.split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return first, rest.split(" ", 1)[0], headers, body
+
+
+def write_http(writer: asyncio.StreamWriter, status: str, body: bytes) -> None:
+    """Записывает ответ HTTP/1.1 с телом JSON."""
+
+    writer.write(
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+
+
+def parse_params(headers: Dict[str, str], body: bytes) -> Dict[str, object]:
+    """Разбирает параметры вызова Bot API из формы или JSON."""
+
+    if headers.get("content-type", "").startswith("application/json"):
+        return json.loads(body or b"{}")
+    params: Dict[str, object] = {}
+    for name, value in parse_qsl(body.decode()):
+        try:
+            params[name] = json.loads(value)
+        except ValueError:
+            params[name] = value
+    return params
+
+
+async def post_json(url: str, body: bytes, secret: str) -> int:
+    """Отправляет POST с телом JSON и заголовком секрета webhook; возвращает статус."""
+
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        writer.write(
+            f"POST {parts.path or '/'} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        response = await read_http(reader)
+        return int(response[1]) if response else 0
+    finally:
+        writer.close()
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    telegram = FakeTelegram(
+        args.users, args.steps, args.api_delay / 1000, args.flood_limit, args.chat_flood_limit, args.retry_after
+    )
+    server = await asyncio.start_server(telegram.handle_api, "127.0.0.1", args.port)
+    print(f"Fake Bot API on http://127.0.0.1:{args.port}, waiting for setWebhook")
+    async with server:
+        await telegram.drive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8081, help="Порт фейкового Bot API")
+    parser.add_argument("--users", type=int, default=20, help="Число пользователей")
+    parser.add_argument("--steps", type=int, default=5, help="Нажатий кнопок после /start")
+    parser.add_argument("--api-delay", type=float, default=0.0, help="Задержка ответа Bot API, мс")
+    parser.add_argument("--flood-limit", type=int, default=0, help="Сообщений в секунду всего до ответа 429")
+    parser.add_argument("--chat-flood-limit", type=int, default=0, help="Сообщений в секунду в чат до ответа 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after в ответе 429, секунды")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
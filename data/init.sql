@@ -1,8 +1,233 @@
 CREATE SCHEMA IF NOT EXISTS conversations;
 
+-- Справочник состояний диалога: компактные коды вместо строк.
+-- Коды 1-99 зарезервированы под служебные состояния, состояния разделов
+-- и тем регистрируются ботом при запуске и получают коды от 100.
+CREATE SEQUENCE IF NOT EXISTS conversations.dialog_states_code_seq
+    AS SMALLINT START WITH 100;
+
+CREATE TABLE IF NOT EXISTS conversations.dialog_states (
+    code SMALLINT PRIMARY KEY DEFAULT nextval('conversations.dialog_states_code_seq'),
+    name TEXT NOT NULL UNIQUE
+);
+
+ALTER SEQUENCE conversations.dialog_states_code_seq OWNED BY conversations.dialog_states.code;
+
+INSERT INTO conversations.dialog_states (code, name) VALUES
+    (1, 'started'),
+    (2, 'random_question'),
+    (3, 'completed'),
+    (4, 'cancelled'),
+    (5, 'project_info'),
+    (6, 'abandoned')
+ON CONFLICT DO NOTHING;
+
+-- Диалоги: строка создается один раз при старте и больше не изменяется.
+-- Таблица секционирована по месяцам start_time (см. maintain_partitions).
 CREATE TABLE IF NOT EXISTS conversations.dialogs (
-    id SERIAL PRIMARY KEY,
-    start_time TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    end_time TIMESTAMP WITH TIME ZONE,
-    dialog_state VARCHAR(50)
-);
\ No newline at end of file
+    id BIGSERIAL,
+    start_time TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, start_time)
+) PARTITION BY RANGE (start_time);
+
+-- Журнал событий диалога, только INSERT: вся история навигации без UPDATE.
+-- Секционирован по месяцам ts.
+CREATE TABLE IF NOT EXISTS conversations.dialog_events (
+    dialog_id BIGINT NOT NULL,
+    ts TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    state_code SMALLINT NOT NULL REFERENCES conversations.dialog_states (code),
+    ended BOOLEAN NOT NULL DEFAULT FALSE
+) PARTITION BY RANGE (ts);
+
+-- Секции по умолчанию принимают строки вне заранее созданных месяцев
+CREATE TABLE IF NOT EXISTS conversations.dialogs_default
+    PARTITION OF conversations.dialogs DEFAULT;
+CREATE TABLE IF NOT EXISTS conversations.dialog_events_default
+    PARTITION OF conversations.dialog_events DEFAULT;
+
+CREATE INDEX IF NOT EXISTS dialogs_start_time_brin
+    ON conversations.dialogs USING BRIN (start_time);
+CREATE INDEX IF NOT EXISTS dialog_events_ts_brin
+    ON conversations.dialog_events USING BRIN (ts);
+CREATE INDEX IF NOT EXISTS dialog_events_dialog_id_ts_idx
+    ON conversations.dialog_events (dialog_id, ts);
+
+-- Дневная сводка диалогов по финальному состоянию; переживает удаление секций
+CREATE TABLE IF NOT EXISTS conversations.dialog_daily_stats (
+    day DATE NOT NULL,
+    state_code SMALLINT NOT NULL REFERENCES conversations.dialog_states (code),
+    dialogs INTEGER NOT NULL,
+    PRIMARY KEY (day, state_code)
+);
+
+-- Схема для отсоединенных секций при архивировании вместо удаления
+CREATE SCHEMA IF NOT EXISTS conversations_archive;
+
+-- Текущее состояние диалога: последнее событие и время завершения
+CREATE OR REPLACE VIEW conversations.dialogs_current AS
+SELECT d.id, d.start_time, e.end_time, e.state_code
+FROM conversations.dialogs d
+LEFT JOIN LATERAL (
+    SELECT
+        (array_agg(ev.state_code ORDER BY ev.ts DESC))[1] AS state_code,
+        max(ev.ts) FILTER (WHERE ev.ended) AS end_time
+    FROM conversations.dialog_events ev
+    WHERE ev.dialog_id = d.id AND ev.ts >= d.start_time
+) e ON TRUE;
+
+-- Представление с расшифрованными состояниями для ручного анализа
+CREATE OR REPLACE VIEW conversations.dialogs_readable AS
+SELECT d.id, d.start_time, d.end_time, s.name AS dialog_state
+FROM conversations.dialogs_current d
+LEFT JOIN conversations.dialog_states s ON s.code = d.state_code;
+
+-- Сводит диалоги, начатые в [p_from, p_to), в дневную сводку по финальному состоянию.
+-- Повторный вызов для того же интервала перезаписывает сводку.
+CREATE OR REPLACE FUNCTION conversations.rollup_dialogs(
+    p_from TIMESTAMP WITH TIME ZONE,
+    p_to TIMESTAMP WITH TIME ZONE
+) RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    INSERT INTO conversations.dialog_daily_stats (day, state_code, dialogs)
+    SELECT (d.start_time AT TIME ZONE 'UTC')::date, COALESCE(d.state_code, 1), count(*)
+    FROM conversations.dialogs_current d
+    WHERE d.start_time >= p_from AND d.start_time < p_to
+    GROUP BY 1, 2
+    ON CONFLICT (day, state_code) DO UPDATE SET dialogs = EXCLUDED.dialogs;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Завершает состоянием abandoned брошенные диалоги: начатые в последние
+-- p_lookback, без события завершения и без событий за последние p_idle.
+-- За вызов завершается не больше p_limit диалогов, чтобы транзакция была
+-- короткой; возвращает их число. Одновременный запуск из нескольких
+-- процессов исключается advisory-блокировкой.
+CREATE OR REPLACE FUNCTION conversations.close_abandoned(
+    p_idle INTERVAL,
+    p_lookback INTERVAL,
+    p_limit INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('conversations.close_abandoned')) THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO conversations.dialog_events (dialog_id, state_code, ended)
+    SELECT d.id, s.code, TRUE
+    FROM conversations.dialogs d
+    JOIN conversations.dialog_states s ON s.name = 'abandoned'
+    WHERE d.start_time >= now() - p_lookback
+      AND d.start_time < now() - p_idle
+      AND NOT EXISTS (
+          SELECT 1 FROM conversations.dialog_events e
+          WHERE e.dialog_id = d.id AND e.ts >= d.start_time
+            AND (e.ended OR e.ts >= now() - p_idle)
+      )
+    LIMIT p_limit;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Обслуживание секций:
+--   * создает месячные секции на текущий и p_premake следующих месяцев;
+--   * секции, целиком старше p_retention, сводит в dialog_daily_stats и
+--     удаляет (или отсоединяет в схему conversations_archive при p_archive).
+-- p_retention = NULL отключает удаление. Возвращает число обработанных
+-- устаревших месяцев. Одновременный запуск из нескольких процессов
+-- исключается advisory-блокировкой.
+CREATE OR REPLACE FUNCTION conversations.maintain_partitions(
+    p_retention INTERVAL,
+    p_premake INTEGER DEFAULT 3,
+    p_archive BOOLEAN DEFAULT FALSE
+) RETURNS INTEGER AS $$
+DECLARE
+    -- Границы месяцев считаются в UTC
+    v_month TIMESTAMP;
+    v_parent TEXT;
+    v_part TEXT;
+    v_expired INTEGER := 0;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('conversations.maintain_partitions')) THEN
+        RETURN 0;
+    END IF;
+
+    FOR i IN 0..p_premake LOOP
+        v_month := date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => i);
+        FOREACH v_parent IN ARRAY ARRAY['dialogs', 'dialog_events'] LOOP
+            v_part := v_parent || '_p' || to_char(v_month, 'YYYYMM');
+            CONTINUE WHEN to_regclass(format('conversations.%I', v_part)) IS NOT NULL;
+            EXECUTE format(
+                'CREATE TABLE conversations.%I PARTITION OF conversations.%I '
+                'FOR VALUES FROM (%L) TO (%L)',
+                v_part, v_parent,
+                v_month AT TIME ZONE 'UTC', (v_month + interval '1 month') AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END LOOP;
+
+    IF p_retention IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_month IN
+        SELECT to_date(right(c.relname, 6), 'YYYYMM')::timestamp
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'conversations.dialogs'::regclass
+          AND c.relname ~ '^dialogs_p[0-9]{6}$'
+        ORDER BY 1
+    LOOP
+        EXIT WHEN (v_month + interval '1 month') AT TIME ZONE 'UTC' > now() - p_retention;
+
+        PERFORM conversations.rollup_dialogs(
+            v_month AT TIME ZONE 'UTC', (v_month + interval '1 month') AT TIME ZONE 'UTC'
+        );
+
+        FOREACH v_parent IN ARRAY ARRAY['dialogs', 'dialog_events'] LOOP
+            v_part := v_parent || '_p' || to_char(v_month, 'YYYYMM');
+            IF p_archive THEN
+                EXECUTE format(
+                    'ALTER TABLE conversations.%I DETACH PARTITION conversations.%I',
+                    v_parent, v_part
+                );
+                EXECUTE format('ALTER TABLE conversations.%I SET SCHEMA conversations_archive', v_part);
+            ELSE
+                EXECUTE format('DROP TABLE IF EXISTS conversations.%I', v_part);
+            END IF;
+        END LOOP;
+        v_expired := v_expired + 1;
+    END LOOP;
+
+    RETURN v_expired;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Начальные секции на текущий и ближайшие месяцы
+SELECT conversations.maintain_partitions(NULL);
+
+-- Рассылка "Вопрос дня": подписчики хранятся только как ID чатов
+CREATE SCHEMA IF NOT EXISTS broadcast;
+
+CREATE TABLE IF NOT EXISTS broadcast.subscribers (
+    chat_id BIGINT PRIMARY KEY
+);
+
+-- Прогресс рассылки дня: подписчики обходятся по возрастанию chat_id, и
+-- position - последний обработанный ID; после перезапуска рассылка
+-- продолжается с него, не отправляя вопрос повторно
+CREATE TABLE IF NOT EXISTS broadcast.runs (
+    day DATE PRIMARY KEY,
+    question TEXT NOT NULL,
+    position BIGINT NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    finished BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,123 @@
+-- Миграция 001: журнал событий диалогов и секционирование по месяцам.
+--
+-- Переводит базу, созданную прежним init.sql, на схему текущего init.sql.
+-- Прежняя таблица conversations.dialogs (id SERIAL, start_time, end_time и
+-- dialog_state VARCHAR или state_code SMALLINT) хранит только последнее
+-- состояние диалога, поэтому каждый диалог переносится двумя событиями:
+-- 'started' в start_time и последнее состояние - в end_time для завершенных
+-- диалогов или сразу после start_time для незавершенных.
+--
+-- Бот на время миграции должен быть остановлен. Миграция выполняется одной
+-- транзакцией из корня репозитория:
+--
+--   psql "$DATABASE_URL" -f data/migrations/001_event_log_partitioning.sql
+--
+-- Повторный запуск на уже переведенной базе ничего не меняет.
+
+\set ON_ERROR_STOP on
+
+SELECT EXISTS (
+    SELECT 1 FROM pg_partitioned_table
+    WHERE partrelid = to_regclass('conversations.dialogs')
+) AS migrated \gset
+\if :migrated
+\echo 'conversations.dialogs is already partitioned, nothing to migrate'
+\quit
+\endif
+
+BEGIN;
+
+-- Прежняя таблица освобождает имена таблицы, ключа и последовательности.
+-- Представления и индекс, созданные повторным запуском init.sql поверх
+-- прежней таблицы, удаляются и создаются заново для новой.
+DROP VIEW IF EXISTS conversations.dialogs_readable, conversations.dialogs_current;
+DROP INDEX IF EXISTS conversations.dialogs_start_time_brin;
+ALTER TABLE conversations.dialogs RENAME TO dialogs_legacy;
+ALTER INDEX conversations.dialogs_pkey RENAME TO dialogs_legacy_pkey;
+ALTER SEQUENCE conversations.dialogs_id_seq RENAME TO dialogs_legacy_id_seq;
+
+-- Схема текущей версии: все объекты создаются с IF NOT EXISTS или OR REPLACE
+\ir ../init.sql
+
+-- Месячные секции за время прежних диалогов (текущие создал init.sql)
+DO $$
+DECLARE
+    v_month TIMESTAMP;
+    v_parent TEXT;
+    v_part TEXT;
+BEGIN
+    FOR v_month IN
+        SELECT generate_series(
+            date_trunc('month', min(start_time) AT TIME ZONE 'UTC'),
+            date_trunc('month', now() AT TIME ZONE 'UTC'),
+            interval '1 month'
+        )
+        FROM conversations.dialogs_legacy
+    LOOP
+        FOREACH v_parent IN ARRAY ARRAY['dialogs', 'dialog_events'] LOOP
+            v_part := v_parent || '_p' || to_char(v_month, 'YYYYMM');
+            CONTINUE WHEN to_regclass(format('conversations.%I', v_part)) IS NOT NULL;
+            EXECUTE format(
+                'CREATE TABLE conversations.%I PARTITION OF conversations.%I '
+                'FOR VALUES FROM (%L) TO (%L)',
+                v_part, v_parent,
+                v_month AT TIME ZONE 'UTC', (v_month + interval '1 month') AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END LOOP;
+END;
+$$;
+
+-- Код последнего состояния прежних диалогов: из колонки state_code или по
+-- имени dialog_state; имена, неизвестные справочнику, регистрируются
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'conversations' AND table_name = 'dialogs_legacy'
+          AND column_name = 'dialog_state'
+    ) THEN
+        EXECUTE '
+            INSERT INTO conversations.dialog_states (name)
+            SELECT DISTINCT dialog_state FROM conversations.dialogs_legacy
+            WHERE dialog_state IS NOT NULL
+            ON CONFLICT (name) DO NOTHING';
+        EXECUTE '
+            CREATE TEMPORARY TABLE legacy_dialogs ON COMMIT DROP AS
+            SELECT l.id, COALESCE(l.start_time, CURRENT_TIMESTAMP) AS start_time, l.end_time, s.code AS state_code
+            FROM conversations.dialogs_legacy l
+            LEFT JOIN conversations.dialog_states s ON s.name = l.dialog_state';
+    ELSE
+        EXECUTE '
+            CREATE TEMPORARY TABLE legacy_dialogs ON COMMIT DROP AS
+            SELECT id, COALESCE(start_time, CURRENT_TIMESTAMP) AS start_time, end_time, state_code
+            FROM conversations.dialogs_legacy';
+    END IF;
+END;
+$$;
+
+INSERT INTO conversations.dialogs (id, start_time)
+SELECT id, start_time FROM legacy_dialogs;
+
+INSERT INTO conversations.dialog_events (dialog_id, ts, state_code, ended)
+SELECT id, start_time, 1, FALSE FROM legacy_dialogs;
+
+-- Последнее состояние идет после 'started', даже если время его записи неизвестно
+INSERT INTO conversations.dialog_events (dialog_id, ts, state_code, ended)
+SELECT id,
+       GREATEST(end_time, start_time + interval '1 microsecond'),
+       COALESCE(state_code, 1),
+       end_time IS NOT NULL
+FROM legacy_dialogs
+WHERE end_time IS NOT NULL OR state_code <> 1;
+
+-- Новые диалоги продолжают нумерацию прежних
+SELECT setval(
+    'conversations.dialogs_id_seq',
+    COALESCE((SELECT max(id) FROM legacy_dialogs), 1),
+    EXISTS (SELECT 1 FROM legacy_dialogs)
+);
+
+DROP TABLE conversations.dialogs_legacy;
+
+COMMIT;
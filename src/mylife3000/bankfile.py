@@ -0,0 +1,431 @@
+"""
+Модуль внешнего банка вопросов в компактном двоичном формате.
+
+Банк вопросов можно хранить вне кода: исходник в JSON компилируется в
+двоичный файл, который отображается в память (``mmap``) и читается без
+разбора всех строк. Файл проверяется контрольной суммой; новый файл
+подменяет старый атомарным переименованием, а бот подхватывает его без
+перезапуска (см. ``watch_bank``).
+
+Формат файла (little-endian)::
+
+    заголовок   magic "MLQB", версия формата, число вопросов, строк,
+                разделов и тем, размер блоба, контрольная сумма (40 байт)
+    смещения    (число строк + 1) x uint32 - границы строк в блобе
+    разделы     на раздел 6 x uint32: строка имени, строка описания,
+                первая тема, число тем, начало и конец диапазона вопросов
+    темы        на тему 3 x uint32: строка имени, начало и конец диапазона
+    блоб        UTF-8 всех строк подряд: вопросы (ID строки = ID вопроса),
+                затем имена и описания разделов и имена тем
+
+Контрольная сумма - BLAKE2b (8 байт) всего, что следует за заголовком;
+ее шестнадцатеричная запись служит версией банка.
+
+Classes:
+    BankFormatError: Исключение поврежденного или несовместимого файла
+    QuestionsView: Ленивая последовательность вопросов поверх отображения файла
+
+Functions:
+    encode_bank: Сериализация банка в двоичный формат
+    write_bank: Атомарная запись банка в файл
+    read_bank: Загрузка банка из файла с проверкой целостности
+    load_source: Загрузка банка из исходника JSON
+    dump_source: Сохранение банка в исходник JSON
+    bank_signature: Признак изменения файла для наблюдателя
+    watch_bank: Фоновая задача отслеживания файла банка
+    main: Утилита командной строки (export, compile, info)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .questionary import QuestionBank, build_question_bank, load_question_bank
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MLQB"
+FORMAT_VERSION = 1
+# magic, версия формата, резерв, вопросы, строки, разделы, темы, блоб, резерв, контрольная сумма
+_HEADER = struct.Struct("<4sHHIIIIII8s")
+_SECTION = struct.Struct("<6I")
+_THEME = struct.Struct("<3I")
+
+
+class BankFormatError(ValueError):
+    """Файл банка вопросов поврежден или имеет несовместимый формат."""
+
+
+class QuestionsView(Sequence):
+    """
+    Ленивая неизменяемая последовательность вопросов.
+
+    Строки декодируются из отображенного в память блоба при обращении,
+    срезы возвращают новое представление без копирования данных.
+    """
+
+    __slots__ = ("_blob", "_offsets", "_start", "_stop")
+
+    def __init__(self, blob: memoryview, offsets: Sequence, start: int, stop: int):
+        self._blob = blob
+        self._offsets = offsets
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return tuple(self[i] for i in range(start, stop, step))
+            return QuestionsView(self._blob, self._offsets, self._start + start, self._start + max(start, stop))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        position = self._start + index
+        return str(self._blob[self._offsets[position]:self._offsets[position + 1]], "utf-8")
+
+    def __repr__(self) -> str:
+        return f"QuestionsView({self._start}:{self._stop})"
+
+
+def encode_bank(bank: QuestionBank) -> bytes:
+    """
+    Сериализует банк вопросов в двоичный формат.
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+
+    Returns
+    -------
+    bytes
+        Содержимое файла банка
+    """
+
+    strings: List[bytes] = [question.encode("utf-8") for question in bank.questions]
+    sections = bytearray()
+    themes = bytearray()
+    theme_count = 0
+    for section_name in bank.section_names:
+        section_themes = bank.themes[section_name]
+        name_id = len(strings)
+        strings.append(section_name.encode("utf-8"))
+        strings.append(bank.section_descriptions.get(section_name, "").encode("utf-8"))
+        sections += _SECTION.pack(name_id, name_id + 1, theme_count, len(section_themes), *bank.section_ranges[section_name])
+        for theme in section_themes:
+            themes += _THEME.pack(len(strings), *bank.theme_ranges[(section_name, theme)])
+            strings.append(theme.encode("utf-8"))
+        theme_count += len(section_themes)
+
+    blob = b"".join(strings)
+    offsets = array("I", [0])
+    for string in strings:
+        offsets.append(offsets[-1] + len(string))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    body = offsets.tobytes() + bytes(sections) + bytes(themes) + blob
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, len(bank.questions), len(strings), len(bank.section_names),
+        theme_count, len(blob), 0, hashlib.blake2b(body, digest_size=8).digest()
+    )
+    return header + body
+
+
+def write_bank(bank: QuestionBank, path: str) -> None:
+    """
+    Атомарно записывает банк вопросов в файл.
+
+    Файл пишется во временный файл рядом с целевым и переименовывается,
+    поэтому читатели и уже отображенные в память версии не видят
+    частично записанного файла.
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+    path : str
+        Путь к файлу банка
+    """
+
+    data = encode_bank(bank)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".bank-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), 0o644)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_bank(path: str) -> QuestionBank:
+    """
+    Загружает банк вопросов из двоичного файла.
+
+    Файл отображается в память; проверяются заголовок, размеры таблиц и
+    контрольная сумма. Вопросы декодируются лениво при обращении.
+
+    Parameters
+    ----------
+    path : str
+        Путь к файлу банка
+
+    Returns
+    -------
+    QuestionBank
+        Банк вопросов; поле ``version`` - контрольная сумма файла
+
+    Raises
+    ------
+    BankFormatError
+        Если файл поврежден или имеет несовместимый формат
+    """
+
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise BankFormatError(f"{path}: empty file")
+    data = memoryview(mapped)
+
+    if len(data) < _HEADER.size:
+        raise BankFormatError(f"{path}: truncated header")
+    magic, version, _, n_questions, n_strings, n_sections, n_themes, blob_size, _, checksum = (
+        _HEADER.unpack_from(data)
+    )
+    if magic != MAGIC:
+        raise BankFormatError(f"{path}: not a question bank file")
+    if version != FORMAT_VERSION:
+        raise BankFormatError(f"{path}: unsupported format version {version}")
+
+    offsets_end = _HEADER.size + 4 * (n_strings + 1)
+    sections_end = offsets_end + _SECTION.size * n_sections
+    themes_end = sections_end + _THEME.size * n_themes
+    if len(data) != themes_end + blob_size or n_questions > n_strings:
+        raise BankFormatError(f"{path}: size mismatch")
+    if hashlib.blake2b(data[_HEADER.size:], digest_size=8).digest() != checksum:
+        raise BankFormatError(f"{path}: checksum mismatch")
+
+    offsets = data[_HEADER.size:offsets_end].cast("I")
+    if sys.byteorder != "little":
+        offsets = array("I", offsets.tobytes())
+        offsets.byteswap()
+    if offsets[-1] != blob_size or any(offsets[i] > offsets[i + 1] for i in range(n_strings)):
+        raise BankFormatError(f"{path}: corrupted string offsets")
+    questions = QuestionsView(data[themes_end:], offsets, 0, n_questions)
+
+    def string(string_id: int) -> str:
+        if string_id >= n_strings:
+            raise BankFormatError(f"{path}: string reference out of range")
+        return str(data[themes_end + offsets[string_id]:themes_end + offsets[string_id + 1]], "utf-8")
+
+    def question_range(start: int, stop: int) -> Tuple[int, int]:
+        if not 0 <= start <= stop <= n_questions:
+            raise BankFormatError(f"{path}: question range out of bounds")
+        return start, stop
+
+    theme_rows = [_THEME.unpack_from(data, sections_end + _THEME.size * i) for i in range(n_themes)]
+    sections: Dict[str, MappingProxyType] = {}
+    descriptions: Dict[str, str] = {}
+    themes: Dict[str, Tuple[str, ...]] = {}
+    section_ranges: Dict[str, Tuple[int, int]] = {}
+    theme_ranges: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    try:
+        for i in range(n_sections):
+            name_id, description_id, first_theme, theme_count, start, stop = _SECTION.unpack_from(
+                data, offsets_end + _SECTION.size * i
+            )
+            section_name = string(name_id)
+            descriptions[section_name] = string(description_id)
+            section_ranges[section_name] = question_range(start, stop)
+            section_themes: Dict[str, QuestionsView] = {}
+            for theme_name_id, theme_start, theme_stop in theme_rows[first_theme:first_theme + theme_count]:
+                theme = string(theme_name_id)
+                theme_ranges[(section_name, theme)] = question_range(theme_start, theme_stop)
+                section_themes[theme] = questions[theme_start:theme_stop]
+            sections[section_name] = MappingProxyType(section_themes)
+            themes[section_name] = tuple(section_themes)
+    except UnicodeDecodeError as e:
+        raise BankFormatError(f"{path}: invalid UTF-8 in tables: {e}")
+
+    return QuestionBank(
+        questions=questions,
+        sections=MappingProxyType(sections),
+        section_descriptions=MappingProxyType(descriptions),
+        section_names=tuple(sections),
+        themes=MappingProxyType(themes),
+        section_ranges=MappingProxyType(section_ranges),
+        theme_ranges=MappingProxyType(theme_ranges),
+        version=checksum.hex(),
+    )
+
+
+def load_source(path: str) -> QuestionBank:
+    """
+    Загружает банк вопросов из исходника JSON.
+
+    Формат исходника::
+
+        {"sections": [{"name": "...", "description": "...",
+                       "themes": [{"name": "...", "questions": ["...", ...]}, ...]}, ...]}
+
+    Parameters
+    ----------
+    path : str
+        Путь к файлу JSON
+
+    Returns
+    -------
+    QuestionBank
+        Скомпилированный банк вопросов
+    """
+
+    with open(path, encoding="utf-8") as f:
+        source = json.load(f)
+    sections = {
+        section["name"]: {theme["name"]: theme["questions"] for theme in section["themes"]}
+        for section in source["sections"]
+    }
+    descriptions = {section["name"]: section.get("description", "") for section in source["sections"]}
+    return build_question_bank(sections, descriptions)
+
+
+def dump_source(bank: QuestionBank, path: str) -> None:
+    """
+    Сохраняет банк вопросов в исходник JSON (формат см. ``load_source``).
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+    path : str
+        Путь к файлу JSON
+    """
+
+    source = {"sections": [
+        {
+            "name": section_name,
+            "description": bank.section_descriptions.get(section_name, ""),
+            "themes": [
+                {"name": theme, "questions": list(bank.sections[section_name][theme])}
+                for theme in bank.themes[section_name]
+            ],
+        }
+        for section_name in bank.section_names
+    ]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(source, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def bank_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Возвращает признак версии файла: (inode, размер, время изменения).
+
+    Атомарная замена файла меняет inode, поэтому подмена замечается даже
+    при совпадении размера и времени изменения.
+
+    Returns
+    -------
+    Optional[Tuple[int, int, int]]
+        Признак файла или None, если файл недоступен
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+async def watch_bank(path: str, interval: float, on_change: Callable[[], Awaitable[object]]) -> None:
+    """
+    Отслеживает файл банка вопросов и вызывает ``on_change`` при его замене.
+
+    Ошибки ``on_change`` (например, поврежденный файл) записываются в лог;
+    повторная попытка выполняется только после следующего изменения файла.
+
+    Parameters
+    ----------
+    path : str
+        Путь к файлу банка
+    interval : float
+        Интервал проверки файла, секунды
+    on_change : Callable[[], Awaitable[object]]
+        Корутина загрузки новой версии банка
+    """
+
+    signature = bank_signature(path)
+    while True:
+        await asyncio.sleep(interval)
+        current = bank_signature(path)
+        if current is None or current == signature:
+            continue
+        signature = current
+        try:
+            await on_change()
+        except Exception as e:
+            logger.error(f"Failed to reload question bank from {path}: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Утилита командной строки для работы с файлами банка вопросов.
+
+    Команды::
+
+        python -m mylife3000.bankfile export questions.json
+        python -m mylife3000.bankfile compile questions.json questions.bin
+        python -m mylife3000.bankfile info questions.bin
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m mylife3000.bankfile", description="Файлы банка вопросов")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Сохранить встроенные вопросы в исходник JSON")
+    export.add_argument("source")
+    compile_ = commands.add_parser("compile", help="Скомпилировать исходник JSON в двоичный файл")
+    compile_.add_argument("source")
+    compile_.add_argument("output")
+    info = commands.add_parser("info", help="Проверить двоичный файл и вывести сводку")
+    info.add_argument("bank")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        dump_source(load_question_bank(), args.source)
+        return
+    if args.command == "compile":
+        write_bank(load_source(args.source), args.output)
+        path = args.output
+    else:
+        path = args.bank
+    try:
+        bank = read_bank(path)
+    except BankFormatError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"{path}: version {bank.version}, {len(bank.questions)} questions, "
+          f"{len(bank.section_names)} sections, {len(bank.theme_ranges)} themes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Модуль ежедневной рассылки "Вопрос дня".
+
+Чат подписывается командой /subscribe и отписывается командой
+/unsubscribe; хранилище держит только ID подписанных чатов (см. модуль
+``storage``). Каждый день в BROADCAST_TIME (UTC) ``broadcast_daily``
+запускает рассылку дня:
+
+- вопрос дня выбирается по дате (``question_of_the_day``) и сохраняется
+  вместе с прогрессом, поэтому после перезапуска или перезагрузки банка
+  досылается тот же вопрос;
+- подписчики читаются из хранилища страницами по BROADCAST_PAGE_SIZE по
+  возрастанию ID и через ограниченную очередь передаются
+  BROADCAST_WORKERS отправителям: память не зависит от числа подписчиков;
+- сообщения отправляются с приоритетом ``BULK`` через планировщик
+  исходящих запросов (см. модуль ``outbound``): он соблюдает ограничения
+  частоты Telegram, а ответы пользователям обгоняют рассылку;
+- раз в BROADCAST_CHECKPOINT_INTERVAL секунд сохраняется ID чата, до
+  которого все подписчики обработаны. После перезапуска рассылка
+  продолжается с него; повторно вопрос могут получить только чаты,
+  обработанные после последнего сохранения;
+- чат, заблокировавший бота или удаленный, отписывается.
+
+Classes:
+    Broadcast: Рассылка одного дня
+
+Functions:
+    question_of_the_day: ID вопроса дня
+    run_broadcast: Запуск или продолжение рассылки дня
+    broadcast_daily: Фоновая задача ежедневной рассылки
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Deque, Optional, Set
+
+from telegram import Bot
+from telegram.error import BadRequest, Forbidden, TelegramError
+
+from .locales import Catalogue
+from .metrics import metrics
+from .outbound import BULK
+from .questionary import QuestionBank
+from .storage import BroadcastProgress, Storage
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед продолжением прерванной рассылки, секунды
+_RETRY_INTERVAL = 60
+
+
+def question_of_the_day(bank: QuestionBank, day: date) -> int:
+    """
+    Возвращает ID вопроса дня.
+
+    Выбор зависит только от даты и банка, поэтому любой процесс выбирает
+    для дня один и тот же вопрос.
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+    day : date
+        День рассылки
+
+    Returns
+    -------
+    int
+        ID вопроса в банке
+    """
+
+    digest = hashlib.blake2b(day.isoformat().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % len(bank.questions)
+
+
+class Broadcast:
+    """
+    Рассылка одного дня: чтение подписчиков, отправка и сохранение прогресса.
+
+    Отправители завершают сообщения не по порядку, поэтому сохраняемая
+    позиция - наибольший ID, до которого включительно обработаны все
+    выданные чаты: ID выдаются по возрастанию и ждут в очереди
+    ``_pending``, пока не будут обработаны все предыдущие.
+
+    Attributes:
+        bot (Bot): Бот для отправки сообщений
+        storage (Storage): Хранилище подписчиков и прогресса
+        progress (BroadcastProgress): Прогресс на момент последнего сохранения
+        text (str): Текст сообщения
+        workers (int): Число одновременных отправок
+        page_size (int): Число подписчиков в запросе к хранилищу
+        checkpoint_interval (float): Интервал сохранения прогресса, секунды
+    """
+
+    def __init__(self, bot: Bot, storage: Storage, progress: BroadcastProgress, text: str,
+                 workers: int, page_size: int, checkpoint_interval: float):
+        self.bot = bot
+        self.storage = storage
+        self.progress = progress
+        self.text = text
+        self.workers = workers
+        self.page_size = page_size
+        self.checkpoint_interval = checkpoint_interval
+        self._position = progress.position
+        self._sent = progress.sent
+        self._failed = progress.failed
+        # Выданные отправителям ID по возрастанию и обработанные из них
+        self._pending: Deque[int] = deque()
+        self._done: Set[int] = set()
+        self._saved_at = time.monotonic()
+        self._saving = False
+        self._started = time.monotonic()
+        self._delivered = 0
+        self._sent_counter = metrics.counter("broadcast_sent")
+        self._failed_counter = metrics.counter("broadcast_failed")
+        self._unsubscribed = metrics.counter("broadcast_unsubscribed")
+        metrics.gauge("broadcast_messages_per_second", lambda: self.rate)
+        metrics.gauge("broadcast_failure_rate", lambda: self.failure_rate)
+
+    @property
+    def rate(self) -> float:
+        """Сообщений в секунду с начала работы этого процесса над рассылкой."""
+
+        elapsed = time.monotonic() - self._started
+        return self._delivered / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        """Доля недоставленных сообщений рассылки."""
+
+        total = self._sent + self._failed
+        return self._failed / total if total else 0.0
+
+    async def run(self) -> BroadcastProgress:
+        """
+        Рассылает вопрос подписчикам после сохраненной позиции.
+
+        Returns
+        -------
+        BroadcastProgress
+            Прогресс завершенной рассылки
+
+        Raises
+        ------
+        Exception
+            Ошибка хранилища при чтении подписчиков или сохранении прогресса;
+            сохраненный прогресс позволяет продолжить рассылку
+        """
+
+        queue: "asyncio.Queue[Optional[int]]" = asyncio.Queue(maxsize=self.workers * 2)
+        workers = [asyncio.create_task(self._work(queue)) for _ in range(self.workers)]
+        try:
+            error = None
+            try:
+                await self._produce(queue)
+            except Exception as e:
+                # Отправители дорабатывают выданные чаты, и сохраненная позиция
+                # покрывает их; при отмене задачи они прерываются сразу
+                error = e
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            if error is not None:
+                raise error
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Обработанные до ошибки чаты не получат вопрос повторно
+            try:
+                await self._save(finished=False)
+            except Exception as e:
+                logger.error(f"Failed to save broadcast {self.progress.day} progress: {e}")
+            raise
+
+        await self._save(finished=True)
+        return self.progress
+
+    async def _produce(self, queue: "asyncio.Queue[Optional[int]]") -> None:
+        """Читает подписчиков страницами и выдает их ID отправителям по возрастанию."""
+
+        position = self._position
+        while True:
+            page = await self.storage.subscribers_after(position, self.page_size)
+            for chat_id in page:
+                self._pending.append(chat_id)
+                await queue.put(chat_id)
+            if len(page) < self.page_size:
+                return
+            position = page[-1]
+
+    async def _work(self, queue: "asyncio.Queue[Optional[int]]") -> None:
+        """Отправитель: доставляет сообщения чатам из очереди."""
+
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            await self._deliver(chat_id)
+            self._done.add(chat_id)
+            while self._pending and self._pending[0] in self._done:
+                self._position = self._pending.popleft()
+                self._done.discard(self._position)
+            if not self._saving and time.monotonic() - self._saved_at >= self.checkpoint_interval:
+                try:
+                    await self._save(finished=False)
+                except Exception as e:
+                    # Рассылка продолжается; позиция сохранится при следующей попытке
+                    logger.error(f"Failed to save broadcast {self.progress.day} progress: {e}")
+
+    async def _deliver(self, chat_id: int) -> None:
+        """Отправляет сообщение чату и учитывает результат."""
+
+        try:
+            await self.bot.send_message(chat_id, self.text, rate_limit_args=BULK)
+        except (Forbidden, BadRequest) as e:
+            # Бот заблокирован, исключен из группы или чат удален: отправлять больше некуда
+            self._fail()
+            if isinstance(e, Forbidden) or "chat not found" in e.message.lower():
+                await self._unsubscribe(chat_id)
+            else:
+                logger.debug(f"Broadcast to chat {chat_id} failed: {e}")
+        except TelegramError as e:
+            # Итог рассылки и доля недоставленных сообщений пишутся в лог по ее завершении
+            self._fail()
+            logger.debug(f"Broadcast to chat {chat_id} failed: {e}")
+        else:
+            self._sent += 1
+            self._delivered += 1
+            self._sent_counter.inc()
+
+    def _fail(self) -> None:
+        self._failed += 1
+        self._delivered += 1
+        self._failed_counter.inc()
+
+    async def _unsubscribe(self, chat_id: int) -> None:
+        try:
+            await self.storage.unsubscribe(chat_id)
+            self._unsubscribed.inc()
+        except Exception as e:
+            logger.error(f"Failed to unsubscribe unreachable chat {chat_id}: {e}")
+
+    async def _save(self, finished: bool) -> None:
+        """Сохраняет позицию и счетчики рассылки."""
+
+        self._saving = True
+        try:
+            progress = self.progress._replace(
+                position=self._position, sent=self._sent, failed=self._failed, finished=finished
+            )
+            await self.storage.save_broadcast(progress)
+            self.progress = progress
+            self._saved_at = time.monotonic()
+        finally:
+            self._saving = False
+
+
+async def run_broadcast(bot: Bot, storage: Storage, catalogue: Catalogue, day: date,
+                        workers: int, page_size: int, checkpoint_interval: float) -> BroadcastProgress:
+    """
+    Запускает рассылку дня или продолжает ее с сохраненной позиции.
+
+    Parameters
+    ----------
+    bot : Bot
+        Бот для отправки сообщений
+    storage : Storage
+        Хранилище подписчиков и прогресса
+    catalogue : Catalogue
+        Каталог локали, из банка которой выбирается вопрос и тексты которой
+        используются: язык подписчиков не хранится
+    day : date
+        День рассылки
+    workers : int
+        Число одновременных отправок
+    page_size : int
+        Число подписчиков в запросе к хранилищу
+    checkpoint_interval : float
+        Интервал сохранения прогресса, секунды
+
+    Returns
+    -------
+    BroadcastProgress
+        Прогресс завершенной рассылки
+    """
+
+    progress = await storage.load_broadcast(day)
+    if progress is not None and progress.finished:
+        return progress
+    if progress is None:
+        bank = catalogue.questionary.bank
+        # Вопрос сохраняется до первой отправки: продолжение рассылки отправит его же
+        progress = BroadcastProgress(day, bank.questions[question_of_the_day(bank, day)])
+        await storage.save_broadcast(progress)
+        logger.info(f"Broadcast {day} started")
+    else:
+        logger.info(f"Broadcast {day} resumed after chat {progress.position}: "
+                    f"{progress.sent} sent, {progress.failed} failed")
+
+    broadcast = Broadcast(
+        bot, storage, progress, catalogue.text('daily_question', question=progress.question),
+        workers, page_size, checkpoint_interval,
+    )
+    progress = await broadcast.run()
+    elapsed = time.monotonic() - broadcast._started
+    logger.info(
+        f"Broadcast {day} finished: {progress.sent} sent, {progress.failed} failed "
+        f"({broadcast.failure_rate:.1%}), {broadcast.rate:.1f} messages/s over {elapsed:.0f} s"
+    )
+    return progress
+
+
+async def broadcast_daily(bot: Bot, storage: Storage, catalogue: Catalogue, at: dtime,
+                          workers: int, page_size: int, checkpoint_interval: float) -> None:
+    """
+    Фоновая задача ежедневной рассылки.
+
+    Если при запуске бота время рассылки сегодня уже прошло, а рассылка дня
+    не завершена, она начинается или продолжается сразу. Прерванная
+    ошибкой рассылка продолжается через минуту; незавершенная рассылка
+    прошлого дня не досылается.
+
+    Parameters
+    ----------
+    bot : Bot
+        Бот для отправки сообщений
+    storage : Storage
+        Хранилище подписчиков и прогресса
+    catalogue : Catalogue
+        Каталог локали рассылки
+    at : datetime.time
+        Время рассылки по UTC
+    workers : int
+        Число одновременных отправок
+    page_size : int
+        Число подписчиков в запросе к хранилищу
+    checkpoint_interval : float
+        Интервал сохранения прогресса, секунды
+    """
+
+    while True:
+        now = datetime.now(timezone.utc)
+        scheduled = datetime.combine(now.date(), at, tzinfo=timezone.utc)
+        if now >= scheduled:
+            try:
+                await run_broadcast(bot, storage, catalogue, now.date(), workers, page_size, checkpoint_interval)
+            except Exception as e:
+                logger.error(f"Broadcast {now.date()} interrupted, resuming in {_RETRY_INTERVAL} s: {e}")
+                await asyncio.sleep(_RETRY_INTERVAL)
+                continue
+            scheduled += timedelta(days=1)
+        await asyncio.sleep((scheduled - datetime.now(timezone.utc)).total_seconds())
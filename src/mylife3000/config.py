@@ -4,17 +4,56 @@
 Содержит настройки приложения, включая:
 - Переменные окружения
 - Состояния диалога (FSM)
-- Клавиатуры и текстовые константы
 
 Variables:
     BOT_TOKEN (str): Токен Telegram бота
-    DATABASE_URL (str): URL подключения к PostgreSQL
+    TELEGRAM_API_URL (str): Адрес Bot API (локальный сервер Bot API или фейковый Telegram)
+    WEBHOOK_URL (str): Публичный адрес бота для режима webhook (пусто - режим опроса)
+    WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH: Адрес, порт и путь встроенного HTTP-сервера
+    WEBHOOK_SECRET_TOKEN (str): Секрет, которым Telegram подписывает запросы webhook
+    WEBHOOK_CERT, WEBHOOK_KEY (str): Сертификат и ключ TLS (пусто - TLS завершается на прокси)
+    WEBHOOK_MAX_CONNECTIONS (int): Число одновременных соединений Telegram с webhook
+    UPDATE_CONCURRENCY (int): Число обновлений разных чатов, обрабатываемых одновременно
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_GROUP_RATE, OUTBOUND_MAX_RETRIES:
+        Ограничения частоты исходящих сообщений и повторы после ответа 429
+    SESSION_PERSISTENCE_PATH (str): Файл SQLite для сохранения диалогов (пусто - не сохранять)
+    SESSION_FLUSH_INTERVAL (float): Интервал записи измененных сессий
+    SESSION_IDLE_TTL, SESSION_MAX_RESIDENT, SESSION_SWEEP_INTERVAL: Параметры вытеснения сессий из памяти
+    STORAGE_BACKEND (str): Хранилище статистики диалогов: postgres, sqlite или memory
+    DATABASE_URL (str): URL подключения к PostgreSQL (обязателен для STORAGE_BACKEND=postgres)
+    SQLITE_PATH (str): Путь к файлу SQLite для STORAGE_BACKEND=sqlite
+    DB_WRITE_BEHIND (bool): Включает отложенную пакетную запись событий диалога
+    DB_FLUSH_BATCH_SIZE, DB_FLUSH_INTERVAL, DB_QUEUE_MAX_SIZE: Параметры очереди записи
+    DB_SPOOL_DIR, DB_SPOOL_MAX_BYTES, DB_SPOOL_REPLAY_INTERVAL: Параметры локального спула
+    DB_BREAKER_FAILURE_THRESHOLD, DB_BREAKER_RESET_TIMEOUT: Параметры автоматического выключателя
+    DB_OPERATION_TIMEOUTS (Dict[str, float]): Бюджеты времени отдельных операций с БД
+    DB_ID_BLOCK_SIZE (int): Размер резервируемого блока ID диалогов
+    DB_MAINTENANCE_INTERVAL, DB_RETENTION_DAYS, DB_PARTITION_PREMAKE, DB_ARCHIVE_EXPIRED:
+        Параметры обслуживания секций и срока хранения диалогов
+    DB_ABANDONED_AFTER, DB_ABANDONED_SWEEP_INTERVAL, DB_ABANDONED_BATCH_SIZE, DB_ABANDONED_LOOKBACK_DAYS:
+        Параметры завершения брошенных диалогов в хранилище
+    METRICS_LOG_INTERVAL (float): Интервал вывода метрик в лог
+    QUESTION_SAMPLING (str): Режим выбора вопросов: no_repeat, random или weighted
+    QUESTION_WEIGHTS_PATH (str): Файл JSON базовых весов вопросов для режима weighted
+    QUESTION_WEIGHTS_REBUILD_INTERVAL (float): Интервал перестроения таблиц весов
+    QUESTION_FEEDBACK_PRIOR (float): Сглаживание множителя обратной связи в весах вопросов
+    QUESTION_BANK_PATH (str): Файл банка вопросов в двоичном формате (пусто - встроенные вопросы)
+    QUESTION_BANK_RELOAD_INTERVAL (float): Интервал проверки файла банка на замену
+    SEARCH_RESULTS_LIMIT (int): Число вопросов в ответе на команду /search
+    INLINE_QUERY_CACHE_SIZE, INLINE_QUERY_CACHE_TIME, INLINE_QUERY_DEBOUNCE, INLINE_QUERY_RESULTS_LIMIT:
+        Кэш, интервал ответов и число результатов встроенного режима
+    SIMILAR_QUESTIONS_K (int): Число ближайших соседей вопроса для кнопки "Похожий вопрос"
+    ADMIN_USER_IDS (FrozenSet[int]): Telegram ID администраторов бота
+    BROADCAST_TIME (str): Время ежедневной рассылки "Вопрос дня" по UTC (пусто - отключена)
+    BROADCAST_WORKERS, BROADCAST_PAGE_SIZE, BROADCAST_CHECKPOINT_INTERVAL: Параметры конвейера рассылки
+    KEYBOARD_MODE (str): Клавиатуры меню: reply или inline
+    DEFAULT_LOCALE (str): Локаль для пользователей без явного выбора и с неподдерживаемым языком
     MAIN_MENU, SECTION_MENU, THEME, RESULT (int): Состояния конечного автомата
-    *_KEYBOARD (List[List[str]]): Массивы кнопок для клавиатур
 """
 
 import os
-from typing import Dict
+import re
+from typing import Dict, FrozenSet
 from dotenv import load_dotenv
 import logging
 
@@ -26,33 +65,204 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN не найден! Проверьте .env файл.")
 
+# Адрес Bot API: меняется для локального сервера Bot API или фейкового Telegram
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+
+# Режим webhook: публичный адрес, на который Telegram отправляет обновления (пусто - режим опроса)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+# Адрес и порт встроенного HTTP-сервера; за прокси с TLS обычно 127.0.0.1
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+# Путь webhook; полный адрес для Telegram - WEBHOOK_URL/WEBHOOK_PATH
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+# Секрет заголовка X-Telegram-Bot-Api-Secret-Token: 1-256 символов A-Z, a-z, 0-9, _ и -
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+if WEBHOOK_URL and not re.fullmatch(r"[A-Za-z0-9_-]{1,256}", WEBHOOK_SECRET_TOKEN):
+    raise ValueError("WEBHOOK_SECRET_TOKEN обязателен в режиме webhook: 1-256 символов A-Z, a-z, 0-9, _ и -.")
+# Сертификат и ключ TLS встроенного сервера (пусто - TLS завершается на обратном прокси)
+WEBHOOK_CERT = os.getenv("WEBHOOK_CERT", "")
+WEBHOOK_KEY = os.getenv("WEBHOOK_KEY", "")
+if bool(WEBHOOK_CERT) != bool(WEBHOOK_KEY):
+    raise ValueError("WEBHOOK_CERT и WEBHOOK_KEY задаются вместе.")
+# Число одновременных соединений Telegram с webhook (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# Число обновлений разных чатов, обрабатываемых одновременно (1 - последовательно);
+# обновления одного чата всегда обрабатываются по очереди
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "32"))
+if UPDATE_CONCURRENCY < 1:
+    raise ValueError(f"UPDATE_CONCURRENCY={UPDATE_CONCURRENCY} должно быть не меньше 1.")
+
+# Ограничения частоты исходящих сообщений (0 - без ограничения): всего на бота, в секунду
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))
+# В личный чат, в секунду, и число сообщений подряд без ожидания
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = int(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+# В группу или канал, в минуту
+OUTBOUND_GROUP_RATE = float(os.getenv("OUTBOUND_GROUP_RATE", "20"))
+# Наибольшее число повторов запроса после ответа 429 (flood wait)
+OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+if min(OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_GROUP_RATE, OUTBOUND_MAX_RETRIES) < 0 or OUTBOUND_CHAT_BURST < 1:
+    raise ValueError("OUTBOUND_*_RATE и OUTBOUND_MAX_RETRIES не могут быть отрицательными, OUTBOUND_CHAT_BURST - меньше 1.")
+
+# Файл SQLite для сохранения диалогов и user_data между перезапусками (пусто - не сохранять)
+SESSION_PERSISTENCE_PATH = os.getenv("SESSION_PERSISTENCE_PATH", "")
+# Интервал записи измененных сессий, секунды
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "10"))
+if SESSION_FLUSH_INTERVAL <= 0:
+    raise ValueError(f"SESSION_FLUSH_INTERVAL={SESSION_FLUSH_INTERVAL} должно быть больше 0.")
+
+# Время неактивности, после которого сессия пользователя вытесняется из памяти
+# и его диалог завершается состоянием abandoned, секунды (0 - не вытеснять по времени)
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "3600"))
+# Наибольшее число сессий в памяти; сверх него вытесняется самая давно неактивная (0 - без ограничения)
+SESSION_MAX_RESIDENT = int(os.getenv("SESSION_MAX_RESIDENT", "100000"))
+# Интервал проверки неактивных сессий, секунды
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))
+if SESSION_IDLE_TTL < 0 or SESSION_MAX_RESIDENT < 0 or SESSION_SWEEP_INTERVAL <= 0:
+    raise ValueError("SESSION_IDLE_TTL и SESSION_MAX_RESIDENT не могут быть отрицательными, SESSION_SWEEP_INTERVAL - больше 0.")
+
+# Хранилище статистики диалогов: postgres, sqlite или memory
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").lower()
+if STORAGE_BACKEND not in ("postgres", "sqlite", "memory"):
+    raise ValueError(f"Неизвестное хранилище STORAGE_BACKEND={STORAGE_BACKEND}! Допустимо: postgres, sqlite, memory.")
+
 # Настройки базы данных
 DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
+if STORAGE_BACKEND == "postgres" and not DATABASE_URL:
     raise ValueError("DATABASE_URL не найден! Проверьте .env файл.")
 
+# Файл базы данных SQLite
+SQLITE_PATH = os.getenv("SQLITE_PATH", "mylife3000.sqlite3")
+
+# Режим отложенной записи (write-behind) событий диалога
+DB_WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+# Максимальный размер пачки, записываемой за один сброс
+DB_FLUSH_BATCH_SIZE = int(os.getenv("DB_FLUSH_BATCH_SIZE", "500"))
+# Интервал принудительного сброса очереди, секунды
+DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", "1.0"))
+# Предельная длина очереди; при переполнении новые события отбрасываются
+DB_QUEUE_MAX_SIZE = int(os.getenv("DB_QUEUE_MAX_SIZE", "10000"))
+
+# Каталог локального спула событий на время недоступности БД (пусто - отключено)
+DB_SPOOL_DIR = os.getenv("DB_SPOOL_DIR", "")
+# Предельный размер спула, байты
+DB_SPOOL_MAX_BYTES = int(os.getenv("DB_SPOOL_MAX_BYTES", str(256 * 1024 * 1024)))
+# Минимальный интервал между попытками воспроизведения спула, секунды
+DB_SPOOL_REPLAY_INTERVAL = float(os.getenv("DB_SPOOL_REPLAY_INTERVAL", "5"))
+
+# Автоматический выключатель операций с БД: число ошибок подряд до размыкания
+DB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "5"))
+# Время, на которое выключатель размыкается перед пробным запросом, секунды
+DB_BREAKER_RESET_TIMEOUT = float(os.getenv("DB_BREAKER_RESET_TIMEOUT", "30"))
+# Переопределение бюджетов времени операций, секунды: "start_dialog=0.5,flush=10"
+DB_OPERATION_TIMEOUTS: Dict[str, float] = {
+    name.strip(): float(value)
+    for name, value in (
+        item.split("=", 1) for item in os.getenv("DB_OPERATION_TIMEOUTS", "").split(",") if item.strip()
+    )
+}
+
+# Размер блока ID диалогов, резервируемого из последовательности (0 - без резервирования).
+# Отложенная запись требует резервирования: иначе start_dialog ждет INSERT, а время
+# начала диалога берется из часов БД, тогда как время остальных событий - из часов бота
+DB_ID_BLOCK_SIZE = int(os.getenv("DB_ID_BLOCK_SIZE", "1000" if DB_WRITE_BEHIND else "0"))
+if DB_WRITE_BEHIND and DB_ID_BLOCK_SIZE < 1:
+    raise ValueError(f"DB_ID_BLOCK_SIZE={DB_ID_BLOCK_SIZE} должно быть не меньше 1 при DB_WRITE_BEHIND=true.")
+
+# Обслуживание секций таблиц диалогов: интервал запуска, часы (0 - отключено)
+DB_MAINTENANCE_INTERVAL = float(os.getenv("DB_MAINTENANCE_INTERVAL", "6"))
+# Срок хранения диалогов, дни (0 - хранить бессрочно). По умолчанию история
+# навигации хранится целиком; заданный срок включает удаление секций старше него
+DB_RETENTION_DAYS = int(os.getenv("DB_RETENTION_DAYS", "0"))
+# Количество месячных секций, создаваемых наперед
+DB_PARTITION_PREMAKE = int(os.getenv("DB_PARTITION_PREMAKE", "3"))
+# Отсоединять устаревшие секции в схему conversations_archive вместо удаления
+DB_ARCHIVE_EXPIRED = os.getenv("DB_ARCHIVE_EXPIRED", "false").lower() in ("1", "true", "yes")
+
+# Брошенные диалоги в хранилище: без событий дольше стольких секунд завершаются
+# состоянием abandoned (0 - не завершать); не меньше SESSION_IDLE_TTL
+DB_ABANDONED_AFTER = float(os.getenv("DB_ABANDONED_AFTER", "86400"))
+if DB_ABANDONED_AFTER and DB_ABANDONED_AFTER < SESSION_IDLE_TTL:
+    raise ValueError(f"DB_ABANDONED_AFTER={DB_ABANDONED_AFTER:g} должно быть не меньше SESSION_IDLE_TTL={SESSION_IDLE_TTL:g}.")
+# Интервал поиска брошенных диалогов, секунды
+DB_ABANDONED_SWEEP_INTERVAL = float(os.getenv("DB_ABANDONED_SWEEP_INTERVAL", "3600"))
+# Число диалогов, завершаемых одной транзакцией
+DB_ABANDONED_BATCH_SIZE = int(os.getenv("DB_ABANDONED_BATCH_SIZE", "1000"))
+# Глубина поиска по времени начала диалога, дни
+DB_ABANDONED_LOOKBACK_DAYS = int(os.getenv("DB_ABANDONED_LOOKBACK_DAYS", "7"))
+
+# Интервал вывода метрик в лог, секунды (0 - отключено)
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "0"))
+
+# Режим выбора вопросов: no_repeat - без повторений до исчерпания темы, random - независимый выбор,
+# weighted - независимый выбор по весам редакции и обратной связи пользователей
+QUESTION_SAMPLING = os.getenv("QUESTION_SAMPLING", "no_repeat").lower()
+if QUESTION_SAMPLING not in ("no_repeat", "random", "weighted"):
+    raise ValueError(
+        f"Неизвестный режим QUESTION_SAMPLING={QUESTION_SAMPLING}! Допустимо: no_repeat, random, weighted."
+    )
+# Файл JSON {"текст вопроса": вес} с базовыми весами для режима weighted (пусто - все веса равны 1)
+QUESTION_WEIGHTS_PATH = os.getenv("QUESTION_WEIGHTS_PATH", "")
+# Интервал фонового перестроения таблиц весов, секунды
+QUESTION_WEIGHTS_REBUILD_INTERVAL = float(os.getenv("QUESTION_WEIGHTS_REBUILD_INTERVAL", "10"))
+# Сглаживание множителя обратной связи: чем больше, тем медленнее сигналы меняют вес
+QUESTION_FEEDBACK_PRIOR = float(os.getenv("QUESTION_FEEDBACK_PRIOR", "5"))
+
+# Файл банка вопросов в двоичном формате, см. mylife3000.bankfile (пусто - встроенные вопросы)
+QUESTION_BANK_PATH = os.getenv("QUESTION_BANK_PATH", "")
+# Интервал проверки файла банка на замену, секунды (0 - только командой /reload_questions)
+QUESTION_BANK_RELOAD_INTERVAL = float(os.getenv("QUESTION_BANK_RELOAD_INTERVAL", "30"))
+
+# Число вопросов в ответе на команду /search
+SEARCH_RESULTS_LIMIT = int(os.getenv("SEARCH_RESULTS_LIMIT", "5"))
+
+# Встроенный режим (@бот <слова>): число запросов в кэше результатов бота
+INLINE_QUERY_CACHE_SIZE = int(os.getenv("INLINE_QUERY_CACHE_SIZE", "10000"))
+# Время кэширования ответа на стороне Telegram, секунды
+INLINE_QUERY_CACHE_TIME = int(os.getenv("INLINE_QUERY_CACHE_TIME", "300"))
+# Наименьший интервал между ответами одному пользователю при наборе запроса, секунды (0 - без ограничения)
+INLINE_QUERY_DEBOUNCE = float(os.getenv("INLINE_QUERY_DEBOUNCE", "0.3"))
+# Наибольшее число результатов запроса на всех страницах
+INLINE_QUERY_RESULTS_LIMIT = int(os.getenv("INLINE_QUERY_RESULTS_LIMIT", "100"))
+if INLINE_QUERY_CACHE_SIZE < 1 or INLINE_QUERY_RESULTS_LIMIT < 1 or min(INLINE_QUERY_CACHE_TIME, INLINE_QUERY_DEBOUNCE) < 0:
+    raise ValueError("INLINE_QUERY_CACHE_SIZE и INLINE_QUERY_RESULTS_LIMIT должны быть не меньше 1, "
+                     "INLINE_QUERY_CACHE_TIME и INLINE_QUERY_DEBOUNCE - не отрицательными.")
+
+# Число ближайших соседей вопроса, из которых выбирается "Похожий вопрос"
+SIMILAR_QUESTIONS_K = int(os.getenv("SIMILAR_QUESTIONS_K", "5"))
+if SIMILAR_QUESTIONS_K < 1:
+    raise ValueError(f"SIMILAR_QUESTIONS_K={SIMILAR_QUESTIONS_K} должно быть не меньше 1.")
+
+# Telegram ID пользователей, которым доступны служебные команды: "123,456"
+ADMIN_USER_IDS: FrozenSet[int] = frozenset(
+    int(item) for item in os.getenv("ADMIN_USER_IDS", "").split(",") if item.strip()
+)
+
+# Рассылка "Вопрос дня" подписчикам (/subscribe): время запуска по UTC, ЧЧ:ММ (пусто - отключена)
+BROADCAST_TIME = os.getenv("BROADCAST_TIME", "09:00").strip()
+if BROADCAST_TIME and not re.fullmatch(r"([01]\d|2[0-3]):[0-5]\d", BROADCAST_TIME):
+    raise ValueError(f"BROADCAST_TIME={BROADCAST_TIME} должно быть в формате ЧЧ:ММ.")
+# Число одновременных отправок; частоту ограничивает планировщик исходящих запросов
+BROADCAST_WORKERS = int(os.getenv("BROADCAST_WORKERS", "16"))
+# Число подписчиков, читаемых из хранилища одним запросом
+BROADCAST_PAGE_SIZE = int(os.getenv("BROADCAST_PAGE_SIZE", "1000"))
+# Интервал сохранения прогресса рассылки, секунды
+BROADCAST_CHECKPOINT_INTERVAL = float(os.getenv("BROADCAST_CHECKPOINT_INTERVAL", "5"))
+if BROADCAST_WORKERS < 1 or BROADCAST_PAGE_SIZE < 1 or BROADCAST_CHECKPOINT_INTERVAL <= 0:
+    raise ValueError("BROADCAST_WORKERS и BROADCAST_PAGE_SIZE должны быть не меньше 1, "
+                     "BROADCAST_CHECKPOINT_INTERVAL - больше 0.")
+
+# Клавиатуры меню: reply - новое сообщение с ReplyKeyboardMarkup на каждом шаге,
+# inline - одно сообщение с InlineKeyboardMarkup, которое редактируется при навигации
+KEYBOARD_MODE = os.getenv("KEYBOARD_MODE", "reply").lower()
+if KEYBOARD_MODE not in ("reply", "inline"):
+    raise ValueError(f"Неизвестный режим KEYBOARD_MODE={KEYBOARD_MODE}! Допустимо: reply, inline.")
+
+# Локаль по умолчанию: ru или en; тексты и вопросы - в пакете mylife3000.locales
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "ru").lower()
+if DEFAULT_LOCALE not in ("ru", "en"):
+    raise ValueError(f"Неизвестная локаль DEFAULT_LOCALE={DEFAULT_LOCALE}! Допустимо: ru, en.")
+
 # Определяем состояния диалога
 MAIN_MENU, SECTION_MENU, THEME, RESULT = range(4)
-
-# Главное меню
-MAIN_MENU_KEYBOARD = [
-    ["Самопознание: Кто Я?"], 
-    ["Вектор: Куда я движусь?", "Вызовы: Что мне мешает?"],
-    ["Окружение: Мои отношения?", "Интеграция: Как я живу?"],
-    ["Капсула Времени: История для моих детей"],
-    ["О проекте"]
-]
-
-# Меню раздела
-SECTION_MENU_KEYBOARD = [
-    ["Случайный вопрос"],
-    ["Выбрать тему"],
-    ["Главное меню"]
-]
-
-# Меню результата
-RESULT_MENU_KEYBOARD = [
-    ["Еще вопрос"], 
-    ["Выбрать другую тему"], 
-    ["Главное меню", "Завершить"]
-]
\ No newline at end of file
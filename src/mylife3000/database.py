@@ -4,21 +4,181 @@
 Реализует паттерн Repository для абстракции доступа к данным.
 Использует asyncpg для асинхронного подключения к PostgreSQL.
 
+Поддерживает опциональный режим отложенной записи (write-behind):
+изменения состояния диалогов складываются во внутрипроцессную очередь
+и записываются в БД пачками через ``executemany`` по достижении размера
+пачки или по таймеру, так что обработчики не ждут ответа БД.
+
+Если задан каталог спула, пачки, которые не удалось записать в БД,
+сохраняются в локальный файловый спул и воспроизводятся в БД в исходном
+порядке после ее восстановления.
+
+ID диалогов могут резервироваться блоками из последовательности
+``conversations.dialogs_id_seq`` и выдаваться локально, что избавляет
+``start_dialog`` от запроса ``INSERT ... RETURNING id``.
+
+Состояния диалогов хранятся в БД как коды SMALLINT из справочника
+``conversations.dialog_states``; методы принимают человекочитаемые имена
+состояний и сами переводят их в коды.
+
+Изменения состояния не обновляют строку диалога, а дописываются в журнал
+``conversations.dialog_events`` (только INSERT). Текущее состояние диалога
+вычисляется представлением ``conversations.dialogs_current``.
+
+Таблицы диалогов секционированы по месяцам; фоновая задача обслуживания
+создает будущие секции, сводит устаревшие в дневную статистику и удаляет
+или архивирует их по истечении срока хранения.
+
+Каждая операция с БД выполняется в собственном бюджете времени и проходит
+через автоматический выключатель (circuit breaker): после серии ошибок он
+размыкается, и операции сразу завершаются ``CircuitOpenError``, не нагружая
+деградировавшую БД, пока пробный запрос не подтвердит восстановление.
+
+Подписчики рассылки "Вопрос дня" хранятся в ``broadcast.subscribers``
+(только ID чатов) и читаются страницами по первичному ключу; прогресс
+рассылки каждого дня - в ``broadcast.runs``.
+
 Classes:
+    CircuitOpenError: Исключение отказа операции при разомкнутом выключателе
+    CircuitBreaker: Автоматический выключатель операций с БД
     Database: Основной класс для управления подключением и операциями с БД
 
+Functions:
+    create_storage: Создает хранилище, выбранное конфигурацией
+
 Attributes:
-    db (Database): Глобальный экземпляр базы данных
+    db (Storage): Глобальный экземпляр хранилища
+    REQUIRED_TABLES: Таблицы, наличие которых проверяется при подключении
 """
 
+import asyncio
 import asyncpg
 import logging
-from typing import Optional
-from .config import DATABASE_URL
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from .config import (
+    DATABASE_URL, DB_WRITE_BEHIND, DB_FLUSH_BATCH_SIZE, DB_FLUSH_INTERVAL, DB_QUEUE_MAX_SIZE,
+    DB_SPOOL_DIR, DB_SPOOL_MAX_BYTES, DB_SPOOL_REPLAY_INTERVAL,
+    DB_ID_BLOCK_SIZE, DB_MAINTENANCE_INTERVAL, DB_RETENTION_DAYS, DB_PARTITION_PREMAKE,
+    DB_ARCHIVE_EXPIRED, DB_BREAKER_FAILURE_THRESHOLD, DB_BREAKER_RESET_TIMEOUT, DB_OPERATION_TIMEOUTS,
+    STORAGE_BACKEND, SQLITE_PATH
+)
+from .metrics import metrics
+from .spool import Spool
+from .storage import BroadcastProgress, MemoryStorage, SQLiteStorage, Storage
 
 logger = logging.getLogger(__name__)
 
-class Database:
+# Таблицы, без которых бот не работает, и как создать их в существующей базе:
+# init.sql выполняется только на новом томе
+REQUIRED_TABLES = (
+    ('conversations.dialog_events', "apply data/migrations/001_event_log_partitioning.sql"),
+    ('broadcast.runs', "re-apply data/init.sql"),
+)
+
+# Виды событий диалога в очереди записи
+EVENT_START, EVENT_STATE, EVENT_END = range(3)
+
+# Событие диалога в очереди записи: (вид, dialog_id, состояние, время события)
+DialogEvent = Tuple[int, int, str, datetime]
+
+
+class CircuitOpenError(RuntimeError):
+    """Операция с БД отклонена, так как автоматический выключатель разомкнут."""
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель (circuit breaker) операций с БД.
+    
+    В замкнутом состоянии пропускает все операции и считает ошибки подряд.
+    После ``failure_threshold`` ошибок размыкается и ``reset_timeout`` секунд
+    отклоняет операции без обращения к БД. Затем переходит в полуразомкнутое
+    состояние и пропускает один пробный запрос: успех замыкает выключатель,
+    ошибка снова размыкает его.
+    
+    Attributes:
+        failure_threshold (int): Число ошибок подряд до размыкания
+        reset_timeout (float): Длительность разомкнутого состояния, секунды
+        state (int): Текущее состояние (CLOSED, HALF_OPEN или OPEN)
+    """
+
+    CLOSED, HALF_OPEN, OPEN = range(3)
+    STATE_NAMES = ("closed", "half-open", "open")
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        metrics.gauge("db_breaker_state", lambda: self.state)
+        self._trips = metrics.counter("db_breaker_trips")
+        self._rejected = metrics.counter("db_breaker_rejected")
+
+    @property
+    def trips(self) -> int:
+        """Количество размыканий с момента запуска."""
+        return self._trips.value
+
+    def before_call(self) -> None:
+        """
+        Проверяет, можно ли выполнить операцию.
+        
+        Raises
+        ------
+        CircuitOpenError
+            Если выключатель разомкнут или пробный запрос уже выполняется
+        """
+
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self._rejected.inc()
+                raise CircuitOpenError("Database circuit breaker is open")
+            self.state = self.HALF_OPEN
+            logger.info("Database circuit breaker is half-open, probing")
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self._rejected.inc()
+                raise CircuitOpenError("Database circuit breaker is half-open")
+            self._probe_in_flight = True
+
+    def on_success(self) -> None:
+        """Учитывает успешную операцию."""
+
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            logger.info("Database circuit breaker closed")
+
+    def on_failure(self) -> None:
+        """Учитывает неудачную операцию, при необходимости размыкая выключатель."""
+
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self._failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trips.inc()
+            logger.warning(
+                f"Database circuit breaker opened after {self._failures} failure(s), "
+                f"retry in {self.reset_timeout:g}s"
+            )
+
+    def on_cancel(self) -> None:
+        """Освобождает пробный запрос, отмененный до получения результата."""
+        self._probe_in_flight = False
+
+
+class Database(Storage):
     """
     Класс для управления подключением и операциями с базой данных.
     
@@ -27,10 +187,146 @@ class Database:
     
     Attributes:
         pool (Optional[asyncpg.Pool]): Пул подключений к БД
+        breaker (CircuitBreaker): Автоматический выключатель операций с БД
+        timeouts (Dict[str, float]): Бюджеты времени операций, секунды
+        write_behind (bool): Включен ли режим отложенной записи
+        batch_size (int): Максимальный размер пачки при сбросе очереди
+        flush_interval (float): Интервал сброса очереди по таймеру, секунды
+        max_queue_size (int): Предельная длина очереди событий
+        spool (Optional[Spool]): Локальный спул событий (только в режиме отложенной записи)
+        spool_replay_interval (float): Интервал попыток воспроизведения спула, секунды
+        id_block_size (int): Размер резервируемого блока ID (0 - без резервирования)
+        maintenance_interval (float): Интервал обслуживания секций, часы (0 - отключено)
+        retention_days (int): Срок хранения диалогов, дни (0 - бессрочно)
+        partition_premake (int): Количество месячных секций, создаваемых наперед
+        archive_expired (bool): Архивировать устаревшие секции вместо удаления
     """
-    
-    def __init__(self):
+
+    # Бюджеты времени операций по умолчанию, секунды
+    DEFAULT_TIMEOUTS: Dict[str, float] = {
+        'start_dialog': 1.0,
+        'update_dialog_state': 1.0,
+        'end_dialog': 1.0,
+        'lease_ids': 2.0,
+        'register_states': 10.0,
+        'flush': 5.0,
+        'replay_spool': 30.0,
+        'maintenance': 300.0,
+        'close_abandoned': 30.0,
+        'subscribe': 1.0,
+        'unsubscribe': 1.0,
+        'subscribers': 10.0,
+        'broadcast_progress': 2.0,
+    }
+
+    def __init__(
+        self,
+        write_behind: bool = DB_WRITE_BEHIND,
+        batch_size: int = DB_FLUSH_BATCH_SIZE,
+        flush_interval: float = DB_FLUSH_INTERVAL,
+        max_queue_size: int = DB_QUEUE_MAX_SIZE,
+        spool_dir: str = DB_SPOOL_DIR,
+        spool_max_bytes: int = DB_SPOOL_MAX_BYTES,
+        spool_replay_interval: float = DB_SPOOL_REPLAY_INTERVAL,
+        id_block_size: int = DB_ID_BLOCK_SIZE,
+        maintenance_interval: float = DB_MAINTENANCE_INTERVAL,
+        retention_days: int = DB_RETENTION_DAYS,
+        partition_premake: int = DB_PARTITION_PREMAKE,
+        archive_expired: bool = DB_ARCHIVE_EXPIRED,
+        breaker_failure_threshold: int = DB_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_timeout: float = DB_BREAKER_RESET_TIMEOUT,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        if write_behind and id_block_size < 1:
+            # Без резервирования строка диалога получила бы время часов БД, а его
+            # события из очереди - время часов бота
+            raise ValueError("write-behind mode requires id_block_size of at least 1")
+
         self.pool: Optional[asyncpg.Pool] = None
+        self.breaker = CircuitBreaker(breaker_failure_threshold, breaker_reset_timeout)
+        self.timeouts = {**self.DEFAULT_TIMEOUTS, **DB_OPERATION_TIMEOUTS, **(timeouts or {})}
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.spool: Optional[Spool] = None
+        self.spool_replay_interval = spool_replay_interval
+        self._spool_dir = spool_dir
+        self._spool_max_bytes = spool_max_bytes
+        self._last_replay = 0.0
+        self.id_block_size = id_block_size
+        self.maintenance_interval = maintenance_interval
+        self.retention_days = retention_days
+        self.partition_premake = partition_premake
+        self.archive_expired = archive_expired
+
+        self._queue: Deque[DialogEvent] = deque()
+        # Диалоги, событие начала которых отброшено: их события без строки
+        # диалога не видны в dialogs_current и тоже отбрасываются
+        self._orphaned: Set[int] = set()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        # Остановка фонового сброса: задача дописывает текущую пачку и завершается
+        self._closing = False
+
+        self._state_codes: Dict[str, int] = {}
+
+        self._free_ids: Deque[int] = deque()
+        self._lease_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+        metrics.gauge("db_queue_depth", lambda: len(self._queue))
+        self._enqueued = metrics.counter("db_events_enqueued")
+        self._dropped = metrics.counter("db_events_dropped")
+        self._flushed = metrics.counter("db_events_flushed")
+        self._flush_errors = metrics.counter("db_flush_errors")
+        self._flush_latency = metrics.summary("db_flush_latency_seconds")
+        metrics.gauge("db_spool_bytes", lambda: self.spool.size if self.spool else 0)
+        self._spooled = metrics.counter("db_spool_events_written")
+        self._replayed = metrics.counter("db_spool_events_replayed")
+        self._spool_dropped = metrics.counter("db_spool_events_dropped")
+        metrics.gauge("db_free_dialog_ids", lambda: len(self._free_ids))
+        self._id_leases = metrics.counter("db_id_leases")
+
+    async def _call(self, operation: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполняет операцию с БД через автоматический выключатель в ее бюджете времени.
+        
+        Parameters
+        ----------
+        operation : str
+            Имя операции, ключ в ``timeouts``
+        func : Callable[[], Awaitable[Any]]
+            Функция, выполняющая запросы к БД
+            
+        Returns
+        -------
+        Any
+            Результат ``func``
+            
+        Raises
+        ------
+        CircuitOpenError
+            Если выключатель разомкнут
+        asyncio.TimeoutError
+            Если операция не уложилась в бюджет времени
+        """
+
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(func(), self.timeouts[operation])
+        except asyncio.CancelledError:
+            self.breaker.on_cancel()
+            raise
+        except Exception:
+            self.breaker.on_failure()
+            metrics.counter(f"db_{operation}_failures").inc()
+            raise
+        self.breaker.on_success()
+        metrics.summary(f"db_{operation}_latency_seconds").observe(time.perf_counter() - started)
+        return result
 
     async def init_pool(self):
         """
@@ -53,9 +349,30 @@ class Database:
             
             # Проверяем подключение к БД
             async with self.pool.acquire() as conn:
-                # Простая проверка, что таблица существует
-                await conn.fetchval('SELECT 1 FROM conversations.dialogs LIMIT 1')
+                # Схема прежней версии не дает записывать события, поэтому
+                # запуск прерывается сразу, а не ошибками каждой операции
+                for table, fix in REQUIRED_TABLES:
+                    if not await conn.fetchval('SELECT to_regclass($1) IS NOT NULL', table):
+                        raise RuntimeError(f"Database schema is outdated: {table} does not exist, {fix}")
                 logger.info("Database tables verified")
+
+                rows = await conn.fetch('SELECT code, name FROM conversations.dialog_states')
+                self._state_codes = {row['name']: row['code'] for row in rows}
+
+            if self.id_block_size > 0:
+                await self._lease_ids()
+
+            if self.write_behind:
+                if self._spool_dir:
+                    self.spool = Spool(self._spool_dir, self._spool_max_bytes)
+                self._closing = False
+                self._flush_task = asyncio.create_task(self._flush_loop())
+                logger.info("Database write-behind mode enabled")
+            elif self._spool_dir:
+                logger.warning("DB_SPOOL_DIR is ignored without DB_WRITE_BEHIND")
+
+            if self.maintenance_interval > 0:
+                self._maintenance_task = asyncio.create_task(self._maintenance_loop())
                 
         except Exception as e:
             logger.error(f"Error initializing database pool: {e}")
@@ -79,15 +396,89 @@ class Database:
 
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
-            
-        async with self.pool.acquire() as conn:
-            dialog_id = await conn.fetchval('''
-                INSERT INTO conversations.dialogs (dialog_state) 
-                VALUES ($1)
-                RETURNING id
-            ''', 'started')
+
+        if self.id_block_size > 0:
+            dialog_id = await self._next_dialog_id()
+            if self.write_behind:
+                self._enqueue((EVENT_START, dialog_id, 'started', datetime.now(timezone.utc)))
+            else:
+                async def insert_leased():
+                    async with self.pool.acquire() as conn:
+                        await conn.execute('''
+                            WITH dialog AS (
+                                INSERT INTO conversations.dialogs (id)
+                                VALUES ($1)
+                                RETURNING id, start_time
+                            )
+                            INSERT INTO conversations.dialog_events (dialog_id, ts, state_code)
+                            SELECT id, start_time, $2 FROM dialog
+                        ''', dialog_id, await self._state_code(conn, 'started'))
+
+                await self._call('start_dialog', insert_leased)
             return dialog_id
 
+        async def insert():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval('''
+                    WITH dialog AS (
+                        INSERT INTO conversations.dialogs DEFAULT VALUES
+                        RETURNING id, start_time
+                    )
+                    INSERT INTO conversations.dialog_events (dialog_id, ts, state_code)
+                    SELECT id, start_time, $1 FROM dialog
+                    RETURNING dialog_id
+                ''', await self._state_code(conn, 'started'))
+
+        return await self._call('start_dialog', insert)
+
+    async def _next_dialog_id(self) -> int:
+        """
+        Выдает очередной ID диалога из зарезервированного блока.
+
+        Блок пополняется заранее в фоне, когда в нем остается меньше
+        четверти ID; при полном исчерпании ожидает резервирования нового блока.
+        """
+
+        if not self._free_ids:
+            if self._lease_task:
+                await self._lease_task
+            if not self._free_ids:
+                await self._lease_ids()
+        dialog_id = self._free_ids.popleft()
+
+        if len(self._free_ids) < self.id_block_size // 4 and not self._lease_task:
+            self._lease_task = asyncio.create_task(self._refill_ids())
+        return dialog_id
+
+    async def _refill_ids(self):
+        """Фоновое пополнение блока ID диалогов."""
+
+        try:
+            await self._lease_ids()
+        except Exception as e:
+            logger.error(f"Error leasing dialog ids: {e}")
+        finally:
+            self._lease_task = None
+
+    async def _lease_ids(self):
+        """
+        Резервирует блок из ``id_block_size`` ID в последовательности диалогов.
+
+        Значения ``nextval`` уникальны для всех процессов, поэтому несколько
+        экземпляров бота могут резервировать блоки независимо.
+        """
+
+        async def lease():
+            async with self.pool.acquire() as conn:
+                return await conn.fetch('''
+                    SELECT nextval('conversations.dialogs_id_seq')
+                    FROM generate_series(1, $1)
+                ''', self.id_block_size)
+
+        ids = await self._call('lease_ids', lease)
+        self._free_ids.extend(row[0] for row in ids)
+        self._id_leases.inc()
+
     async def end_dialog(self, dialog_id: int, state: str = 'completed'):
         """
         Отмечает диалог как завершенный.
@@ -107,13 +498,19 @@ class Database:
 
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
+
+        if self.write_behind:
+            self._enqueue((EVENT_END, dialog_id, state, datetime.now(timezone.utc)))
+            return
             
-        async with self.pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE conversations.dialogs 
-                SET end_time = CURRENT_TIMESTAMP, dialog_state = $1
-                WHERE id = $2
-            ''', state, dialog_id)
+        async def insert():
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO conversations.dialog_events (dialog_id, state_code, ended)
+                    VALUES ($1, $2, TRUE)
+                ''', dialog_id, await self._state_code(conn, state))
+
+        await self._call('end_dialog', insert)
 
     async def update_dialog_state(self, dialog_id: int, state: str):
         """
@@ -134,19 +531,584 @@ class Database:
         
         if not self.pool:
             raise RuntimeError("Database pool not initialized")
+
+        if self.write_behind:
+            self._enqueue((EVENT_STATE, dialog_id, state, datetime.now(timezone.utc)))
+            return
             
-        async with self.pool.acquire() as conn:
-            await conn.execute('''
-                UPDATE conversations.dialogs 
-                SET dialog_state = $1
-                WHERE id = $2
-            ''', state, dialog_id)
+        async def insert():
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO conversations.dialog_events (dialog_id, state_code)
+                    VALUES ($1, $2)
+                ''', dialog_id, await self._state_code(conn, state))
+
+        await self._call('update_dialog_state', insert)
+
+    async def register_states(self, names: Iterable[str]):
+        """
+        Заносит состояния диалогов в справочник ``conversations.dialog_states``.
+
+        Вызывается при запуске с полным списком состояний, построенным
+        по разделам и темам ``Questionary``, чтобы коды были назначены заранее.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            Имена состояний диалога
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def register():
+            async with self.pool.acquire() as conn:
+                await self._resolve_states(conn, names)
+
+        await self._call('register_states', register)
+
+    async def _state_code(self, conn: asyncpg.Connection, name: str) -> int:
+        """Возвращает код состояния, при необходимости регистрируя его в справочнике."""
+
+        code = self._state_codes.get(name)
+        if code is None:
+            await self._resolve_states(conn, [name])
+            code = self._state_codes[name]
+        return code
+
+    async def _resolve_states(self, conn: asyncpg.Connection, names: Iterable[str]):
+        """
+        Дополняет кэш кодов состояний, регистрируя неизвестные имена одним запросом.
+
+        Вставляются только отсутствующие имена, чтобы не расходовать значения
+        последовательности кодов на конфликтующие вставки.
+        """
+
+        missing = sorted({name for name in names if name not in self._state_codes})
+        if not missing:
+            return
+
+        rows = await conn.fetch('''
+            WITH inserted AS (
+                INSERT INTO conversations.dialog_states (name)
+                SELECT n.name FROM unnest($1::text[]) AS n(name)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM conversations.dialog_states s WHERE s.name = n.name
+                )
+                ON CONFLICT (name) DO NOTHING
+                RETURNING code, name
+            )
+            SELECT code, name FROM inserted
+            UNION ALL
+            SELECT code, name FROM conversations.dialog_states WHERE name = ANY($1::text[])
+        ''', missing)
+        self._state_codes.update((row['name'], row['code']) for row in rows)
+
+    def _enqueue(self, event: DialogEvent) -> None:
+        """
+        Помещает событие диалога в очередь отложенной записи.
+
+        При переполнении очереди событие отбрасывается, чтобы обработчик
+        не ждал БД; отброшенные события учитываются счетчиком ``db_events_dropped``.
+        Если отброшено начало диалога, отбрасываются и все его последующие события.
+        """
+
+        kind, dialog_id = event[0], event[1]
+        if dialog_id in self._orphaned:
+            if kind == EVENT_END:
+                self._orphaned.discard(dialog_id)
+            self._dropped.inc()
+            return
+
+        if len(self._queue) >= self.max_queue_size:
+            logger.warning(f"Write-behind queue is full, dropping event for dialog {dialog_id}")
+            self._drop([event])
+            return
+
+        self._queue.append(event)
+        self._enqueued.inc()
+        if len(self._queue) >= self.batch_size:
+            self._flush_wakeup.set()
+
+    def _drop(self, events: List[DialogEvent]) -> None:
+        """Учитывает события, отброшенные из очереди, и отбрасывает события их диалогов."""
+
+        self._dropped.inc(len(events))
+        self._drop_orphans(events)
+
+    def _drop_orphans(self, events: List[DialogEvent]) -> None:
+        """
+        Отбрасывает события диалогов, начало которых есть среди отброшенных ``events``.
+
+        Начало диалога предшествует его остальным событиям, поэтому они
+        находятся среди ``events`` или позже в очереди: из очереди они
+        удаляются, а незавершенные диалоги запоминаются, чтобы ``_enqueue``
+        отбрасывал и их следующие события.
+        """
+
+        started = {dialog_id for kind, dialog_id, _, _ in events if kind == EVENT_START}
+        if not started:
+            return
+
+        orphans = [event for event in self._queue if event[1] in started]
+        if orphans:
+            self._queue = deque(event for event in self._queue if event[1] not in started)
+            self._dropped.inc(len(orphans))
+        ended = {dialog_id for kind, dialog_id, _, _ in (*events, *orphans) if kind == EVENT_END}
+        self._orphaned |= started - ended
+
+    async def _flush_loop(self):
+        """
+        Фоновая задача, сбрасывающая очередь по размеру пачки или по таймеру.
+
+        Задача не отменяется, а завершается после флага ``_closing``: пачка,
+        снятая с очереди, записывается до конца, а не теряется при откате
+        прерванной транзакции.
+        """
+
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+
+            try:
+                if self.spool and self.spool.pending and \
+                        time.monotonic() - self._last_replay >= self.spool_replay_interval:
+                    await self.replay_spool()
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing write-behind queue: {e}")
+
+    async def flush(self):
+        """
+        Записывает накопленные события диалогов в БД пачками.
+
+        События одной пачки записываются в одной транзакции. Если пачку не
+        удалось записать, а спул включен, она сохраняется в спул; пока спул
+        не воспроизведен, в него же уходят и следующие пачки, чтобы не нарушить
+        порядок событий. Без спула пачка возвращается в начало очереди,
+        и исключение пробрасывается.
+        """
+
+        async with self._flush_lock:
+            while self._queue and self.pool:
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+                if self.spool and self.spool.pending:
+                    await self._spool_batch(batch)
+                    continue
+
+                async def write():
+                    async with self.pool.acquire() as conn:
+                        async with conn.transaction():
+                            await self._write_batch(conn, batch)
+
+                started = time.perf_counter()
+                try:
+                    await self._call('flush', write)
+                except Exception as e:
+                    self._flush_errors.inc()
+                    if self.spool:
+                        logger.warning(f"Error flushing write-behind queue, spooling batch: {e}")
+                        self._last_replay = time.monotonic()
+                        await self._spool_batch(batch)
+                        continue
+                    # Возвращаем пачку в начало очереди, соблюдая ее предельную длину
+                    overflow = len(self._queue) + len(batch) - self.max_queue_size
+                    if overflow > 0:
+                        self._drop(batch[len(batch) - overflow:])
+                        del batch[len(batch) - overflow:]
+                    self._queue.extendleft(reversed(batch))
+                    raise
+                self._flush_latency.observe(time.perf_counter() - started)
+                self._flushed.inc(len(batch))
+
+    async def _spool_batch(self, batch: List[DialogEvent]):
+        """Сохраняет пачку в спул; при переполнении спула пачка отбрасывается."""
+
+        try:
+            written = await asyncio.to_thread(self.spool.append, batch)
+        except OSError as e:
+            logger.error(f"Error writing spool: {e}")
+            written = False
+        if written:
+            self._spooled.inc(len(batch))
+        else:
+            self._spool_dropped.inc(len(batch))
+            logger.warning(f"Spool is full, dropping {len(batch)} event(s)")
+            self._drop_orphans(batch)
+
+    async def replay_spool(self):
+        """
+        Воспроизводит сегменты спула в БД в порядке их записи.
+
+        Каждый сегмент записывается в одной транзакции и удаляется после
+        фиксации. При первой ошибке воспроизведение прекращается до следующей попытки.
+        """
+
+        self._last_replay = time.monotonic()
+        async with self._flush_lock:
+            for name in await asyncio.to_thread(self.spool.segments):
+                events = await asyncio.to_thread(self.spool.read, name)
+
+                async def write():
+                    async with self.pool.acquire() as conn:
+                        async with conn.transaction():
+                            for start in range(0, len(events), self.batch_size):
+                                await self._write_batch(conn, events[start:start + self.batch_size])
+
+                try:
+                    await self._call('replay_spool', write)
+                except Exception as e:
+                    logger.warning(f"Spool replay postponed: {e}")
+                    return
+                await asyncio.to_thread(self.spool.remove, name)
+                self._replayed.inc(len(events))
+            logger.info("Spool replayed into database")
+
+    async def _write_batch(self, conn: asyncpg.Connection, batch: List[DialogEvent]):
+        """
+        Записывает пачку событий: новые диалоги через ``executemany``,
+        события в журнал ``dialog_events`` через ``COPY``.
+
+        Обе таблицы только дополняются, поэтому порядок записи внутри пачки
+        не важен: последовательность событий диалога определяется их временем.
+        """
+
+        await self._resolve_states(conn, (event[2] for event in batch))
+        codes = self._state_codes
+
+        dialogs = [(dialog_id, ts) for kind, dialog_id, _, ts in batch if kind == EVENT_START]
+        if dialogs:
+            await conn.executemany('''
+                INSERT INTO conversations.dialogs (id, start_time)
+                VALUES ($1, $2)
+                ON CONFLICT DO NOTHING
+            ''', dialogs)
+        await conn.copy_records_to_table(
+            'dialog_events',
+            schema_name='conversations',
+            columns=('dialog_id', 'ts', 'state_code', 'ended'),
+            records=[
+                (dialog_id, ts, codes[state], kind == EVENT_END)
+                for kind, dialog_id, state, ts in batch
+            ],
+        )
+
+    async def close_abandoned(self, idle: timedelta, lookback: timedelta, limit: int) -> int:
+        """
+        Завершает состоянием ``abandoned`` до ``limit`` брошенных диалогов.
+
+        Выполняет функцию ``conversations.close_abandoned`` одной короткой
+        транзакцией: в журнал дописываются события завершения диалогов,
+        начатых не раньше ``lookback`` назад, не завершенных и без событий
+        за последние ``idle``.
+
+        Parameters
+        ----------
+        idle : timedelta
+            Время без событий, после которого диалог считается брошенным
+        lookback : timedelta
+            Глубина поиска по времени начала диалога
+        limit : int
+            Наибольшее число диалогов за вызов
+
+        Returns
+        -------
+        int
+            Число завершенных диалогов
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def close():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    'SELECT conversations.close_abandoned($1, $2, $3)', idle, lookback, limit
+                )
+
+        return await self._call('close_abandoned', close)
+
+    async def subscribe(self, chat_id: int) -> bool:
+        """
+        Подписывает чат на рассылку "Вопрос дня".
+
+        Вставка с ``ON CONFLICT DO NOTHING``: повторная подписка не меняет
+        таблицу и не считается ошибкой.
+
+        Parameters
+        ----------
+        chat_id : int
+            ID чата
+
+        Returns
+        -------
+        bool
+            True, если подписка добавлена; False, если чат уже подписан
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def insert():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    'INSERT INTO broadcast.subscribers (chat_id) VALUES ($1) '
+                    'ON CONFLICT DO NOTHING RETURNING TRUE', chat_id
+                )
+
+        return bool(await self._call('subscribe', insert))
+
+    async def unsubscribe(self, chat_id: int) -> bool:
+        """
+        Отписывает чат от рассылки "Вопрос дня".
+
+        Parameters
+        ----------
+        chat_id : int
+            ID чата
+
+        Returns
+        -------
+        bool
+            True, если подписка удалена; False, если чат не был подписан
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def delete():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    'DELETE FROM broadcast.subscribers WHERE chat_id = $1 RETURNING TRUE', chat_id
+                )
+
+        return bool(await self._call('unsubscribe', delete))
+
+    async def subscribers_after(self, position: int, limit: int) -> List[int]:
+        """
+        Возвращает до ``limit`` ID подписанных чатов больше ``position``.
+
+        Страница читается по индексу первичного ключа отдельным коротким
+        запросом: рассылка большого списка с ограничением частоты Telegram
+        идет десятки минут, и курсор в открытой транзакции занимал бы
+        подключение пула и удерживал горизонт очистки все это время.
+
+        Parameters
+        ----------
+        position : int
+            ID последнего обработанного чата
+        limit : int
+            Размер страницы
+
+        Returns
+        -------
+        List[int]
+            ID чатов по возрастанию
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def select():
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch(
+                    'SELECT chat_id FROM broadcast.subscribers WHERE chat_id > $1 ORDER BY chat_id LIMIT $2',
+                    position, limit
+                )
+            return [row['chat_id'] for row in rows]
+
+        return await self._call('subscribers', select)
+
+    async def load_broadcast(self, day: date) -> Optional[BroadcastProgress]:
+        """
+        Читает прогресс рассылки дня из ``broadcast.runs``.
+
+        Parameters
+        ----------
+        day : date
+            День рассылки
+
+        Returns
+        -------
+        Optional[BroadcastProgress]
+            Сохраненный прогресс или None, если рассылка дня еще не начиналась
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def select():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchrow(
+                    'SELECT question, position, sent, failed, finished FROM broadcast.runs WHERE day = $1', day
+                )
+
+        row = await self._call('broadcast_progress', select)
+        if row is None:
+            return None
+        return BroadcastProgress(day, row['question'], row['position'], row['sent'], row['failed'], row['finished'])
+
+    async def save_broadcast(self, progress: BroadcastProgress):
+        """
+        Сохраняет прогресс рассылки дня.
+
+        Первое сохранение создает строку дня вместе с вопросом; следующие
+        (``ON CONFLICT (day) DO UPDATE``) меняют позицию, счетчики и признак
+        завершения, но не вопрос: продолжение рассылки отправляет тот же
+        вопрос, даже если банк перезагружен.
+
+        Parameters
+        ----------
+        progress : BroadcastProgress
+            Прогресс рассылки
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        async def upsert():
+            async with self.pool.acquire() as conn:
+                await conn.execute('''
+                    INSERT INTO broadcast.runs (day, question, position, sent, failed, finished)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (day) DO UPDATE SET
+                        position = EXCLUDED.position, sent = EXCLUDED.sent, failed = EXCLUDED.failed,
+                        finished = EXCLUDED.finished, updated_at = CURRENT_TIMESTAMP
+                ''', *progress)
+
+        await self._call('broadcast_progress', upsert)
+
+    async def run_maintenance(self) -> int:
+        """
+        Обслуживает секции таблиц диалогов.
+
+        Создает месячные секции наперед, а секции старше срока хранения
+        сводит в ``conversations.dialog_daily_stats`` и удаляет либо
+        отсоединяет в схему ``conversations_archive``.
+
+        Returns
+        -------
+        int
+            Количество обработанных устаревших месяцев
+
+        Raises
+        ------
+        RuntimeError
+            Если пул подключений не инициализирован
+        """
+
+        if not self.pool:
+            raise RuntimeError("Database pool not initialized")
+
+        retention = timedelta(days=self.retention_days) if self.retention_days > 0 else None
+        async def maintain():
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    'SELECT conversations.maintain_partitions($1, $2, $3)',
+                    retention, self.partition_premake, self.archive_expired
+                )
+
+        return await self._call('maintenance', maintain)
+
+    async def _maintenance_loop(self):
+        """Фоновая задача периодического обслуживания секций."""
+
+        while True:
+            try:
+                expired = await self.run_maintenance()
+                if expired:
+                    logger.info(f"Partition maintenance processed {expired} expired month(s)")
+            except Exception as e:
+                logger.error(f"Error running partition maintenance: {e}")
+            await asyncio.sleep(self.maintenance_interval * 3600)
 
     async def close(self):
-        """Закрытие пула подключений"""
+        """Закрытие пула подключений с предварительным сбросом очереди записи"""
+        if self._flush_task:
+            # Задача сброса завершает начатую пачку и выходит из цикла
+            self._closing = True
+            self._flush_wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+
+        # Прерванное резервирование оставляет лишь пропуск в последовательности ID,
+        # а прерванное обслуживание секций откатывается; обе задачи дожидаются
+        # отмены до закрытия пула
+        for task in (self._lease_task, self._maintenance_task):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._lease_task = None
+        self._maintenance_task = None
+
+        if self.pool and self._queue:
+            try:
+                await self.flush()
+                logger.info("Write-behind queue flushed")
+            except Exception as e:
+                logger.error(f"Error flushing write-behind queue on shutdown: {e}")
+
+        if self.spool:
+            self.spool.close()
+
         if self.pool:
             await self.pool.close()
             logger.info("Database connection pool closed")
 
-# Глобальный экземпляр базы данных
-db = Database()
\ No newline at end of file
+def create_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    """
+    Создает хранилище статистики диалогов, выбранное конфигурацией.
+
+    Parameters
+    ----------
+    backend : str
+        Тип хранилища: postgres, sqlite или memory
+
+    Returns
+    -------
+    Storage
+        Экземпляр хранилища
+    """
+    if backend == "memory":
+        return MemoryStorage()
+    if backend == "sqlite":
+        return SQLiteStorage(SQLITE_PATH)
+    return Database()
+
+
+# Глобальный экземпляр хранилища
+db = create_storage()
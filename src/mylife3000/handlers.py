@@ -13,28 +13,60 @@ Functions:
     handle_theme_choice: Обработка выбора темы
     handle_result_choice: Обработка действий после показа вопроса
     cancel: Завершение диалога
+    session_expired: Ответ на сообщение или нажатие кнопки вне диалога
+    navigate: Инлайн-навигация редактированием одного сообщения
+    use_buttons: Ответ на текст во время инлайн-диалога
+    edit_menu: Замена текста и клавиатуры сообщения меню
+    begin_dialog: Утилита для начала диалога в БД
+    log_dialog_state: Утилита для записи состояния диалога в БД
     end_dialog: Утилита для завершения диалога в БД
+    next_question: Выбор вопроса в режиме, заданном конфигурацией
+    similar_question: Выбор вопроса, похожего на показанный
+    question_weights: Веса вопросов локали для режима weighted
+    record_feedback: Учет действия пользователя после показа вопроса
+    reload_question_bank: Загрузка новой версии банка вопросов из файла
+    reload_questions: Служебная команда перезагрузки банка вопросов
+    dialog_state_names: Перечень состояний диалога для справочника в БД
+    user_catalogue: Каталог локали пользователя
+    set_language: Выбор языка командой /language
+    search_questions: Поиск вопросов по словам командой /search
+    subscribe: Подписка чата на рассылку "Вопрос дня" командой /subscribe
+    unsubscribe: Отписка чата от рассылки командой /unsubscribe
 """
 
+import asyncio
 import logging
 import random
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
-from telegram import ReplyKeyboardMarkup, ReplyKeyboardRemove, Update
+from telegram import CallbackQuery, InlineKeyboardMarkup, ReplyKeyboardRemove, Update
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes, ConversationHandler
 
 from .config import (
-    MAIN_MENU, SECTION_MENU, THEME, RESULT,
-    MAIN_MENU_KEYBOARD, SECTION_MENU_KEYBOARD, RESULT_MENU_KEYBOARD
+    MAIN_MENU, SECTION_MENU, THEME, RESULT, QUESTION_SAMPLING, QUESTION_BANK_PATH, ADMIN_USER_IDS,
+    SEARCH_RESULTS_LIMIT, SIMILAR_QUESTIONS_K, DEFAULT_LOCALE, KEYBOARD_MODE, BROADCAST_TIME
 )
+from . import navigation
+from .bankfile import BankFormatError, read_bank
 from .database import db
-from .questionary import Questionary
+from .locales import SUPPORTED_LOCALES, Catalogue, get_catalogue, resolve_locale
+from .questionary import QuestionBank, Questionary
+from .search import build_search_index
+from .similarity import build_neighbour_table
+from .weighting import QuestionWeights
 
 logger = logging.getLogger(__name__)
 
+# Разметки Telegram неизменяемы, поэтому один объект используется во всех ответах
+REMOVE_KEYBOARD = ReplyKeyboardRemove()
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
     Инициализирует новый диалог и показывает главное меню.
+
+    В режиме KEYBOARD_MODE=inline меню показывается с инлайн-клавиатурой,
+    и дальнейшая навигация редактирует это сообщение (см. ``navigate``).
     
     Parameters
     ----------
@@ -48,27 +80,12 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     int
         Следующее состояние диалога (MAIN_MENU)
     """
-    user = update.effective_user
-    
-    try:
-        # Логируем начало диалога в БД (без персональных данных)
-        dialog_id = await db.start_dialog()
-        context.user_data['dialog_id'] = dialog_id
-        logger.info(f"Started dialog {dialog_id}")
-        
-    except Exception as e:
-        logger.error(f"Error logging dialog start: {e}")
-        # Продолжаем работу даже если логирование не удалось
+    catalogue = user_catalogue(update, context)
+    await begin_dialog(context)
 
     await update.message.reply_text(
-        "Я предложу тебе поразмышлять над вопросами о себе для саморазвития и мемуаров\n\n"
-        "Бот не сохраняет ответы и персональные данные.\n\n"
-        "Отправь /cancel чтобы завершить диалог.\n\n"
-        "Выбери раздел:",
-        reply_markup=ReplyKeyboardMarkup(
-            MAIN_MENU_KEYBOARD, 
-            input_field_placeholder="Выбери раздел"
-        ),
+        catalogue.text('greeting'),
+        reply_markup=catalogue.inline().main_menu if KEYBOARD_MODE == 'inline' else catalogue.render().main_menu,
     )
     return MAIN_MENU
 
@@ -89,56 +106,31 @@ async def handle_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         Следующее состояние диалога или ConversationHandler.END
     """
     user_choice = update.message.text
-    
-    questionary: Questionary = context.bot_data['questionary']
-    
-    if user_choice in questionary.get_all_sections():
+
+    catalogue = user_catalogue(update, context)
+    questionary = catalogue.questionary
+
+    # Разделы и кнопки локали проверяются обращением к словарю
+    if questionary.has_section(user_choice):
         context.user_data['current_section'] = user_choice
-        
-        # Обновляем состояние диалога
-        try:
-            if 'dialog_id' in context.user_data:
-                await db.update_dialog_state(context.user_data['dialog_id'], f'section_{user_choice}')
-        except Exception as e:
-            logger.error(f"Error updating dialog state: {e}")
-            
-        return await show_section_menu(update, context, questionary)
-    elif user_choice == "О проекте":
+        await log_dialog_state(context, f'section_{user_choice}')
+
+        return await show_section_menu(update, context, catalogue)
+    elif catalogue.action(user_choice) == 'about_button':
         # Завершаем диалог при выборе "О проекте"
         await end_dialog(context, 'project_info')
         await update.message.reply_text(
-"""
-
-Привет! 
-Этот бот — твой личный проводник в мире саморефлексии. 
-Мы собрали глубокие и иногда неожиданные вопросы, чтобы помочь тебе лучше узнать себя и создать живые мемуары, которые не напишешь по шаблону.
-
-Как с этим работать? Всё просто:
-    1. Выбирай тему, которая откликается тебе прямо сейчас.
-    2. Получай карточку с вопросом. 
-        Не торопись, дай себе время ощутить его.
-    3. Отвечай так, как чувствуешь. 
-        У нас нет готовых кнопок для ответа. 
-        Ты можешь:
-            • Запись мыслей в свой бумажный дневник 📓
-            • Наговорить искреннее голосовое сообщение 🎙️
-            • Снять размышление на видео 🎥
-            • Просто подумать над этим за чашкой чая ☕
-
-Бот просто задаёт вопросы — твои ответы принадлежат только тебе.
-Бот НЕ сохраняет, НЕ анализирует и НЕ имеет доступа к твоим размышлениям. Ты можешь быть абсолютно откровенным.
-Готов исследовать свои мысли? 
-Жми /start!""",
-            reply_markup=ReplyKeyboardRemove()
+            catalogue.text('about'),
+            reply_markup=REMOVE_KEYBOARD
         )
         return ConversationHandler.END
     else:
         await update.message.reply_text(
-            "Пожалуйста, выбери один из предложенных разделов"
+            catalogue.text('invalid_section')
         )
         return MAIN_MENU
 
-async def show_section_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, questionary: Questionary) -> int:
+async def show_section_menu(update: Update, context: ContextTypes.DEFAULT_TYPE, catalogue: Catalogue) -> int:
     """
     Показывает меню выбранного раздела с описанием.
     
@@ -148,8 +140,8 @@ async def show_section_menu(update: Update, context: ContextTypes.DEFAULT_TYPE,
         Объект обновления от Telegram API
     context : ContextTypes.DEFAULT_TYPE
         Контекст выполнения обработчика
-    questionary : Questionary
-        Экземпляр Questionary для доступа к описаниям разделов
+    catalogue : Catalogue
+        Каталог локали пользователя для доступа к текстам и описаниям разделов
         
     Returns
     -------
@@ -159,16 +151,12 @@ async def show_section_menu(update: Update, context: ContextTypes.DEFAULT_TYPE,
 
     section_name = context.user_data['current_section']
     
-    description = questionary.get_section_description(section_name)
+    text = catalogue.render().section_texts.get(section_name)
+    if text is None:
+        # Раздел исчез из банка вопросов после перезагрузки
+        text = catalogue.text('section_menu', description="")
 
-    await update.message.reply_text(
-        f"{description}\n\n"
-        "Выбери действие:",
-        reply_markup=ReplyKeyboardMarkup(
-            SECTION_MENU_KEYBOARD, 
-            input_field_placeholder="Выбор действия"
-        ),
-    )
+    await update.message.reply_text(text, reply_markup=catalogue.section_menu_markup)
     return SECTION_MENU
 
 async def handle_section_choice(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
@@ -188,39 +176,38 @@ async def handle_section_choice(update: Update, context: ContextTypes.DEFAULT_TY
         Следующее состояние диалога или ConversationHandler.END
     """
 
-    user_choice = update.message.text
-    questionary: Questionary = context.bot_data['questionary']
+    catalogue = user_catalogue(update, context)
+    action = catalogue.action(update.message.text)
     section_name = context.user_data.get('current_section')
     
-    if user_choice == "Главное меню":
+    if action == 'main_menu_button':
         return await start(update, context)
-    elif user_choice == "Случайный вопрос":
+    elif action == 'random_button':
         if section_name:
-            random_question = questionary.get_random_question(section_name)
+            random_question = next_question(context, catalogue, section_name)
             if random_question:
                 await update.message.reply_text(
-                    f"📖 {random_question}\n\n"
-                    "Хочешь еще вопрос? Отправь /start",
-                    reply_markup=ReplyKeyboardRemove()
+                    catalogue.text('random_question', question=random_question),
+                    reply_markup=REMOVE_KEYBOARD
                 )
                 await end_dialog(context, 'random_question')
                 return ConversationHandler.END
         
         # Если что-то пошло не так
         await update.message.reply_text(
-            "Произошла ошибка при выборе вопроса. Попробуй еще раз.",
-            reply_markup=ReplyKeyboardMarkup(SECTION_MENU_KEYBOARD)
+            catalogue.text('question_error'),
+            reply_markup=catalogue.section_menu_markup
         )
         return SECTION_MENU
-    elif user_choice == "Выбрать тему":
-        return await theme_choice(update, context, questionary)
+    elif action == 'choose_theme_button':
+        return await theme_choice(update, context, catalogue)
     else:
         await update.message.reply_text(
-            "Пожалуйста, выбери один из предложенных вариантов"
+            catalogue.text('invalid_option')
         )
         return SECTION_MENU
 
-async def theme_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, questionary: Questionary) -> int:
+async def theme_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, catalogue: Catalogue) -> int:
     """
     Предлагает пользователю выбор темы в текущем разделе.
     
@@ -230,8 +217,8 @@ async def theme_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, quest
         Объект обновления от Telegram API
     context : ContextTypes.DEFAULT_TYPE
         Контекст выполнения обработчика
-    questionary : Questionary
-        Экземпляр Questionary для доступа к темам
+    catalogue : Catalogue
+        Каталог локали пользователя для доступа к темам
         
     Returns
     -------
@@ -240,18 +227,13 @@ async def theme_choice(update: Update, context: ContextTypes.DEFAULT_TYPE, quest
     """
 
     section_name = context.user_data.get('current_section')
-    if not section_name:
+    if not section_name or not catalogue.questionary.get_themes(section_name):
+        # Раздела нет или он исчез из банка вопросов после перезагрузки
         return await start(update, context)
-        
-    themes = questionary.get_themes(section_name)
-    reply_keyboard = [[theme] for theme in themes] + [["Назад", "Главное меню"]]
 
     await update.message.reply_text(
-        "🎯 Выбери тему вопросов:",
-        reply_markup=ReplyKeyboardMarkup(
-            reply_keyboard, 
-            input_field_placeholder="Выбор темы"
-        ),
+        catalogue.text('choose_theme'),
+        reply_markup=catalogue.render().theme_menus[section_name],
     )
     return THEME
 
@@ -273,46 +255,42 @@ async def handle_theme_choice(update: Update, context: ContextTypes.DEFAULT_TYPE
     """
 
     theme = update.message.text
-    questionary: Questionary = context.bot_data['questionary']
+    catalogue = user_catalogue(update, context)
+    questionary = catalogue.questionary
     section_name = context.user_data.get('current_section')
     
     if not section_name:
         return await start(update, context)
     
-    if theme == "Главное меню":
+    action = catalogue.action(theme)
+    if action == 'main_menu_button':
         return await start(update, context)
-    elif theme == "Назад":
-        return await show_section_menu(update, context, questionary)
+    elif action == 'back_button':
+        return await show_section_menu(update, context, catalogue)
     
     # Проверяем, что тема существует в выбранном разделе
     themes = questionary.get_themes(section_name)
     if theme in themes:
-        question = questionary.get_random_question(section_name, theme)
+        question = next_question(context, catalogue, section_name, theme)
         
         if question:
-            # Обновляем состояние диалога
-            try:
-                if 'dialog_id' in context.user_data:
-                    await db.update_dialog_state(context.user_data['dialog_id'], f'theme_{theme}')
-            except Exception as e:
-                logger.error(f"Error updating dialog state: {e}")
-            
+            await log_dialog_state(context, f'theme_{theme}')
             await update.message.reply_text(
-                f"📖 {question}\n\n"
-                "Что хочешь сделать дальше?",
-                reply_markup=ReplyKeyboardMarkup(RESULT_MENU_KEYBOARD)
+                catalogue.text('question', question=question),
+                reply_markup=catalogue.result_menu_markup
             )
             context.user_data['last_theme'] = theme
             context.user_data['last_section'] = section_name
             return RESULT
     
     # Если тема не найдена
-    themes = questionary.get_themes(section_name)
-    reply_keyboard = [[theme] for theme in themes] + [["Назад", "Главное меню"]]
-    
+    theme_menu = catalogue.render().theme_menus.get(section_name)
+    if theme_menu is None:
+        # Раздел исчез из банка вопросов после перезагрузки
+        return await start(update, context)
     await update.message.reply_text(
-        "Пожалуйста, выбери одну из предложенных тем",
-        reply_markup=ReplyKeyboardMarkup(reply_keyboard)
+        catalogue.text('invalid_theme'),
+        reply_markup=theme_menu
     )
     return THEME
 
@@ -333,15 +311,16 @@ async def handle_result_choice(update: Update, context: ContextTypes.DEFAULT_TYP
         Следующее состояние диалога или ConversationHandler.END
     """
 
-    choice = update.message.text
-    questionary: Questionary = context.bot_data['questionary']
+    catalogue = user_catalogue(update, context)
+    action = catalogue.action(update.message.text)
     
-    if choice == "Главное меню":
+    if action == 'main_menu_button':
         return await start(update, context)
-    elif choice == "Завершить":
+    elif action == 'finish_button':
+        record_feedback(context, catalogue, 'finish')
         await update.message.reply_text(
-            "Спасибо за ответы! До встречи! 👋\n/start",
-            reply_markup=ReplyKeyboardRemove()
+            catalogue.text('finish'),
+            reply_markup=REMOVE_KEYBOARD
         )
         await end_dialog(context, 'completed')
         return ConversationHandler.END
@@ -349,29 +328,362 @@ async def handle_result_choice(update: Update, context: ContextTypes.DEFAULT_TYP
     last_theme = context.user_data.get('last_theme')
     last_section = context.user_data.get('last_section')
     
-    if choice == "Еще вопрос":
-        if last_section and last_theme:
-            question = questionary.get_random_question(last_section, last_theme)
-            if question:
-                await update.message.reply_text(
-                    f"📖 {question}\n\n"
-                    "Что хочешь сделать дальше?",
-                    reply_markup=ReplyKeyboardMarkup(RESULT_MENU_KEYBOARD)
-                )
-                return RESULT
+    if action in ('more_button', 'similar_button'):
+        last_question = context.user_data.get('last_question')
+        record_feedback(context, catalogue, 'more')
+        question = None
+        if action == 'similar_button':
+            question = similar_question(context, catalogue, last_question)
+        # Если похожих вопросов нет, показываем другой вопрос той же темы
+        if question is None and last_section and last_theme:
+            question = next_question(context, catalogue, last_section, last_theme)
+        if question:
+            await update.message.reply_text(
+                catalogue.text('question', question=question),
+                reply_markup=catalogue.result_menu_markup
+            )
+            return RESULT
         
         # Если нет последней темы, возвращаем к выбору темы
-        return await theme_choice(update, context, questionary)
+        return await theme_choice(update, context, catalogue)
     
-    elif choice == "Выбрать другую тему":
-        return await theme_choice(update, context, questionary)
+    elif action == 'other_theme_button':
+        return await theme_choice(update, context, catalogue)
     
     else:
         await update.message.reply_text(
-            "Пожалуйста, выбери один из предложенных вариантов"
+            catalogue.text('invalid_option')
         )
         return RESULT
 
+async def navigate(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    Обрабатывает нажатие инлайн-кнопки меню в режиме KEYBOARD_MODE=inline.
+
+    Вместо нового сообщения на каждом шаге редактируется сообщение с
+    нажатой кнопкой. Раздел и тема берутся из ``callback_data`` кнопки
+    (см. модуль ``navigation``), а не из ``user_data``.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+
+    Returns
+    -------
+    int
+        Состояние диалога, соответствующее показанному меню, или ConversationHandler.END
+    """
+
+    query = update.callback_query
+    catalogue = user_catalogue(update, context)
+    menus = catalogue.inline()
+    target = navigation.decode(query.data, catalogue.questionary.bank)
+    # Ответ убирает индикатор загрузки на кнопке; он не ограничивается по чату
+    await query.answer()
+
+    if target is None:
+        # Кнопка сообщения, показанного до перезагрузки банка вопросов
+        await edit_menu(query, catalogue.text('greeting'), menus.main_menu)
+        return MAIN_MENU
+    action, section_name, theme = target
+
+    if action == navigation.MAIN_MENU:
+        await begin_dialog(context)
+        await edit_menu(query, catalogue.text('greeting'), menus.main_menu)
+        return MAIN_MENU
+    elif action == navigation.ABOUT:
+        await end_dialog(context, 'project_info')
+        await edit_menu(query, catalogue.text('about'))
+        return ConversationHandler.END
+    elif action == navigation.FINISH:
+        record_feedback(context, catalogue, 'finish')
+        await edit_menu(query, catalogue.text('finish'))
+        await end_dialog(context, 'completed')
+        return ConversationHandler.END
+    elif action == navigation.SECTION:
+        context.user_data['current_section'] = section_name
+        await log_dialog_state(context, f'section_{section_name}')
+        await edit_menu(query, catalogue.render().section_texts[section_name], menus.section_menus[section_name])
+        return SECTION_MENU
+    elif action == navigation.RANDOM:
+        random_question = next_question(context, catalogue, section_name)
+        if random_question:
+            await edit_menu(query, catalogue.text('random_question', question=random_question))
+            await end_dialog(context, 'random_question')
+            return ConversationHandler.END
+        await edit_menu(query, catalogue.text('question_error'), menus.section_menus[section_name])
+        return SECTION_MENU
+    elif action == navigation.CHOOSE_THEME:
+        await edit_menu(query, catalogue.text('choose_theme'), menus.theme_menus[section_name])
+        return THEME
+
+    # Тема выбрана или нажаты "Еще вопрос", "Похожий вопрос"
+    question = None
+    if action == navigation.THEME:
+        question = next_question(context, catalogue, section_name, theme)
+        if question:
+            await log_dialog_state(context, f'theme_{theme}')
+    else:
+        last_question = context.user_data.get('last_question')
+        record_feedback(context, catalogue, 'more')
+        if action == navigation.SIMILAR:
+            question = similar_question(context, catalogue, last_question)
+        # Если похожих вопросов нет, показываем другой вопрос той же темы
+        if question is None:
+            question = next_question(context, catalogue, section_name, theme)
+    if not question:
+        await edit_menu(query, catalogue.text('invalid_theme'), menus.theme_menus[section_name])
+        return THEME
+
+    context.user_data['last_theme'] = theme
+    context.user_data['last_section'] = section_name
+    await edit_menu(
+        query, catalogue.text('question', question=question), menus.result_menus[(section_name, theme)]
+    )
+    return RESULT
+
+async def use_buttons(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Отвечает на текст, отправленный во время инлайн-диалога, не меняя состояние.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    await update.message.reply_text(user_catalogue(update, context).text('invalid_option'))
+
+async def edit_menu(query: CallbackQuery, text: str, markup: Optional[InlineKeyboardMarkup] = None) -> None:
+    """
+    Заменяет текст и клавиатуру сообщения с нажатой кнопкой.
+
+    Без ``markup`` клавиатура убирается. Повторное нажатие, которое не
+    меняет сообщение (например, тот же вопрос в режиме random), не
+    считается ошибкой.
+
+    Parameters
+    ----------
+    query : CallbackQuery
+        Нажатие инлайн-кнопки
+    text : str
+        Новый текст сообщения
+    markup : Optional[InlineKeyboardMarkup], optional
+        Новая клавиатура, по умолчанию None
+    """
+
+    try:
+        await query.edit_message_text(text, reply_markup=markup)
+    except BadRequest as e:
+        if "not modified" not in str(e):
+            raise
+
+def next_question(
+    context: ContextTypes.DEFAULT_TYPE,
+    catalogue: Catalogue,
+    section_name: str,
+    theme: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Выбирает вопрос раздела или темы в режиме QUESTION_SAMPLING.
+
+    В режиме ``no_repeat`` курсоры выборки хранятся в ``context.user_data``,
+    и вопросы темы не повторяются, пока тема не исчерпана. В режиме
+    ``weighted`` вопрос выбирается по таблицам весов локали. ID вопроса
+    запоминается для кнопки "Похожий вопрос" и учета обратной связи.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    catalogue : Catalogue
+        Каталог локали пользователя для доступа к вопросам
+    section_name : str
+        Название раздела
+    theme : Optional[str], optional
+        Название темы, по умолчанию None (весь раздел)
+
+    Returns
+    -------
+    Optional[str]
+        Вопрос или None если вопросы не найдены
+    """
+
+    questionary = catalogue.questionary
+    if QUESTION_SAMPLING == 'random':
+        question_id = questionary.get_random_question_id(section_name, theme)
+    elif QUESTION_SAMPLING == 'weighted':
+        question_weights(context, catalogue)
+        question_id = questionary.get_random_question_id(section_name, theme)
+    else:
+        cursors = context.user_data.setdefault('question_cursors', {})
+        question_id = questionary.get_next_question_id(section_name, theme, cursors)
+    if question_id is None:
+        return None
+    context.user_data['last_question'] = (questionary.bank.version, question_id)
+    return questionary.get_question(question_id)
+
+def similar_question(
+    context: ContextTypes.DEFAULT_TYPE,
+    catalogue: Catalogue,
+    last_question: Optional[Tuple[str, int]],
+) -> Optional[str]:
+    """
+    Выбирает вопрос, похожий на показанный, по таблице ближайших соседей.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    catalogue : Catalogue
+        Каталог локали пользователя для доступа к вопросам
+    last_question : Optional[Tuple[str, int]]
+        Версия банка и ID показанного вопроса
+
+    Returns
+    -------
+    Optional[str]
+        Вопрос или None, если вопрос показан из прежнего банка или похожих нет
+    """
+
+    questionary = catalogue.questionary
+    if last_question is None or last_question[0] != questionary.bank.version:
+        return None
+    question_id = questionary.get_similar_question_id(last_question[1], SIMILAR_QUESTIONS_K)
+    if question_id is None:
+        return None
+    context.user_data['last_question'] = (questionary.bank.version, question_id)
+    return questionary.get_question(question_id)
+
+def question_weights(context: ContextTypes.DEFAULT_TYPE, catalogue: Catalogue) -> QuestionWeights:
+    """
+    Возвращает веса вопросов локали, создавая их при первом обращении.
+
+    Веса хранятся в ``context.bot_data['question_weights']`` по коду
+    локали. Таблицы новой локали строятся фоновой задачей, до этого
+    вопросы выбираются равномерно.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    catalogue : Catalogue
+        Каталог локали пользователя
+
+    Returns
+    -------
+    QuestionWeights
+        Веса вопросов локали
+    """
+
+    registry = context.bot_data.setdefault('question_weights', {})
+    weights = registry.get(catalogue.code)
+    if weights is None:
+        weights = registry[catalogue.code] = QuestionWeights(catalogue.questionary)
+        context.application.create_task(weights.rebuild())
+    return weights
+
+def record_feedback(context: ContextTypes.DEFAULT_TYPE, catalogue: Catalogue, signal: str) -> None:
+    """
+    Учитывает действие пользователя после показа вопроса в режиме ``weighted``.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    catalogue : Catalogue
+        Каталог локали пользователя
+    signal : str
+        ``'more'`` ("Еще вопрос", "Похожий вопрос") или ``'finish'`` ("Завершить")
+    """
+
+    last_question = context.user_data.pop('last_question', None)
+    if QUESTION_SAMPLING != 'weighted' or last_question is None:
+        return
+    version, question_id = last_question
+    question_weights(context, catalogue).record(version, question_id, signal)
+
+async def reload_question_bank(bot_data: Dict) -> QuestionBank:
+    """
+    Загружает банк вопросов из QUESTION_BANK_PATH и подменяет его в Questionary.
+
+    Файл читается, индекс поиска и таблица похожих вопросов строятся
+    в отдельном потоке до подмены:
+    при ошибке продолжает работать прежний банк. Новые разделы и темы регистрируются
+    в справочнике состояний хранилища. Перезагрузки по таймеру и по команде
+    /reload_questions выполняются по очереди под ``bot_data['bank_reload_lock']``,
+    поэтому банк из более старого файла не подменяет более новый.
+
+    Parameters
+    ----------
+    bot_data : Dict
+        Данные приложения с экземпляром Questionary
+
+    Returns
+    -------
+    QuestionBank
+        Загруженный банк вопросов
+
+    Raises
+    ------
+    BankFormatError
+        Если файл поврежден
+    OSError
+        Если файл недоступен
+    """
+
+    questionary: Questionary = bot_data['questionary']
+    async with bot_data.setdefault('bank_reload_lock', asyncio.Lock()):
+        bank = await asyncio.to_thread(read_bank, QUESTION_BANK_PATH)
+        if bank.version == questionary.bank.version:
+            return bank
+        search_index = await asyncio.to_thread(build_search_index, bank)
+        neighbours = await asyncio.to_thread(build_neighbour_table, bank, SIMILAR_QUESTIONS_K)
+        # Банк мог быть подменен за время построения
+        if bank.version == questionary.bank.version:
+            return bank
+        questionary.use_bank(bank, search_index, neighbours)
+        # Разметки меню нового банка строятся до первого обращения пользователя
+        get_catalogue(DEFAULT_LOCALE).render()
+        await db.register_states(dialog_state_names(questionary))
+        logger.info(f"Question bank {bank.version} loaded: {len(bank.questions)} questions")
+    return bank
+
+async def reload_questions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Перезагружает банк вопросов по команде /reload_questions.
+
+    Команда доступна только пользователям из ADMIN_USER_IDS.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    if update.effective_user is None or update.effective_user.id not in ADMIN_USER_IDS:
+        return
+    if not QUESTION_BANK_PATH:
+        await update.message.reply_text("QUESTION_BANK_PATH не задан, используются встроенные вопросы")
+        return
+
+    try:
+        bank = await reload_question_bank(context.bot_data)
+    except (BankFormatError, OSError) as e:
+        logger.error(f"Failed to reload question bank: {e}")
+        await update.message.reply_text(f"Банк вопросов не загружен: {e}")
+        return
+    await update.message.reply_text(
+        f"Банк вопросов {bank.version}: {len(bank.questions)} вопросов, {len(bank.section_names)} разделов"
+    )
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
     Завершает диалог по команде /cancel.
@@ -390,12 +702,190 @@ async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """
 
     await update.message.reply_text(
-        "До встречи! 👋\n/start", 
-        reply_markup=ReplyKeyboardRemove()
+        user_catalogue(update, context).text('cancel'),
+        reply_markup=REMOVE_KEYBOARD
     )
     await end_dialog(context, 'cancelled')
     return ConversationHandler.END
 
+async def session_expired(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Отвечает на нажатие кнопки вне диалога, например после вытеснения сессии.
+
+    Инлайн-клавиатура сообщения, на котором нажата кнопка, убирается.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    text = user_catalogue(update, context).text('session_expired')
+    query = update.callback_query
+    if query is not None:
+        await query.answer()
+        await edit_menu(query, text)
+        return
+    await update.message.reply_text(text, reply_markup=REMOVE_KEYBOARD)
+
+async def set_language(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """
+    Выбирает язык текстов и вопросов по команде /language <код>.
+
+    Без аргумента показывает текущий и доступные языки. Выбор сохраняется
+    в ``context.user_data['locale']`` и важнее языка клиента Telegram.
+    Начатый диалог завершается, так как кнопки его клавиатуры относятся
+    к прежнему языку.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+
+    Returns
+    -------
+    int
+        ConversationHandler.END
+    """
+
+    code = context.args[0].lower() if context.args else None
+    if code in SUPPORTED_LOCALES:
+        context.user_data['locale'] = code
+        catalogue = get_catalogue(code)
+        await update.message.reply_text(
+            catalogue.text('language_set', name=catalogue.name),
+            reply_markup=REMOVE_KEYBOARD
+        )
+        await end_dialog(context, 'cancelled')
+        return ConversationHandler.END
+
+    catalogue = user_catalogue(update, context)
+    await update.message.reply_text(
+        catalogue.text('language_list', name=catalogue.name, locales=", ".join(SUPPORTED_LOCALES))
+    )
+    return ConversationHandler.END
+
+async def search_questions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Ищет вопросы во всем банке локали по команде /search <слова>.
+
+    Команда не меняет состояние диалога: после ответа пользователь
+    продолжает с того же меню.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    catalogue = user_catalogue(update, context)
+    query = " ".join(context.args or ())
+    if not query:
+        await update.message.reply_text(catalogue.text('search_usage'))
+        return
+
+    questions = catalogue.questionary.search(query, SEARCH_RESULTS_LIMIT)
+    if not questions:
+        await update.message.reply_text(catalogue.text('search_empty', query=query))
+        return
+    await update.message.reply_text(
+        catalogue.text(
+            'search_results',
+            query=query,
+            questions="\n\n".join(f"{number}. {question}" for number, question in enumerate(questions, 1))
+        )
+    )
+
+async def subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Подписывает чат на ежедневную рассылку "Вопрос дня" (см. модуль ``broadcast``).
+
+    Как и /search, команда не меняет состояние диалога.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    catalogue = user_catalogue(update, context)
+    try:
+        added = await db.subscribe(update.effective_chat.id)
+    except Exception as e:
+        logger.error(f"Error subscribing chat: {e}")
+        await update.message.reply_text(catalogue.text('subscription_error'))
+        return
+    await update.message.reply_text(
+        catalogue.text('subscribed', time=BROADCAST_TIME) if added else catalogue.text('already_subscribed')
+    )
+
+async def unsubscribe(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Отписывает чат от рассылки "Вопрос дня".
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    catalogue = user_catalogue(update, context)
+    try:
+        removed = await db.unsubscribe(update.effective_chat.id)
+    except Exception as e:
+        logger.error(f"Error unsubscribing chat: {e}")
+        await update.message.reply_text(catalogue.text('subscription_error'))
+        return
+    await update.message.reply_text(catalogue.text('unsubscribed' if removed else 'not_subscribed'))
+
+async def begin_dialog(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Начинает диалог в базе данных и запоминает его ID в ``user_data``.
+
+    Ошибка хранилища не прерывает диалог с пользователем.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    """
+
+    try:
+        # Логируем начало диалога в БД (без персональных данных)
+        dialog_id = await db.start_dialog()
+        context.user_data['dialog_id'] = dialog_id
+        logger.info(f"Started dialog {dialog_id}")
+    except Exception as e:
+        logger.error(f"Error logging dialog start: {e}")
+
+async def log_dialog_state(context: ContextTypes.DEFAULT_TYPE, state: str) -> None:
+    """
+    Записывает состояние начатого диалога в базу данных.
+
+    Parameters
+    ----------
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+    state : str
+        Имя состояния, например ``'section_<раздел>'``
+    """
+
+    try:
+        if 'dialog_id' in context.user_data:
+            await db.update_dialog_state(context.user_data['dialog_id'], state)
+    except Exception as e:
+        logger.error(f"Error updating dialog state: {e}")
+
 async def end_dialog(context: ContextTypes.DEFAULT_TYPE, state: str = 'completed'):
     """
     Завершает диалог в базе данных.
@@ -415,4 +905,51 @@ async def end_dialog(context: ContextTypes.DEFAULT_TYPE, state: str = 'completed
             # Удаляем ID диалога из контекста
             del context.user_data['dialog_id']
     except Exception as e:
-        logger.error(f"Error ending dialog: {e}")
\ No newline at end of file
+        logger.error(f"Error ending dialog: {e}")
+
+def user_catalogue(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Catalogue:
+    """
+    Возвращает каталог локали пользователя.
+
+    Локаль выбирается из явного выбора командой /language или языка
+    клиента Telegram; каталог загружается при первом обращении к локали
+    и общий для всех ее пользователей.
+
+    Parameters
+    ----------
+    update : Update
+        Объект обновления от Telegram API
+    context : ContextTypes.DEFAULT_TYPE
+        Контекст выполнения обработчика
+
+    Returns
+    -------
+    Catalogue
+        Каталог текстов и вопросов
+    """
+
+    user = update.effective_user
+    return get_catalogue(resolve_locale(context.user_data, user.language_code if user else None))
+
+def dialog_state_names(questionary: Questionary) -> List[str]:
+    """
+    Возвращает имена всех состояний диалога, которые записывают обработчики.
+    
+    Используется для заполнения справочника кодов состояний при запуске бота.
+    
+    Parameters
+    ----------
+    questionary : Questionary
+        Экземпляр Questionary для доступа к разделам и темам
+        
+    Returns
+    -------
+    List[str]
+        Список имен состояний
+    """
+
+    names = ['started', 'random_question', 'completed', 'cancelled', 'project_info']
+    for section_name in questionary.get_all_sections():
+        names.append(f'section_{section_name}')
+        names.extend(f'theme_{theme}' for theme in questionary.get_themes(section_name))
+    return names
\ No newline at end of file
@@ -0,0 +1,402 @@
+"""
+Пакет локализаций бота.
+
+Каталог локали объединяет тексты сообщений, подписи кнопок и банк
+вопросов на одном языке. Данные каждой локали лежат в отдельном модуле
+пакета (``ru``, ``en``) и импортируются только при первом обращении к
+локали; построенный каталог кэшируется и разделяется всеми
+пользователями. Для маршрутизации по нажатой кнопке каталог хранит
+обратный словарь {подпись: ключ кнопки}, поэтому разбор ответа
+пользователя - одно обращение к словарю. Разметки клавиатур
+(``ReplyKeyboardMarkup``) и тексты меню разделов строятся заранее и
+разделяются всеми пользователями локали: постоянные - при создании
+каталога, зависящие от банка вопросов - один раз на версию банка
+(см. ``Catalogue.render``). Инлайн-клавиатуры режима KEYBOARD_MODE=inline
+с ``callback_data`` кнопок (см. модуль ``navigation``) так же строятся
+один раз на версию банка (см. ``Catalogue.inline``).
+
+Модуль локали определяет:
+
+- ``NAME`` - название языка для команды /language;
+- ``MESSAGES`` - словарь {ключ: текст}; ключи кнопок оканчиваются на ``_button``;
+- ``MAIN_MENU_ROWS`` - число кнопок разделов в строках главного меню;
+- ``load_bank()`` - банк вопросов локали.
+
+Classes:
+    Catalogue: Каталог текстов и вопросов одной локали
+    RenderCache: Разметки и тексты, зависящие от версии банка вопросов
+    InlineMenus: Инлайн-клавиатуры для версии банка вопросов
+
+Functions:
+    get_catalogue: Каталог локали (загружается при первом обращении)
+    resolve_locale: Выбор локали пользователя
+
+Attributes:
+    SUPPORTED_LOCALES (Tuple[str, ...]): Коды доступных локалей
+"""
+
+import importlib
+import logging
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
+
+from .. import navigation
+from ..config import DEFAULT_LOCALE, SIMILAR_QUESTIONS_K
+from ..questionary import Questionary
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_LOCALES: Tuple[str, ...] = ("ru", "en")
+
+_catalogues: Dict[str, "Catalogue"] = {}
+
+
+class RenderCache(NamedTuple):
+    """
+    Готовые разметки и тексты каталога для одной версии банка вопросов.
+
+    Attributes
+    ----------
+    version : str
+        Версия банка, для которой построен кэш
+    main_menu : ReplyKeyboardMarkup
+        Главное меню
+    section_texts : Mapping[str, str]
+        Текст меню каждого раздела
+    theme_menus : Mapping[str, ReplyKeyboardMarkup]
+        Клавиатура выбора темы каждого раздела
+    """
+
+    version: str
+    main_menu: ReplyKeyboardMarkup
+    section_texts: Mapping[str, str]
+    theme_menus: Mapping[str, ReplyKeyboardMarkup]
+
+
+class InlineMenus(NamedTuple):
+    """
+    Инлайн-клавиатуры каталога для одной версии банка вопросов.
+
+    Кнопки несут номера раздела и темы, поэтому клавиатуры меню раздела,
+    выбора темы и показа вопроса свои у каждого раздела или темы.
+
+    Attributes
+    ----------
+    version : str
+        Версия банка, для которой построены клавиатуры
+    main_menu : InlineKeyboardMarkup
+        Главное меню
+    section_menus : Mapping[str, InlineKeyboardMarkup]
+        Меню каждого раздела
+    theme_menus : Mapping[str, InlineKeyboardMarkup]
+        Выбор темы каждого раздела
+    result_menus : Mapping[Tuple[str, str], InlineKeyboardMarkup]
+        Действия после показа вопроса по ключу (раздел, тема)
+    """
+
+    version: str
+    main_menu: InlineKeyboardMarkup
+    section_menus: Mapping[str, InlineKeyboardMarkup]
+    theme_menus: Mapping[str, InlineKeyboardMarkup]
+    result_menus: Mapping[Tuple[str, str], InlineKeyboardMarkup]
+
+
+class Catalogue:
+    """
+    Каталог текстов, кнопок и вопросов одной локали.
+
+    Attributes:
+        code (str): Код локали
+        name (str): Название языка
+        messages (Mapping[str, str]): Тексты сообщений и подписи кнопок
+        questionary (Questionary): Вопросы локали
+        section_menu_markup (ReplyKeyboardMarkup): Клавиатура меню раздела
+        result_menu_markup (ReplyKeyboardMarkup): Клавиатура после показа вопроса
+    """
+
+    def __init__(self, code: str, name: str, messages: Mapping[str, str],
+                 main_menu_rows: Sequence[int], questionary: Questionary):
+        self.code = code
+        self.name = name
+        self.messages = MappingProxyType(dict(messages))
+        self.questionary = questionary
+        self._main_menu_rows = tuple(main_menu_rows)
+        self._render: Optional[RenderCache] = None
+        self._inline: Optional[InlineMenus] = None
+        self._actions: Dict[str, str] = {
+            text: key for key, text in self.messages.items() if key.endswith('_button')
+        }
+        self.section_menu_keyboard = self._buttons(
+            ['random_button'], ['choose_theme_button'], ['main_menu_button']
+        )
+        self.result_menu_keyboard = self._buttons(
+            ['more_button', 'similar_button'], ['other_theme_button'], ['main_menu_button', 'finish_button']
+        )
+        # Разметки объектов Telegram неизменяемы и разделяются всеми ответами
+        self.section_menu_markup = ReplyKeyboardMarkup(
+            self.section_menu_keyboard, input_field_placeholder=self.messages['section_menu_placeholder']
+        )
+        self.result_menu_markup = ReplyKeyboardMarkup(self.result_menu_keyboard)
+
+    def _buttons(self, *rows: List[str]) -> Tuple[Tuple[str, ...], ...]:
+        """Разметка клавиатуры из ключей кнопок."""
+
+        return tuple(tuple(self.messages[key] for key in row) for row in rows)
+
+    def text(self, key: str, **kwargs) -> str:
+        """
+        Возвращает текст сообщения, подставив параметры.
+
+        Parameters
+        ----------
+        key : str
+            Ключ сообщения
+        **kwargs
+            Значения для подстановки в шаблон
+
+        Returns
+        -------
+        str
+            Текст сообщения
+        """
+
+        message = self.messages[key]
+        return message.format(**kwargs) if kwargs else message
+
+    def action(self, text: str) -> Optional[str]:
+        """
+        Возвращает ключ кнопки по ее подписи.
+
+        Parameters
+        ----------
+        text : str
+            Текст сообщения пользователя
+
+        Returns
+        -------
+        Optional[str]
+            Ключ кнопки (например ``'main_menu_button'``) или None
+        """
+
+        return self._actions.get(text)
+
+    def main_menu_keyboard(self) -> Tuple[Tuple[str, ...], ...]:
+        """
+        Возвращает разметку главного меню для текущего банка вопросов.
+
+        Разделы раскладываются по строкам согласно ``MAIN_MENU_ROWS``,
+        не поместившиеся - по одному в строке; последней идет кнопка
+        "О проекте".
+
+        Returns
+        -------
+        Tuple[Tuple[str, ...], ...]
+            Строки кнопок главного меню
+        """
+
+        sections = list(self.questionary.get_all_sections())
+        rows = []
+        for size in self._main_menu_rows:
+            if not sections:
+                break
+            rows.append(tuple(sections[:size]))
+            del sections[:size]
+        rows.extend((section,) for section in sections)
+        rows.append((self.messages['about_button'],))
+        return tuple(rows)
+
+    def theme_keyboard(self, section_name: str) -> Tuple[Tuple[str, ...], ...]:
+        """
+        Возвращает разметку выбора темы раздела.
+
+        Parameters
+        ----------
+        section_name : str
+            Название раздела
+
+        Returns
+        -------
+        Tuple[Tuple[str, ...], ...]
+            Строки кнопок: по теме в строке и навигация
+        """
+
+        rows = [(theme,) for theme in self.questionary.get_themes(section_name)]
+        rows.append((self.messages['back_button'], self.messages['main_menu_button']))
+        return tuple(rows)
+
+    def render(self) -> RenderCache:
+        """
+        Возвращает готовые разметки и тексты для текущего банка вопросов.
+
+        Кэш строится один раз на версию банка: после перезагрузки банка
+        первый вызов строит разметки новых разделов и тем, а прежний кэш
+        отбрасывается.
+
+        Returns
+        -------
+        RenderCache
+            Главное меню, тексты меню разделов и клавиатуры тем
+        """
+
+        cache = self._render
+        bank = self.questionary.bank
+        if cache is None or cache.version != bank.version:
+            theme_placeholder = self.messages['theme_placeholder']
+            cache = self._render = RenderCache(
+                version=bank.version,
+                main_menu=ReplyKeyboardMarkup(
+                    self.main_menu_keyboard(), input_field_placeholder=self.messages['main_menu_placeholder']
+                ),
+                section_texts=MappingProxyType({
+                    section: self.text('section_menu', description=bank.section_descriptions.get(section, ""))
+                    for section in bank.section_names
+                }),
+                theme_menus=MappingProxyType({
+                    section: ReplyKeyboardMarkup(
+                        self.theme_keyboard(section), input_field_placeholder=theme_placeholder
+                    )
+                    for section in bank.section_names
+                }),
+            )
+        return cache
+
+    def _inline_button(self, key: str, action: str, section: int = -1, theme: int = -1) -> InlineKeyboardButton:
+        """Инлайн-кнопка с подписью ``key`` и данными действия ``action``."""
+
+        bank = self.questionary.bank if section >= 0 else None
+        return InlineKeyboardButton(
+            self.messages[key], callback_data=navigation.encode(action, bank, section, theme)
+        )
+
+    def inline(self) -> InlineMenus:
+        """
+        Возвращает инлайн-клавиатуры для текущего банка вопросов.
+
+        Клавиатуры строятся один раз на версию банка, как ``render``.
+
+        Returns
+        -------
+        InlineMenus
+            Главное меню и клавиатуры разделов, тем и показа вопроса
+        """
+
+        menus = self._inline
+        bank = self.questionary.bank
+        if menus is not None and menus.version == bank.version:
+            return menus
+
+        indices = {section: number for number, section in enumerate(bank.section_names)}
+        main_menu = [
+            [
+                InlineKeyboardButton(section, callback_data=navigation.encode(navigation.SECTION, bank, indices[section]))
+                for section in row
+            ]
+            for row in self.main_menu_keyboard()[:-1]
+        ]
+        main_menu.append([self._inline_button('about_button', navigation.ABOUT)])
+        to_main_menu = self._inline_button('main_menu_button', navigation.MAIN_MENU)
+
+        section_menus, theme_menus, result_menus = {}, {}, {}
+        for section, i in indices.items():
+            section_menus[section] = InlineKeyboardMarkup((
+                (self._inline_button('random_button', navigation.RANDOM, i),),
+                (self._inline_button('choose_theme_button', navigation.CHOOSE_THEME, i),),
+                (to_main_menu,),
+            ))
+            themes = bank.themes[section]
+            theme_menus[section] = InlineKeyboardMarkup((
+                *(
+                    (InlineKeyboardButton(theme, callback_data=navigation.encode(navigation.THEME, bank, i, j)),)
+                    for j, theme in enumerate(themes)
+                ),
+                (self._inline_button('back_button', navigation.SECTION, i), to_main_menu),
+            ))
+            for j, theme in enumerate(themes):
+                result_menus[(section, theme)] = InlineKeyboardMarkup((
+                    (
+                        self._inline_button('more_button', navigation.MORE, i, j),
+                        self._inline_button('similar_button', navigation.SIMILAR, i, j),
+                    ),
+                    (self._inline_button('other_theme_button', navigation.CHOOSE_THEME, i),),
+                    (to_main_menu, self._inline_button('finish_button', navigation.FINISH)),
+                ))
+
+        menus = self._inline = InlineMenus(
+            version=bank.version,
+            main_menu=InlineKeyboardMarkup(main_menu),
+            section_menus=MappingProxyType(section_menus),
+            theme_menus=MappingProxyType(theme_menus),
+            result_menus=MappingProxyType(result_menus),
+        )
+        return menus
+
+
+def get_catalogue(code: str) -> Catalogue:
+    """
+    Возвращает каталог локали, загружая ее при первом обращении.
+
+    Таблица похожих вопросов новой локали строится в фоне, не задерживая
+    обработчик, который первым обратился к локали.
+
+    Parameters
+    ----------
+    code : str
+        Код локали из SUPPORTED_LOCALES
+
+    Returns
+    -------
+    Catalogue
+        Каталог, общий для всех пользователей локали
+
+    Raises
+    ------
+    KeyError
+        Если локаль не поддерживается
+    """
+
+    catalogue = _catalogues.get(code)
+    if catalogue is None:
+        if code not in SUPPORTED_LOCALES:
+            raise KeyError(f"Unsupported locale: {code}")
+        module = importlib.import_module(f"{__name__}.{code}")
+        catalogue = Catalogue(
+            code, module.NAME, module.MESSAGES, module.MAIN_MENU_ROWS, Questionary(module.load_bank())
+        )
+        _catalogues[code] = catalogue
+        catalogue.questionary.prepare(SIMILAR_QUESTIONS_K)
+        logger.info(f"Locale {code} loaded: {len(catalogue.questionary.questions)} questions")
+    return catalogue
+
+
+def resolve_locale(user_data: Mapping, language_code: Optional[str]) -> str:
+    """
+    Выбирает локаль пользователя.
+
+    Явный выбор командой /language (``user_data['locale']``) важнее языка
+    клиента Telegram; из ``language_code`` учитывается только основной
+    подтег (``en-US`` -> ``en``). Если ни то, ни другое не поддерживается,
+    используется DEFAULT_LOCALE.
+
+    Parameters
+    ----------
+    user_data : Mapping
+        Данные пользователя
+    language_code : Optional[str]
+        Язык клиента, ``update.effective_user.language_code``
+
+    Returns
+    -------
+    str
+        Код локали из SUPPORTED_LOCALES
+    """
+
+    code = user_data.get('locale')
+    if code in SUPPORTED_LOCALES:
+        return code
+    if language_code:
+        code = language_code.split('-', 1)[0].lower()
+        if code in SUPPORTED_LOCALES:
+            return code
+    return DEFAULT_LOCALE
@@ -0,0 +1,103 @@
+"""
+Английская локаль бота.
+
+Variables:
+    NAME (str): Название языка
+    MESSAGES (Dict[str, str]): Тексты сообщений и подписи кнопок
+    MAIN_MENU_ROWS (Tuple[int, ...]): Число разделов в строках главного меню
+"""
+
+from typing import Dict, Tuple
+
+from ..questionary import QuestionBank, build_question_bank
+
+NAME = "English"
+
+MAIN_MENU_ROWS: Tuple[int, ...] = (1, 2, 2, 1)
+
+MESSAGES: Dict[str, str] = {
+    # Кнопки
+    "about_button": "About",
+    "random_button": "Random question",
+    "choose_theme_button": "Choose a theme",
+    "main_menu_button": "Main menu",
+    "back_button": "Back",
+    "more_button": "Another question",
+    "similar_button": "Similar question",
+    "other_theme_button": "Choose another theme",
+    "finish_button": "Finish",
+    # Главное меню
+    "greeting": (
+        "I will offer you questions about yourself to reflect on, for self-development and memoirs\n\n"
+        "The bot does not store answers or personal data.\n\n"
+        "Send /cancel to end the dialog.\n\n"
+        "Choose a section:"
+    ),
+    "main_menu_placeholder": "Choose a section",
+    "invalid_section": "Please choose one of the suggested sections",
+    "about": """
+
+Hi!
+This bot is your personal guide to the world of self-reflection.
+We have collected deep and sometimes unexpected questions to help you get to know yourself better and create living memoirs that cannot be written from a template.
+
+How does it work? It is simple:
+    1. Choose a theme that resonates with you right now.
+    2. Get a card with a question.
+        Take your time, let yourself feel it.
+    3. Answer the way you feel.
+        There are no ready-made answer buttons.
+        You can:
+            • Write your thoughts in a paper journal 📓
+            • Record a sincere voice message 🎙️
+            • Film your reflection on video 🎥
+            • Simply think it over with a cup of tea ☕
+
+The bot only asks questions — your answers belong to you alone.
+The bot does NOT store, does NOT analyze and has NO access to your reflections. You can be completely open.
+Ready to explore your thoughts?
+Press /start!""",
+    # Меню раздела
+    "section_menu": "{description}\n\nChoose an action:",
+    "section_menu_placeholder": "Choose an action",
+    "random_question": "📖 {question}\n\nWant another question? Send /start",
+    "question_error": "Something went wrong while picking a question. Please try again.",
+    "invalid_option": "Please choose one of the suggested options",
+    # Выбор темы и результат
+    "choose_theme": "🎯 Choose a theme:",
+    "theme_placeholder": "Choose a theme",
+    "invalid_theme": "Please choose one of the suggested themes",
+    "question": "📖 {question}\n\nWhat would you like to do next?",
+    "finish": "Thank you for your answers! See you! 👋\n/start",
+    "cancel": "See you! 👋\n/start",
+    "session_expired": "The conversation ended due to inactivity. Send /start to begin again.",
+    # Поиск
+    "search_usage": "Type words to search for: /search <words>\nFor example: /search childhood",
+    "search_results": "🔎 Questions matching \"{query}\":\n\n{questions}",
+    "search_empty": "Nothing found for \"{query}\". Try other words.",
+    # Рассылка "Вопрос дня"
+    "subscribed": "🔔 You are subscribed to the Question of the Day: one question every day at {time} UTC.\nUnsubscribe: /unsubscribe",
+    "already_subscribed": "You are already subscribed to the Question of the Day.\nUnsubscribe: /unsubscribe",
+    "unsubscribed": "You are unsubscribed from the Question of the Day.\nSubscribe again: /subscribe",
+    "not_subscribed": "You are not subscribed to the Question of the Day.\nSubscribe: /subscribe",
+    "subscription_error": "Could not change the subscription. Please try again later.",
+    "daily_question": "☀️ Question of the Day:\n\n{question}\n\nMore questions: /start\nUnsubscribe: /unsubscribe",
+    # Выбор языка
+    "language_set": "Language: {name}. Send /start",
+    "language_list": "Language: {name}\nAvailable languages: {locales}\nChoose: /language <code>",
+}
+
+
+def load_bank() -> QuestionBank:
+    """
+    Компилирует банк вопросов на английском языке.
+
+    Returns
+    -------
+    QuestionBank
+        Банк вопросов из ``en_questions``
+    """
+
+    from .en_questions import SECTION_DESCRIPTIONS, SECTION_QUESTIONS
+
+    return build_question_bank(SECTION_QUESTIONS, SECTION_DESCRIPTIONS)
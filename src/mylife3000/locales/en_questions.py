@@ -0,0 +1,333 @@
+"""
+Английский банк вопросов.
+
+Перевод разделов, тем и вопросов модуля ``questions_data`` с той же
+структурой: раздел - словарь тем, тема - список вопросов.
+
+Variables:
+    SECTION_QUESTIONS (Dict[str, Dict[str, list]]): Словарь разделов
+    SECTION_DESCRIPTIONS (Dict[str, str]): Описания разделов
+"""
+
+from typing import Dict
+
+SECTION_QUESTIONS: Dict[str, Dict[str, list]] = {
+    "Self-knowledge: Who am I?": {
+        "Core of personality": [
+            "If you had to describe your essence without mentioning work, family or hobbies, what would you say?",
+            "What three words come to mind first when you are asked to describe yourself?",
+            "Are you more of an introvert or an extrovert? How does it show in your everyday life?",
+            "What makes you unique? What is exceptional about you?",
+            "What are you like under stress? Do you stay calm, panic, look for support?",
+            "What matters more to you: stability or novelty?",
+            "Where is the line between your public self and your true self?",
+            "How has your fundamental view of yourself changed over the last 10 years?",
+        ],
+        "Strengths and weaknesses": [
+            "What is your greatest strength? How do you use it?",
+            "Which of your weaknesses most often keeps you from reaching your goals?",
+            "What do other people most often thank or value you for?",
+            "In what situation do you feel most competent and confident?",
+            "Which trait of your character helps you through hard times?",
+            "Which weakness have you learned to turn into a strength?",
+            "Which of your qualities is both a blessing and a curse?",
+            "What are you not very good at and completely fine with it?",
+        ],
+        "Values and beliefs": [
+            "Name 3-5 of your main life values. How did you arrive at them?",
+            "Which of your beliefs is the most unshakable?",
+            "Which belief are you ready to defend in the face of disagreement?",
+            "What did you once believe but have since reconsidered? What made you change your mind?",
+            "What is absolutely unacceptable to you?",
+            "What are right and wrong for you? Who or what shaped this frame of reference?",
+            "How do your values affect your daily decisions?",
+            "What will you never regret, even if it was hard?",
+        ],
+        "Inner world and reflection": [
+            "What do you think about most often when you are alone with yourself?",
+            "Which questions about life and yourself do you keep asking without an answer?",
+            "What does being at peace with yourself mean to you personally?",
+            "How do you feel about solitude? Do you fear it or value it?",
+            "Where and when do you feel most connected to your true self?",
+            "What puts you into a state of flow, when time stands still?",
+            "What have you recently discovered about yourself that surprised you?",
+            "How do you know that you need to slow down and spend time alone?",
+        ],
+        "Body and sensations": [
+            "How do you relate to your body? Are you friends, partners or opponents?",
+            "Which bodily sensation tells you that you are on the right path?",
+            "How does your body react to stress? Where do you feel tension first?",
+            "What do you like about your appearance?",
+            "What physical activity do you love and why? What does it give you?",
+            "When do you feel most comfortable and confident in your body?",
+            "What is your body trying to tell you that you are ignoring?",
+            "What does feeling good in your body mean to you?",
+        ],
+        "Synthesis and self-acceptance": [
+            "What do you accept in yourself unconditionally?",
+            "Which of your contradictions have you come to terms with?",
+            "What have you forgiven yourself for?",
+            "What does loving yourself mean to you?",
+            "Which parts of yourself are you not yet ready to accept?",
+            "How do you take care of your inner child?",
+            "What do you need to feel whole?",
+            "Who are you, ultimately?",
+        ],
+    },
+    "Vector: Where am I heading?": {
+        "Goals and aspirations": [
+            "If you had unlimited resources, what one thing would you do in the world?",
+            "What is the biggest professional challenge you want to take on in the next 5 years?",
+            "Describe your ideal day 10 years from now. How does it start, what fills it, how does it end?",
+            "What legacy, unrelated to children, do you want to leave behind?",
+            "Is there a skill you consider the final frontier of your development? What is it?",
+            "What goal that seems impossible for you now would you like to achieve one day?",
+            "If your life were a book, what would the next chapter be called?",
+            "In which area of life do you want to grow the most over the next year?",
+        ],
+        "Career and calling": [
+            "Are you satisfied with how you earn a living? If not, what would the ideal path look like?",
+            "What matters more to you at work: passion, stability, money or influence? Rank them.",
+            "If you were not paid, what would you still want to do 40 hours a week?",
+            "In which project or role do you feel you bring the most value?",
+            "What is your next career step, and what do you need to do to take it?",
+            "What drains you in your current work, and what fills you with energy?",
+            "Is there a business or project you dream of starting? Describe it in a few words.",
+            "What do you want people to say about your professional contribution?",
+        ],
+        "Resources and management": [
+            "What is your main financial goal for the next 3 years?",
+            "What level of income do you need to feel financially free, and why?",
+            "What new source of income would you be interested in creating?",
+            "What do you spend too much time or money on and want to optimize?",
+            "Which of your possessions is it time to let go of, sell or give away?",
+            "How do you want to structure your working day for maximum productivity?",
+            "What automation or delegation could free up a lot of your time?",
+            "What is the wisest financial move you can make right now?",
+        ],
+        "Actions and plans": [
+            "What one goal achieved this year would change everything for you?",
+            "What can you do this week to get one step closer to your ideal self?",
+            "Break your big goal into its three most important steps. What are they?",
+            "Which three priority tasks will you set for tomorrow?",
+            "What are you saying yes and no to this year to make room for what matters most?",
+            "How will you track your progress and celebrate small wins?",
+            "What do you need to stop doing right now to free up resources for what matters?",
+            "Imagine looking back a year from now. Which action will you consider the most important?",
+        ],
+    },
+    "Challenges: What holds me back?": {
+        "Inner barriers": [
+            "What is the biggest fear that paralyzes you and keeps you from taking an important step?",
+            "Which limiting belief about yourself sounds in your head most often?",
+            "In what situation do you most often feel impostor syndrome, and why?",
+            "What do you most often assume other people think about you?",
+            "Where did your strongest limiting belief come from?",
+            "What would you try or start doing if you knew for sure that you would not fail?",
+            "What do you blame yourself for most often? How fair and productive is that blame?",
+            "Which thought about the future makes you most anxious?",
+        ],
+        "Procrastination and putting off": [
+            "Which important task have you been putting off the longest? Why?",
+            "What do you usually do instead of what really matters?",
+            "Is your procrastination tied to fear of failure, fear of success or something else?",
+            "Which task on your to-do list causes the most resistance? Why?",
+            "What helps you get unstuck and start acting?",
+            "What small action can you take right now to get closer to a postponed goal?",
+            "How do you feel after putting off something important for a long time?",
+        ],
+        "Thinking traps": [
+            "Do you fall into black-and-white thinking? In which area?",
+            "How often do you catastrophize and assume the worst-case scenario?",
+            "Do you tend to devalue your achievements by attributing them to luck?",
+            "Which \"should\" causes you the most protest or guilt?",
+            "How do you filter information, noticing only the bad and ignoring the good?",
+            "Do you often read other people's minds, assuming a negative reaction?",
+            "Do you compare yourself to others? To whom, and in which area?",
+            "Which generalization like \"I always\" or \"I never manage to\" holds you back?",
+        ],
+        "Past experience and habits": [
+            "Which painful event from the past still affects your decisions today?",
+            "Which old pattern of behavior gets in your way in a new situation?",
+            "Which bad habit have you failed to break for years? What feeds it?",
+            "Which negative role model are you unconsciously copying?",
+            "Which decision made out of fear in the past still limits you?",
+            "Which of your strengths becomes a weakness in other circumstances?",
+            "What from your past is it time to stop excusing in yourself?",
+            "What hidden benefit does your problem or bad habit give you?",
+        ],
+    },
+    "Environment: My relationships?": {
+        "Inner circle": [
+            "Name 3-5 people with whom you can be completely sincere. Why them?",
+            "Whose presence in your life gives you a sense of calm and confidence?",
+            "Whom could you call in the middle of the night in a crisis?",
+            "Whose advice do you value most, and why?",
+            "With whom do you share your greatest joys and victories?",
+            "Who accepts you completely, with all your quirks and flaws?",
+            "How has your inner circle changed over the last 5 years?",
+            "What are you ready to forgive the people close to you, and what not? Where is that line?",
+        ],
+        "Family and kinship": [
+            "How would you describe your current relationship with each of your parents? What has changed since childhood?",
+            "What role do you play in your family? Are you happy with that role?",
+            "What unspoken resentment or grievance do you hold against a relative?",
+            "Which family tradition or ritual is most precious to you?",
+            "Which relatives do you take care of or feel responsible for?",
+            "With which relative would you like a closer connection? What stops you?",
+            "Which family patterns in relationships or career have you noticed in yourself?",
+            "What does being a good son, daughter or parent mean to you personally?",
+        ],
+        "Romantic relationships": [
+            "How have your expectations of a partner changed compared to your twenties?",
+            "What is the most important lesson you learned from past serious relationships?",
+            "What about your partner makes you feel safe?",
+            "Which shared dream or goal unites you as a couple?",
+            "What has become harder or easier for you to agree on over time?",
+            "In what ways are you and your partner radically different, and how do you live with it?",
+            "Which of your personal fears might affect your relationship?",
+            "What does loving and being loved mean in your own love language?",
+        ],
+        "Friendship and companionship": [
+            "By what criteria do you decide that someone is becoming your friend?",
+            "Are there friends you are connected with only by a shared past?",
+            "Is a friend someone to have fun with, or someone who supports you in trouble?",
+            "Have any of your friendships ended because of betrayal?",
+            "How do you make new friends as an adult?",
+            "What can you forgive a friend, and what would be the point of no return?",
+            "Do you feel competition or comparison with any of your friends?",
+            "Which old friend would you like to reconnect with, and why?",
+        ],
+        "Toxic and difficult relationships": [
+            "Are there people around you who leave you feeling drained after talking to them?",
+            "With whom do you keep in touch out of duty or guilt?",
+            "Who constantly criticizes you or devalues your successes?",
+            "Have you had relationships that ended but still affect you emotionally?",
+            "How do you recognize manipulation directed at you?",
+            "What stops you from breaking off a toxic connection?",
+            "What have toxic relationships taught you?",
+            "Is there someone you need to have a serious talk with to set boundaries?",
+        ],
+    },
+    "Integration: How do I live?": {
+        "Everyday life and routines": [
+            "Describe your ideal morning ritual. How close is it to your real one?",
+            "Which three things do you do every day almost on autopilot?",
+            "What in your daily routine energizes you, and what drains you?",
+            "What does your evening ritual before sleep look like?",
+            "Which part of your day is usually the most productive?",
+            "How are digital devices and social media woven into your day?",
+            "Where and when do you find moments of silence and complete calm during the day?",
+            "What one small change in your daily routine could improve your quality of life?",
+        ],
+        "Balance and harmony": [
+            "How evenly do you divide your time between work, personal life and rest?",
+            "Which area of your life gets the least attention right now? What can you do about it?",
+            "What does a balanced life mean to you?",
+            "Do you feel guilty when you rest instead of working, and vice versa?",
+            "Which of the things you do feel like filling your cup, and which like emptying it?",
+            "How do you know you are crossing the line and starting to burn out?",
+            "What helps you restore balance when you lose it?",
+        ],
+        "Habits and systems": [
+            "What is your strongest habit that moves you forward?",
+            "Which habit slows you down the most?",
+            "How does your environment support or hinder your good habits?",
+            "How do you bring something new into your life? Does change come easily to you?",
+            "What triggers your unhelpful habits?",
+            "Do you act more from inspiration or from discipline?",
+            "What small but systematic leak of time or money is there in your life?",
+        ],
+        "Values in action": [
+            "How well does what you do every day match your deepest values?",
+            "Where in your life is the biggest gap between what you believe and what you do?",
+            "What will you never regret spending time on?",
+            "How does your spending reflect your values?",
+            "What recent decision did you make guided purely by your values?",
+            "What do you do just because it is customary, even though it contradicts your principles?",
+            "If your values were a filter, which activities would you drop immediately?",
+        ],
+        "Pleasure and joy": [
+            "What brings you sincere, simple joy here and now?",
+            "When did you last laugh until you cried?",
+            "Where do you look for comfort when you are sad?",
+            "Which activity makes you lose track of time?",
+            "How do you celebrate small wins?",
+            "What can instantly lift your mood?",
+            "Can you enjoy the process, or only the result?",
+            "Which place do you associate with absolute happiness?",
+        ],
+    },
+    "Time Capsule: A story for my children": {
+        "Childhood and youth": [
+            "Describe the place where you grew up. Which smells, sounds and sensations do you remember first?",
+            "What was your favorite toy or thing as a child, and why was it so important?",
+            "What is the most valuable lesson about life your parents taught you?",
+            "Describe your funniest or most awkward failure as a child. What did you take away from it?",
+            "Which book or film from your childhood influenced you the most?",
+            "What did you dream of becoming at 10? At 15? What changed?",
+            "What was hardest for you as a teenager?",
+            "Describe your best childhood friend. What connected you?",
+        ],
+        "Experience and growing up": [
+            "Describe the hardest choice you have ever had to make. How did you decide?",
+            "Which of your failures eventually turned into a blessing or an important lesson?",
+            "When did you last radically change your mind about something important?",
+            "Describe the moment of your greatest shame. How did you cope with it?",
+            "What is the riskiest thing you have done in your life, and why did you dare?",
+            "Which period of your life was the darkest, and what helped you get out of it?",
+            "Describe a time when you were truly proud of yourself.",
+            "If you could give one piece of advice to your 20-year-old self, what would it be?",
+        ],
+        "Me and my children": [
+            "Describe the day you found out you would become a parent. What did you feel?",
+            "What kind of parent did you hope to be before I was born, and how did it turn out?",
+            "What is the most unexpected lesson parenthood has taught you?",
+            "Describe the moment you felt the strongest, unconditional love for me.",
+            "What is your greatest hope for me, your child?",
+            "Which parenting failure do you remember most, and what did you learn from it?",
+            "What have you learned from your children?",
+            "Which family tradition would you like to create and pass down through generations?",
+        ],
+        "Message to the future": [
+            "What does a life well lived mean to you?",
+            "What is a person's true strength?",
+            "How do you tell what is worth fighting for and what you should simply let go?",
+            "What is more important: being right or being happy?",
+            "How do you cope with the feeling that everyone around is achieving something and you are not?",
+            "How do you find your life's work?",
+            "What would you say to someone going through the hardest time of their life?",
+            "How do you stay yourself under the pressure of society?",
+            "What is the secret of long and strong relationships?",
+        ],
+        "A look at the world": [
+            "Which work of art touched you deeply, and why?",
+            "Which place on Earth made the strongest impression on you?",
+            "What, in your opinion, is the greatest beauty of this world?",
+            "What in the modern world worries you the most?",
+            "What do you think is the biggest misconception of our society?",
+            "What did traveling to another culture teach you?",
+            "Which technological breakthrough of your time amazed you the most?",
+            "What simple, ordinary thing do you consider a true miracle?",
+        ],
+        "Creativity and abstraction": [
+            "If your life were a film, what would it be called and what genre would it be?",
+            "Which superpower would you choose, and why?",
+            "If you could keep only one memory for the rest of your life, which would it be?",
+            "What is your favorite story from the family archive?",
+            "If you could have dinner with any person from the past, whom would you choose?",
+            "What is conscience to you?",
+            "Which melody or song will be playing in your head on the last day of your life?",
+            "What do you want your children to say about you on your 80th birthday?",
+        ],
+    },
+}
+
+SECTION_DESCRIPTIONS: Dict[str, str] = {
+    "Self-knowledge: Who am I?": "Self-knowledge: Who am I? - questions that help you understand your personality, values and beliefs",
+    "Vector: Where am I heading?": "Vector: Where am I heading? - questions about goals, dreams and the direction of your life",
+    "Challenges: What holds me back?": "Challenges: What holds me back? - questions about difficulties, fears and limitations",
+    "Environment: My relationships?": "Environment: My relationships? - questions about interacting with people and your social environment",
+    "Integration: How do I live?": "Integration: How do I live? - questions about everyday life, habits and rituals",
+    "Time Capsule: A story for my children": "Time Capsule: A story for my children - what we can leave to our future selves and our descendants",
+}
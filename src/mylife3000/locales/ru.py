@@ -0,0 +1,104 @@
+"""
+Русская локаль бота.
+
+Банк вопросов - встроенный ``questions_data``; при заданном
+QUESTION_BANK_PATH он заменяется банком из файла (см. модуль ``main``).
+
+Variables:
+    NAME (str): Название языка
+    MESSAGES (Dict[str, str]): Тексты сообщений и подписи кнопок
+    MAIN_MENU_ROWS (Tuple[int, ...]): Число разделов в строках главного меню
+"""
+
+from typing import Dict, Tuple
+
+from ..questionary import QuestionBank, load_question_bank
+
+NAME = "Русский"
+
+MAIN_MENU_ROWS: Tuple[int, ...] = (1, 2, 2, 1)
+
+MESSAGES: Dict[str, str] = {
+    # Кнопки
+    "about_button": "О проекте",
+    "random_button": "Случайный вопрос",
+    "choose_theme_button": "Выбрать тему",
+    "main_menu_button": "Главное меню",
+    "back_button": "Назад",
+    "more_button": "Еще вопрос",
+    "similar_button": "Похожий вопрос",
+    "other_theme_button": "Выбрать другую тему",
+    "finish_button": "Завершить",
+    # Главное меню
+    "greeting": (
+        "Я предложу тебе поразмышлять над вопросами о себе для саморазвития и мемуаров\n\n"
+        "Бот не сохраняет ответы и персональные данные.\n\n"
+        "Отправь /cancel чтобы завершить диалог.\n\n"
+        "Выбери раздел:"
+    ),
+    "main_menu_placeholder": "Выбери раздел",
+    "invalid_section": "Пожалуйста, выбери один из предложенных разделов",
+    "about": """
+
+Привет!
+Этот бот — твой личный проводник в мире саморефлексии.
+Мы собрали глубокие и иногда неожиданные вопросы, чтобы помочь тебе лучше узнать себя и создать живые мемуары, которые не напишешь по шаблону.
+
+Как с этим работать? Всё просто:
+    1. Выбирай тему, которая откликается тебе прямо сейчас.
+    2. Получай карточку с вопросом.
+        Не торопись, дай себе время ощутить его.
+    3. Отвечай так, как чувствуешь.
+        У нас нет готовых кнопок для ответа.
+        Ты можешь:
+            • Запись мыслей в свой бумажный дневник 📓
+            • Наговорить искреннее голосовое сообщение 🎙️
+            • Снять размышление на видео 🎥
+            • Просто подумать над этим за чашкой чая ☕
+
+Бот просто задаёт вопросы — твои ответы принадлежат только тебе.
+Бот НЕ сохраняет, НЕ анализирует и НЕ имеет доступа к твоим размышлениям. Ты можешь быть абсолютно откровенным.
+Готов исследовать свои мысли?
+Жми /start!""",
+    # Меню раздела
+    "section_menu": "{description}\n\nВыбери действие:",
+    "section_menu_placeholder": "Выбор действия",
+    "random_question": "📖 {question}\n\nХочешь еще вопрос? Отправь /start",
+    "question_error": "Произошла ошибка при выборе вопроса. Попробуй еще раз.",
+    "invalid_option": "Пожалуйста, выбери один из предложенных вариантов",
+    # Выбор темы и результат
+    "choose_theme": "🎯 Выбери тему вопросов:",
+    "theme_placeholder": "Выбор темы",
+    "invalid_theme": "Пожалуйста, выбери одну из предложенных тем",
+    "question": "📖 {question}\n\nЧто хочешь сделать дальше?",
+    "finish": "Спасибо за ответы! До встречи! 👋\n/start",
+    "cancel": "До встречи! 👋\n/start",
+    "session_expired": "Диалог завершен из-за неактивности. Отправь /start, чтобы начать заново.",
+    # Поиск
+    "search_usage": "Напиши слова для поиска: /search <слова>\nНапример: /search детство",
+    "search_results": "🔎 Вопросы по запросу «{query}»:\n\n{questions}",
+    "search_empty": "По запросу «{query}» ничего не найдено. Попробуй другие слова.",
+    # Рассылка "Вопрос дня"
+    "subscribed": "🔔 Ты подписан на «Вопрос дня»: каждый день в {time} UTC пришлю один вопрос.\nОтписаться: /unsubscribe",
+    "already_subscribed": "Ты уже подписан на «Вопрос дня».\nОтписаться: /unsubscribe",
+    "unsubscribed": "Ты отписан от «Вопроса дня».\nПодписаться снова: /subscribe",
+    "not_subscribed": "Ты не подписан на «Вопрос дня».\nПодписаться: /subscribe",
+    "subscription_error": "Не удалось изменить подписку. Попробуй позже.",
+    "daily_question": "☀️ Вопрос дня:\n\n{question}\n\nЕще вопросы: /start\nОтписаться: /unsubscribe",
+    # Выбор языка
+    "language_set": "Язык: {name}. Отправь /start",
+    "language_list": "Язык: {name}\nДоступные языки: {locales}\nВыбери: /language <код>",
+}
+
+
+def load_bank() -> QuestionBank:
+    """
+    Возвращает встроенный банк вопросов на русском языке.
+
+    Returns
+    -------
+    QuestionBank
+        Банк вопросов из ``questions_data``
+    """
+
+    return load_question_bank()
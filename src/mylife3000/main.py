@@ -4,27 +4,75 @@
 Инициализирует приложение, настраивает обработчики и запускает бота.
 Использует dependency injection для передачи зависимостей.
 
+Бот получает обновления опросом (``run_polling``) или, если задан
+WEBHOOK_URL, через встроенный HTTP-сервер webhook (``run_webhook``). В обоих
+режимах Telegram присылает только типы обновлений, которые обрабатывают
+зарегистрированные обработчики. Обновления разных чатов обрабатываются
+параллельно, обновления одного чата - по очереди (см. модуль ``updates``).
+Исходящие запросы к Bot API проходят через планировщик с ограничениями
+частоты Telegram и приоритетом ответов пользователям (см. модуль ``outbound``).
+Если задан SESSION_PERSISTENCE_PATH, состояния диалогов и ``user_data``
+сохраняются между перезапусками (см. модуль ``persistence``). Неактивные
+сессии вытесняются из памяти, а брошенные диалоги завершаются (см. модуль
+``sessions``). Встроенные запросы ``@бот <слова>`` получают вопросы банка из
+кэша результатов (см. модуль ``sharing``). Если задан BROADCAST_TIME, подписанные
+чаты ежедневно получают вопрос дня (см. модуль ``broadcast``).
+
 Functions:
     post_init: Инициализация после создания приложения
     post_stop: Очистка ресурсов при остановке
+    allowed_updates: Типы обновлений, которые обрабатывает приложение
     main: Основная функция запуска бота
 """
 
 import logging
 import asyncio
+import warnings
+from datetime import time
+from typing import List
+
 from telegram import Update
 from telegram.ext import (
     Application,
+    BaseHandler,
+    CallbackQueryHandler,
     CommandHandler,
     ConversationHandler,
+    InlineQueryHandler,
     MessageHandler,
+    TypeHandler,
     filters,
 )
+from telegram.warnings import PTBUserWarning
 
-from .config import BOT_TOKEN, MAIN_MENU, SECTION_MENU, THEME, RESULT
-from .handlers import start, handle_main_menu, handle_section_choice, handle_theme_choice, handle_result_choice, cancel
+from .config import (
+    BOT_TOKEN, TELEGRAM_API_URL, WEBHOOK_URL, WEBHOOK_LISTEN, WEBHOOK_PORT, WEBHOOK_PATH,
+    WEBHOOK_SECRET_TOKEN, WEBHOOK_CERT, WEBHOOK_KEY, WEBHOOK_MAX_CONNECTIONS, UPDATE_CONCURRENCY,
+    OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_GROUP_RATE, OUTBOUND_MAX_RETRIES,
+    SESSION_PERSISTENCE_PATH, SESSION_FLUSH_INTERVAL, SESSION_IDLE_TTL, SESSION_MAX_RESIDENT,
+    SESSION_SWEEP_INTERVAL, DB_ABANDONED_AFTER, DB_ABANDONED_SWEEP_INTERVAL, DB_ABANDONED_BATCH_SIZE,
+    DB_ABANDONED_LOOKBACK_DAYS, MAIN_MENU, SECTION_MENU, THEME, RESULT, METRICS_LOG_INTERVAL,
+    QUESTION_BANK_PATH, QUESTION_BANK_RELOAD_INTERVAL, DEFAULT_LOCALE, QUESTION_SAMPLING,
+    QUESTION_WEIGHTS_REBUILD_INTERVAL, SIMILAR_QUESTIONS_K, KEYBOARD_MODE, INLINE_QUERY_CACHE_SIZE,
+    INLINE_QUERY_CACHE_TIME, INLINE_QUERY_DEBOUNCE, INLINE_QUERY_RESULTS_LIMIT, BROADCAST_TIME,
+    BROADCAST_WORKERS, BROADCAST_PAGE_SIZE, BROADCAST_CHECKPOINT_INTERVAL
+)
+from .handlers import (
+    start, handle_main_menu, handle_section_choice, handle_theme_choice, handle_result_choice, cancel,
+    dialog_state_names, reload_question_bank, reload_questions, set_language, search_questions,
+    session_expired, navigate, use_buttons, subscribe, unsubscribe,
+)
+from .bankfile import BankFormatError, read_bank, watch_bank
+from .broadcast import broadcast_daily
 from .database import db
-from .questionary import Questionary
+from .locales import get_catalogue
+from .metrics import log_metrics_periodically
+from .outbound import OutboundScheduler
+from .persistence import SessionPersistence
+from .sessions import SessionManager, sweep_abandoned_periodically
+from .sharing import InlineQuestions
+from .updates import ChatOrderedUpdateProcessor
+from .weighting import rebuild_weights_periodically
 
 # Enable logging
 logging.basicConfig(
@@ -34,6 +82,14 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
+# Тип обновления Telegram, который принимает каждый вид обработчика
+HANDLER_UPDATE_TYPES = {
+    CommandHandler: Update.MESSAGE,
+    MessageHandler: Update.MESSAGE,
+    CallbackQueryHandler: Update.CALLBACK_QUERY,
+    InlineQueryHandler: Update.INLINE_QUERY,
+}
+
 async def post_init(application):
     """
     Инициализирует бота после создания приложения.
@@ -46,9 +102,65 @@ async def post_init(application):
     
     await db.init_pool()
     
-    # Инициализируем Questionary и сохраняем в bot_data для dependency injection
-    questionary = Questionary()
+    # Загружаем локаль по умолчанию; ее Questionary сохраняем в bot_data для
+    # dependency injection. Банк из файла заменяет вопросы этой локали,
+    # остальные локали загружаются при первом обращении пользователя.
+    questionary = get_catalogue(DEFAULT_LOCALE).questionary
+    if QUESTION_BANK_PATH:
+        try:
+            bank = read_bank(QUESTION_BANK_PATH)
+            questionary.use_bank(bank)
+            logger.info(f"Question bank {bank.version} loaded from {QUESTION_BANK_PATH}")
+        except (BankFormatError, OSError) as e:
+            logger.error(f"Failed to load question bank, using built-in questions: {e}")
+    # Индекс поиска и таблица похожих вопросов локали по умолчанию строятся
+    # в отдельном потоке до первого обращения пользователя
+    await questionary.prepare_search_index()
+    await questionary.prepare_neighbours(SIMILAR_QUESTIONS_K)
+    # Разметки меню и тексты разделов строятся до первого ответа
+    get_catalogue(DEFAULT_LOCALE).render()
     application.bot_data['questionary'] = questionary
+
+    # Назначаем коды состояниям разделов и тем в справочнике БД
+    await db.register_states(dialog_state_names(questionary))
+
+    if QUESTION_BANK_PATH and QUESTION_BANK_RELOAD_INTERVAL > 0:
+        application.bot_data['bank_watch_task'] = asyncio.create_task(watch_bank(
+            QUESTION_BANK_PATH, QUESTION_BANK_RELOAD_INTERVAL,
+            lambda: reload_question_bank(application.bot_data)
+        ))
+
+    if QUESTION_SAMPLING == 'weighted':
+        # Веса локалей регистрируются обработчиками при первом выборе вопроса
+        registry = application.bot_data.setdefault('question_weights', {})
+        application.bot_data['weights_task'] = asyncio.create_task(
+            rebuild_weights_periodically(registry, QUESTION_WEIGHTS_REBUILD_INTERVAL)
+        )
+
+    # Диалоги, восстановленные хранилищем сессий, учитываются при вытеснении
+    sessions = application.bot_data['sessions']
+    sessions.attach(application)
+    if SESSION_IDLE_TTL > 0:
+        application.bot_data['sessions_task'] = asyncio.create_task(
+            sessions.evict_idle_periodically(SESSION_SWEEP_INTERVAL)
+        )
+    if DB_ABANDONED_AFTER > 0:
+        application.bot_data['abandoned_task'] = asyncio.create_task(sweep_abandoned_periodically(
+            DB_ABANDONED_AFTER, DB_ABANDONED_LOOKBACK_DAYS, DB_ABANDONED_BATCH_SIZE,
+            DB_ABANDONED_SWEEP_INTERVAL
+        ))
+
+    if BROADCAST_TIME:
+        # Рассылка отправляет вопросы из банка и тексты локали по умолчанию
+        application.bot_data['broadcast_task'] = asyncio.create_task(broadcast_daily(
+            application.bot, db, get_catalogue(DEFAULT_LOCALE), time.fromisoformat(BROADCAST_TIME),
+            BROADCAST_WORKERS, BROADCAST_PAGE_SIZE, BROADCAST_CHECKPOINT_INTERVAL
+        ))
+
+    if METRICS_LOG_INTERVAL > 0:
+        application.bot_data['metrics_task'] = asyncio.create_task(
+            log_metrics_periodically(METRICS_LOG_INTERVAL)
+        )
     
     logger.info("Bot initialization completed")
 
@@ -62,34 +174,153 @@ async def post_stop(application):
         Экземпляр приложения Telegram Bot
     """
 
+    tasks = []
+    for task_name in ('metrics_task', 'bank_watch_task', 'weights_task', 'sessions_task', 'abandoned_task',
+                      'broadcast_task'):
+        task = application.bot_data.pop(task_name, None)
+        if task:
+            task.cancel()
+            tasks.append(task)
+    # Отмена фоновых задач дожидается до закрытия БД и хранилища сессий: проход
+    # вытеснения или поиска брошенных диалогов не прерывается закрытием пула,
+    # а прерванная рассылка успевает сохранить прогресс
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Закрытие БД также сбрасывает очередь отложенной записи
     await db.close()
     logger.info("Bot shutdown completed")
 
+def allowed_updates(application: Application) -> List[str]:
+    """
+    Возвращает типы обновлений, которые обрабатывают обработчики приложения.
+
+    Обработчики внутри ConversationHandler учитываются рекурсивно,
+    ``TypeHandler(Update)`` подписку не расширяет. Если тип обработчика
+    неизвестен, подписка не сужается.
+
+    Parameters
+    ----------
+    application : Application
+        Приложение с зарегистрированными обработчиками
+
+    Returns
+    -------
+    List[str]
+        Значение ``allowed_updates`` для getUpdates и setWebhook
+    """
+
+    types = set()
+    pending: List[BaseHandler] = [h for group in application.handlers.values() for h in group]
+    while pending:
+        handler = pending.pop()
+        if isinstance(handler, TypeHandler) and handler.type is Update:
+            # Наблюдает за обновлениями всех типов, не требуя новых
+            continue
+        if isinstance(handler, ConversationHandler):
+            pending.extend(handler.entry_points)
+            pending.extend(handler.fallbacks)
+            for state_handlers in handler.states.values():
+                pending.extend(state_handlers)
+            continue
+        update_type = HANDLER_UPDATE_TYPES.get(type(handler))
+        if update_type is None:
+            logger.warning(f"Unknown handler type {type(handler).__name__}, subscribing to all updates")
+            return Update.ALL_TYPES
+        types.add(update_type)
+    return sorted(types)
+
 def main() -> None:
     """
     Основная функция запуска бота.
     
     Инициализирует приложение, настраивает обработчики диалога
-    и запускает режим опроса (polling).
+    и запускает режим webhook, если задан WEBHOOK_URL, иначе режим опроса (polling).
     """
     
-    application = Application.builder().token(BOT_TOKEN).build()
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .base_url(f"{TELEGRAM_API_URL}/bot")
+        .base_file_url(f"{TELEGRAM_API_URL}/file/bot")
+        .concurrent_updates(ChatOrderedUpdateProcessor(UPDATE_CONCURRENCY))
+        .rate_limiter(OutboundScheduler(
+            OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST, OUTBOUND_GROUP_RATE,
+            OUTBOUND_MAX_RETRIES,
+        ))
+    )
+    if SESSION_PERSISTENCE_PATH:
+        builder.persistence(SessionPersistence(SESSION_PERSISTENCE_PATH, SESSION_FLUSH_INTERVAL))
+    application = builder.build()
     
     # Добавляем обработчики инициализации и остановки
     application.post_init = post_init
     application.post_stop = post_stop
 
     # Создаем обработчик диалога
-    conv_handler = ConversationHandler(
-        entry_points=[CommandHandler("start", start)],
-        states={
+    fallbacks = [CommandHandler("cancel", cancel), CommandHandler("language", set_language)]
+    if KEYBOARD_MODE == 'inline':
+        # Кнопки несут раздел и тему, поэтому один обработчик обслуживает все меню;
+        # текст во время диалога получает подсказку нажать кнопку
+        states = {state: [CallbackQueryHandler(navigate)] for state in (MAIN_MENU, SECTION_MENU, THEME, RESULT)}
+        fallbacks.append(MessageHandler(filters.TEXT & ~filters.COMMAND, use_buttons))
+        # Диалог ведется по пользователю в чате, а не по сообщению: предупреждение
+        # PTB о per_message=False с CallbackQueryHandler здесь не относится к делу
+        warnings.filterwarnings("ignore", message="If 'per_message=False'", category=PTBUserWarning)
+    else:
+        states = {
             MAIN_MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_main_menu)],
             SECTION_MENU: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_section_choice)],
             THEME: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_theme_choice)],
             RESULT: [MessageHandler(filters.TEXT & ~filters.COMMAND, handle_result_choice)],
-        },
-        fallbacks=[CommandHandler("cancel", cancel)],
+        }
+    conv_handler = ConversationHandler(
+        entry_points=[CommandHandler("start", start)],
+        states=states,
+        fallbacks=fallbacks,
+        name="dialog",
+        persistent=bool(SESSION_PERSISTENCE_PATH),
     )
 
+    # Активность пользователей отмечается до остальных обработчиков
+    sessions = SessionManager(conv_handler, SESSION_IDLE_TTL, SESSION_MAX_RESIDENT)
+    application.bot_data['sessions'] = sessions
+    application.add_handler(TypeHandler(Update, sessions.touch), group=-1)
+
     application.add_handler(conv_handler)
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    application.add_handler(CommandHandler("language", set_language))
+    application.add_handler(CommandHandler("reload_questions", reload_questions))
+    application.add_handler(CommandHandler("search", search_questions))
+    if BROADCAST_TIME:
+        application.add_handler(CommandHandler("subscribe", subscribe))
+        application.add_handler(CommandHandler("unsubscribe", unsubscribe))
+    # Встроенный режим: ожидание интервала между ответами не задерживает
+    # следующие запросы пользователя, поэтому обработчик не блокирующий
+    inline_questions = InlineQuestions(
+        INLINE_QUERY_CACHE_SIZE, INLINE_QUERY_CACHE_TIME, INLINE_QUERY_DEBOUNCE, INLINE_QUERY_RESULTS_LIMIT
+    )
+    application.add_handler(InlineQueryHandler(inline_questions.answer, block=False))
+    # Сообщение вне диалога: сессия вытеснена или диалог не начат
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, session_expired))
+    if KEYBOARD_MODE == 'inline':
+        application.add_handler(CallbackQueryHandler(session_expired))
+    # Сессии, вытесненные во время обработки своего обновления, учитываются снова
+    application.add_handler(TypeHandler(Update, sessions.settle), group=1)
+
+    updates = allowed_updates(application)
+    if not WEBHOOK_URL:
+        application.run_polling(allowed_updates=updates)
+        return
+
+    # Без сертификата сервер принимает HTTP, а TLS завершается на обратном прокси
+    logger.info(f"Starting webhook on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+    application.run_webhook(
+        listen=WEBHOOK_LISTEN,
+        port=WEBHOOK_PORT,
+        url_path=WEBHOOK_PATH,
+        webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+        secret_token=WEBHOOK_SECRET_TOKEN,
+        cert=WEBHOOK_CERT or None,
+        key=WEBHOOK_KEY or None,
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        allowed_updates=updates,
+    )
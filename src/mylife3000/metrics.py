@@ -0,0 +1,191 @@
+"""
+Модуль метрик приложения.
+
+Реализует минимальный внутрипроцессный реестр метрик без внешних
+зависимостей: счетчики, датчики и сводки латентности. Снимок реестра
+можно периодически выводить в лог или отдавать внешней системе мониторинга.
+
+Classes:
+    Counter: Монотонно возрастающий счетчик
+    Gauge: Датчик текущего значения
+    Summary: Сводка наблюдений (количество, сумма, максимум)
+    MetricsRegistry: Реестр именованных метрик
+
+Functions:
+    log_metrics_periodically: Фоновая задача вывода метрик в лог
+
+Attributes:
+    metrics (MetricsRegistry): Глобальный реестр метрик
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Counter:
+    """
+    Монотонно возрастающий счетчик.
+
+    Attributes
+    ----------
+    value : int
+        Текущее значение счетчика
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """Увеличивает счетчик на ``amount``."""
+        self.value += amount
+
+
+class Gauge:
+    """
+    Датчик текущего значения.
+
+    Значение задается явно через ``set`` либо вычисляется функцией
+    ``getter`` в момент снятия снимка.
+    """
+
+    __slots__ = ("_value", "_getter")
+
+    def __init__(self, getter: Optional[Callable[[], float]] = None):
+        self._value: float = 0
+        self._getter = getter
+
+    def set(self, value: float) -> None:
+        """Устанавливает текущее значение датчика."""
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._getter() if self._getter else self._value
+
+
+class Summary:
+    """
+    Сводка наблюдений, например латентности в секундах.
+
+    Attributes
+    ----------
+    count : int
+        Количество наблюдений
+    total : float
+        Сумма наблюдений
+    max : float
+        Максимальное наблюдение
+    last : float
+        Последнее наблюдение
+    """
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float) -> None:
+        """Добавляет наблюдение в сводку."""
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+Metric = Union[Counter, Gauge, Summary]
+
+
+class MetricsRegistry:
+    """
+    Реестр именованных метрик.
+
+    Повторный запрос метрики с тем же именем возвращает уже
+    зарегистрированный экземпляр.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str) -> Counter:
+        """Возвращает счетчик с указанным именем, создавая его при необходимости."""
+        return self._get_or_create(name, Counter)
+
+    def gauge(self, name: str, getter: Optional[Callable[[], float]] = None) -> Gauge:
+        """
+        Возвращает датчик с указанным именем.
+
+        Если передан ``getter``, он заменяет функцию вычисления значения
+        уже зарегистрированного датчика.
+        """
+        gauge = self._get_or_create(name, Gauge)
+        if getter is not None:
+            gauge._getter = getter
+        return gauge
+
+    def summary(self, name: str) -> Summary:
+        """Возвращает сводку с указанным именем, создавая ее при необходимости."""
+        return self._get_or_create(name, Summary)
+
+    def _get_or_create(self, name: str, cls):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls()
+        elif not isinstance(metric, cls):
+            raise TypeError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Возвращает плоский снимок всех метрик.
+
+        Сводки разворачиваются в ключи ``<name>_count``, ``<name>_avg``
+        и ``<name>_max``.
+
+        Returns
+        -------
+        Dict[str, float]
+            Словарь {имя_метрики: значение}
+        """
+
+        result: Dict[str, float] = {}
+        for name, metric in sorted(self._metrics.items()):
+            if isinstance(metric, Summary):
+                result[f"{name}_count"] = metric.count
+                result[f"{name}_avg"] = metric.avg
+                result[f"{name}_max"] = metric.max
+            else:
+                result[name] = metric.value
+        return result
+
+
+async def log_metrics_periodically(interval: float) -> None:
+    """
+    Периодически выводит снимок метрик в лог.
+
+    Parameters
+    ----------
+    interval : float
+        Интервал между выводами, секунды
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        snapshot = metrics.snapshot()
+        logger.info("Metrics: " + ", ".join(f"{k}={v:g}" for k, v in snapshot.items()))
+
+
+# Глобальный реестр метрик
+metrics = MetricsRegistry()
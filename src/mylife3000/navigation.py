@@ -0,0 +1,129 @@
+"""
+Модуль кодирования ``callback_data`` инлайн-навигации.
+
+В режиме KEYBOARD_MODE=inline кнопки меню - ``InlineKeyboardButton``, и
+нажатие приходит боту как ``CallbackQuery`` с ``callback_data`` кнопки
+(не длиннее 64 байт). Вместо названий разделов и тем в данные кнопки
+записываются их номера в банке вопросов и начало версии банка:
+
+    <действие>:<версия>:<раздел>:<тема>
+
+например ``t:3f9a2c:2:5`` - тема 5 раздела 2 (около 15 байт). Кнопка
+несет весь контекст экрана, поэтому навигация не зависит от
+``user_data``, а кнопки сообщения, показанного до перезагрузки банка,
+распознаются по версии.
+
+Functions:
+    encode: ``callback_data`` кнопки
+    decode: Разбор ``callback_data`` для текущего банка вопросов
+
+Attributes:
+    ACTIONS (FrozenSet[str]): Коды действий кнопок
+"""
+
+from typing import FrozenSet, NamedTuple, Optional
+
+from .questionary import QuestionBank
+
+# Коды действий: главное меню, "О проекте", раздел, случайный вопрос раздела,
+# выбор темы, тема, еще вопрос, похожий вопрос, завершить
+MAIN_MENU = "m"
+ABOUT = "a"
+SECTION = "s"
+RANDOM = "r"
+CHOOSE_THEME = "c"
+THEME = "t"
+MORE = "n"
+SIMILAR = "l"
+FINISH = "f"
+
+ACTIONS: FrozenSet[str] = frozenset((MAIN_MENU, ABOUT, SECTION, RANDOM, CHOOSE_THEME, THEME, MORE, SIMILAR, FINISH))
+
+# Символов версии банка в callback_data: достаточно, чтобы отличить соседние версии
+VERSION_LENGTH = 6
+
+
+class Navigation(NamedTuple):
+    """
+    Разобранное нажатие кнопки.
+
+    Attributes
+    ----------
+    action : str
+        Код действия
+    section : Optional[str]
+        Название раздела
+    theme : Optional[str]
+        Название темы
+    """
+
+    action: str
+    section: Optional[str] = None
+    theme: Optional[str] = None
+
+
+def encode(action: str, bank: Optional[QuestionBank] = None, section: int = -1, theme: int = -1) -> str:
+    """
+    Возвращает ``callback_data`` кнопки.
+
+    Parameters
+    ----------
+    action : str
+        Код действия
+    bank : Optional[QuestionBank], optional
+        Банк вопросов, если кнопка относится к разделу
+    section : int, optional
+        Номер раздела в ``bank.section_names``
+    theme : int, optional
+        Номер темы в ``bank.themes[раздел]``
+
+    Returns
+    -------
+    str
+        Данные кнопки
+    """
+
+    if bank is None:
+        return action
+    if theme < 0:
+        return f"{action}:{bank.version[:VERSION_LENGTH]}:{section}"
+    return f"{action}:{bank.version[:VERSION_LENGTH]}:{section}:{theme}"
+
+
+def decode(data: Optional[str], bank: QuestionBank) -> Optional[Navigation]:
+    """
+    Разбирает ``callback_data`` кнопки для текущего банка вопросов.
+
+    Parameters
+    ----------
+    data : Optional[str]
+        Данные нажатой кнопки
+    bank : QuestionBank
+        Текущий банк вопросов локали пользователя
+
+    Returns
+    -------
+    Optional[Navigation]
+        Действие с названиями раздела и темы или None, если данные
+        повреждены или кнопка показана для другой версии банка
+    """
+
+    if not data:
+        return None
+    action, *fields = data.split(":")
+    if action not in ACTIONS:
+        return None
+    if not fields:
+        return Navigation(action)
+    if fields[0] != bank.version[:VERSION_LENGTH]:
+        return None
+    # Номера - только неотрицательные целые: отрицательный индекс кортежа выбрал бы чужой раздел
+    if not all(field.isdigit() for field in fields[1:]):
+        return None
+    try:
+        section = bank.section_names[int(fields[1])]
+        if len(fields) == 2:
+            return Navigation(action, section)
+        return Navigation(action, section, bank.themes[section][int(fields[2])])
+    except IndexError:
+        return None
@@ -0,0 +1,304 @@
+"""
+Модуль планирования исходящих запросов к Bot API.
+
+Telegram ограничивает частоту сообщений бота: около 30 в секунду всего,
+около одного в секунду в личный чат и 20 в минуту в группу. При
+превышении Bot API отвечает 429 с ``retry_after``, и все запросы,
+повторяемые независимо друг от друга, снова упираются в ограничение.
+
+``OutboundScheduler`` передается в ``ApplicationBuilder.rate_limiter`` и
+пропускает через себя все вызовы Bot API бота, включая ``reply_text`` в
+обработчиках:
+
+- запрос с ``chat_id`` сначала ждет маркер корзины своего чата, затем
+  общей корзины бота; корзины чатов не задерживают друг друга;
+- общие маркеры выдаются по приоритету: ответы пользователям
+  (``INTERACTIVE``) раньше массовых рассылок (``BULK``). Приоритет
+  передается аргументом ``rate_limit_args`` методов бота;
+- ответ 429 приостанавливает выдачу маркеров всем запросам на
+  ``retry_after`` секунд, после чего запрос повторяется без потери места
+  в очереди.
+
+Classes:
+    TokenBucket: Корзина маркеров с резервированием по времени
+    OutboundScheduler: Планировщик исходящих запросов с приоритетами
+
+Attributes:
+    INTERACTIVE (int): Приоритет ответов пользователям
+    BULK (int): Приоритет массовых рассылок
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньшее значение обслуживается раньше
+INTERACTIVE = 0
+BULK = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Число корзин чатов, после которого из словаря удаляются полные корзины
+_PRUNE_THRESHOLD = 4096
+
+JSONResult = Union[bool, Dict[str, Any], List[Dict[str, Any]]]
+
+
+class TokenBucket:
+    """
+    Корзина маркеров с резервированием по времени (GCRA).
+
+    Вместо числа маркеров хранится одно число - теоретическое время
+    следующего запроса. ``reserve`` сразу занимает маркер и возвращает,
+    сколько ждать до него, поэтому ожидающие получают маркеры в порядке
+    обращения, а корзина занимает в памяти одно число с плавающей точкой.
+
+    Attributes:
+        interval (float): Время пополнения одного маркера, секунды
+        tolerance (float): Запас времени на пачку из ``burst`` запросов, секунды
+    """
+
+    __slots__ = ("interval", "tolerance", "tat")
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1 / rate
+        self.tolerance = (burst - 1) * self.interval
+        self.tat = 0.0
+
+    def delay(self, now: float) -> float:
+        """Время до следующего свободного маркера, секунды (0 - маркер есть)."""
+
+        return max(0.0, self.tat - self.tolerance - now)
+
+    def reserve(self, now: float) -> float:
+        """Занимает маркер и возвращает время ожидания до него, секунды."""
+
+        tat = max(self.tat, now)
+        self.tat = tat + self.interval
+        return max(0.0, tat - self.tolerance - now)
+
+    def full(self, now: float) -> bool:
+        """Корзина полна: ее можно удалить без изменения поведения."""
+
+        return self.tat <= now
+
+
+class OutboundScheduler(BaseRateLimiter):
+    """
+    Планировщик исходящих запросов Bot API с приоритетами.
+
+    Общие маркеры выдает одна фоновая задача: она берет из кучи ожидающий
+    запрос с наименьшим приоритетом (при равном - самый ранний) в момент,
+    когда в общей корзине появляется маркер и не действует пауза после 429.
+
+    Attributes:
+        global_rate (float): Запросов в секунду на бота (0 - без ограничения)
+        chat_rate (float): Запросов в секунду в личный чат (0 - без ограничения)
+        chat_burst (int): Запросов подряд в личный чат без ожидания
+        group_rate (float): Запросов в минуту в группу или канал (0 - без ограничения)
+        max_retries (int): Наибольшее число повторов после ответа 429
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: int,
+        group_rate: float,
+        max_retries: int,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self._global: Optional[TokenBucket] = TokenBucket(global_rate) if global_rate else None
+        self._chats: Dict[Union[int, str], TokenBucket] = {}
+        # Куча (приоритет, порядковый номер, future ожидающего запроса)
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # Время monotonic, до которого запросы не отправляются после ответа 429
+        self._paused_until = 0.0
+        self._queue_seconds = {
+            priority: metrics.summary(f"outbound_queue_seconds_{name}")
+            for priority, name in PRIORITY_NAMES.items()
+        }
+        self._retry_after = metrics.counter("outbound_retry_after")
+        self._failed = metrics.counter("outbound_failed")
+        metrics.gauge("outbound_waiting", lambda: len(self._waiting))
+        metrics.gauge("outbound_chat_buckets", lambda: len(self._chats))
+
+    async def initialize(self) -> None:
+        """Запускает задачу выдачи общих маркеров."""
+
+        # ExtBot вызывает initialize при каждой инициализации бота, даже повторной
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+        self._wakeup = asyncio.Event()
+        if self._global is not None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def shutdown(self) -> None:
+        """Останавливает задачу выдачи маркеров и отменяет ожидающие запросы."""
+
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._dispatcher
+            self._dispatcher = None
+        for _, _, waiter in self._waiting:
+            waiter.cancel()
+        self._waiting.clear()
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, JSONResult]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> JSONResult:
+        """
+        Выполняет запрос Bot API после маркеров чата и бота.
+
+        Parameters
+        ----------
+        callback : Callable
+            Выполнение запроса
+        args : Any
+            Позиционные аргументы ``callback``
+        kwargs : Dict[str, Any]
+            Именованные аргументы ``callback``
+        endpoint : str
+            Метод Bot API
+        data : Dict[str, Any]
+            Параметры запроса
+        rate_limit_args : Optional[int]
+            Приоритет запроса: ``INTERACTIVE`` (по умолчанию) или ``BULK``
+
+        Returns
+        -------
+        JSONResult
+            Результат запроса
+
+        Raises
+        ------
+        RetryAfter
+            Если Bot API отвечает 429 после ``max_retries`` повторов
+        """
+
+        priority = INTERACTIVE if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        queued = time.monotonic()
+        # Номер в очереди сохраняется при повторах после 429
+        sequence = next(self._sequence)
+        if chat_id is not None:
+            bucket = self._chat_bucket(chat_id)
+            if bucket is not None:
+                delay = bucket.reserve(queued)
+                if delay:
+                    await asyncio.sleep(delay)
+
+        attempt = 0
+        while True:
+            if chat_id is not None and self._global is not None:
+                await self._acquire(priority, sequence)
+            else:
+                # Запросы без чата (getMe, setWebhook, answerCallbackQuery) не
+                # ограничиваются корзинами, но ждут окончания паузы после 429
+                delay = self._paused_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            if not attempt:
+                self._queue_seconds.get(priority, self._queue_seconds[BULK]).observe(
+                    time.monotonic() - queued
+                )
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self._retry_after.inc()
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                if self._wakeup is not None:
+                    self._wakeup.set()
+                if attempt == self.max_retries:
+                    self._failed.inc()
+                    logger.error(f"{endpoint} failed after {attempt} retries: flood limit, retry after {e.retry_after}s")
+                    raise
+                logger.warning(f"{endpoint} hit flood limit, all requests paused for {e.retry_after}s")
+                attempt += 1
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> Optional[TokenBucket]:
+        """
+        Корзина маркеров чата.
+
+        Отрицательный ID или ``@username`` - группа или канал с ограничением в
+        минуту, положительный ID - личный чат.
+        """
+
+        group = isinstance(chat_id, str) or chat_id < 0
+        if isinstance(chat_id, str) and chat_id.lstrip("-").isdigit():
+            chat_id = int(chat_id)
+            group = chat_id < 0
+        if not (self.group_rate if group else self.chat_rate):
+            return None
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= _PRUNE_THRESHOLD:
+                self._prune()
+            bucket = self._chats[chat_id] = (
+                TokenBucket(self.group_rate / 60) if group else TokenBucket(self.chat_rate, self.chat_burst)
+            )
+        return bucket
+
+    def _prune(self) -> None:
+        """Удаляет полные корзины чатов: они не отличаются от новых."""
+
+        now = time.monotonic()
+        for chat_id in [chat_id for chat_id, bucket in self._chats.items() if bucket.full(now)]:
+            del self._chats[chat_id]
+
+    async def _acquire(self, priority: int, sequence: int) -> None:
+        """Ждет общий маркер в очереди по приоритету."""
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, sequence, waiter))
+        self._wakeup.set()
+        await waiter
+
+    async def _dispatch(self) -> None:
+        """Выдает общие маркеры ожидающим запросам по приоритету."""
+
+        while True:
+            if not self._waiting:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            now = time.monotonic()
+            delay = max(self._paused_until - now, self._global.delay(now))
+            if delay > 0:
+                # Запрос с более высоким приоритетом, пришедший за время
+                # ожидания, получит маркер первым
+                self._wakeup.clear()
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+            _, _, waiter = heapq.heappop(self._waiting)
+            if waiter.done():
+                # Ожидание отменено вызывающим
+                continue
+            self._global.reserve(now)
+            waiter.set_result(None)
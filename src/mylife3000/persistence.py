@@ -0,0 +1,308 @@
+"""
+Модуль сохранения диалогов пользователей между перезапусками бота.
+
+``SessionPersistence`` - хранилище ``telegram.ext.BasePersistence`` в
+локальном файле SQLite: состояние ``ConversationHandler`` и
+``context.user_data`` пользователя лежат в одной строке таблицы
+``sessions``:
+
+- ``user_id`` - ID пользователя Telegram (первичный ключ);
+- ``state`` - состояние диалога в личном чате с ботом или NULL;
+- ``data`` - ``user_data`` в компактном JSON;
+- ``chats`` - состояния диалога в других чатах, JSON ``{чат: состояние}``, обычно NULL.
+
+Файл хранится отдельно от статистики диалогов, которая не содержит ID
+пользователей. Приложение передает измененные записи раз в
+SESSION_FLUSH_INTERVAL секунд; все изменения одного прохода записываются
+одной транзакцией в отдельном потоке.
+
+При запуске читаются только состояния диалогов (целые числа), поэтому
+восстановление сотен тысяч сессий занимает доли секунды. ``user_data``
+пользователя читается и разбирается перед первым его обновлением после
+запуска (``refresh_user_data``) - одно обращение по первичному ключу;
+данные пользователей, которые не вернулись, в память не загружаются.
+
+Classes:
+    SessionPersistence: Сохранение состояний диалога и user_data в SQLite
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ConversationKey = Tuple[int, ...]
+
+
+class SessionPersistence(BasePersistence):
+    """
+    Сохранение состояний одного ConversationHandler и user_data в файле SQLite.
+
+    ``chat_data``, ``bot_data`` и данные кнопок не сохраняются. Ключ
+    диалога - ``(chat_id, user_id)`` (``per_chat`` и ``per_user`` по
+    умолчанию).
+
+    Attributes:
+        path (str): Путь к файлу SQLite
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            user_id INTEGER PRIMARY KEY,
+            state INTEGER,
+            data TEXT,
+            chats TEXT
+        );
+    """
+
+    def __init__(self, path: str, update_interval: float):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Последние записанные user_data загруженных сессий в JSON
+        self._user_data: Dict[int, str] = {}
+        # Состояния диалогов по ключу (chat_id, user_id)
+        self._states: Dict[ConversationKey, object] = {}
+        # ID чатов, кроме личного, с диалогом пользователя
+        self._chats: Dict[int, set] = {}
+        # Пользователи с сохраненными user_data, еще не загруженными в приложение
+        self._unloaded: set = set()
+        self._dirty: set = set()
+        self._write_task: Optional[asyncio.Task] = None
+        self._restored = False
+
+    async def _run(self, func, *args):
+        """Выполняет функцию над подключением в потоке исполнителя."""
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sessions")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self) -> List[Tuple[int, Optional[int], Optional[str], bool]]:
+        """Открывает файл, создает схему и читает состояния сессий; выполняется в потоке."""
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self.SCHEMA)
+        self._conn = conn
+        return conn.execute("SELECT user_id, state, chats, data IS NOT NULL FROM sessions").fetchall()
+
+    def _read_data(self, user_id: int) -> Optional[str]:
+        """Читает user_data одной сессии; выполняется в потоке."""
+
+        row = self._conn.execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else None
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        """
+        Читает состояния сохраненных сессий.
+
+        Returns
+        -------
+        Dict[int, Dict[Any, Any]]
+            Пустой словарь: ``user_data`` загружается в ``refresh_user_data``
+        """
+
+        if self._restored:
+            return {}
+        started = time.perf_counter()
+        rows = await self._run(self._connect)
+        states = self._states
+        for user_id, state, chats, has_data in rows:
+            if has_data:
+                self._unloaded.add(user_id)
+            if state is not None:
+                states[(user_id, user_id)] = state
+            if chats:
+                for chat, value in json.loads(chats).items():
+                    states[(int(chat), user_id)] = value
+                    self._chats.setdefault(user_id, set()).add(int(chat))
+        self._restored = True
+        elapsed = time.perf_counter() - started
+        metrics.summary("sessions_restore_seconds").observe(elapsed)
+        logger.info(f"Restored {len(rows)} sessions from {self.path} in {elapsed:.2f} s")
+        return {}
+
+    async def get_conversations(self, name: str) -> Dict[ConversationKey, object]:
+        await self.get_user_data()
+        return dict(self._states)
+
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        """Загружает сохраненные user_data перед первым обновлением пользователя после запуска."""
+
+        if user_id not in self._unloaded:
+            return
+        self._unloaded.discard(user_id)
+        try:
+            encoded = await self._run(self._read_data, user_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read session of user {user_id}: {e}")
+            return
+        if encoded and not user_data:
+            self._user_data[user_id] = encoded
+            user_data.update(json.loads(encoded))
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        if user_id in self._unloaded:
+            # Обновление пользователя не дошло до обработчиков: данные в приложении
+            # еще не загружены и не изменились
+            return
+        try:
+            encoded = json.dumps(data, ensure_ascii=False, separators=(",", ":")) if data else None
+        except (TypeError, ValueError) as e:
+            logger.error(f"Failed to encode user_data of user {user_id}: {e}")
+            return
+        if encoded == self._user_data.get(user_id):
+            return
+        if encoded is None:
+            self._user_data.pop(user_id, None)
+        else:
+            self._user_data[user_id] = encoded
+        self._mark_dirty(user_id)
+
+    async def update_conversation(self, name: str, key: ConversationKey, new_state: Optional[object]) -> None:
+        key = (key[0], key[-1])
+        chat_id, user_id = key
+        if new_state is None:
+            if self._states.pop(key, None) is None:
+                return
+            if chat_id != user_id:
+                chats = self._chats[user_id]
+                chats.discard(chat_id)
+                if not chats:
+                    del self._chats[user_id]
+        else:
+            if self._states.get(key) == new_state:
+                return
+            self._states[key] = new_state
+            if chat_id != user_id:
+                self._chats.setdefault(user_id, set()).add(chat_id)
+        self._mark_dirty(user_id)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._unloaded.discard(user_id)
+        self._user_data.pop(user_id, None)
+        self._mark_dirty(user_id)
+
+    def _mark_dirty(self, user_id: int) -> None:
+        """Отмечает сессию для записи и планирует запись после текущего прохода приложения."""
+
+        self._dirty.add(user_id)
+        if self._write_task is None or self._write_task.done():
+            # Приложение вызывает update_* для всех измененных записей одним gather;
+            # задача записи выполнится после них и запишет все одной транзакцией
+            self._write_task = asyncio.create_task(self._write_dirty())
+
+    def _rows(self, user_ids: List[int]) -> Tuple[List[Tuple], List[Tuple], List[Tuple[int]]]:
+        """Строки для записи, состояния незагруженных сессий и ID сессий для удаления."""
+
+        upserts, states_only, deletes = [], [], []
+        for user_id in user_ids:
+            data = self._user_data.get(user_id)
+            state = self._states.get((user_id, user_id))
+            chats = None
+            if user_id in self._chats:
+                chats = json.dumps(
+                    {chat_id: self._states[(chat_id, user_id)] for chat_id in self._chats[user_id]},
+                    separators=(",", ":"),
+                )
+            if user_id in self._unloaded:
+                # user_data не загружены: в строке меняются только состояния
+                states_only.append((state, chats, user_id))
+            elif data is None and state is None and chats is None:
+                deletes.append((user_id,))
+            else:
+                upserts.append((user_id, state, data, chats))
+        return upserts, states_only, deletes
+
+    def _write(self, upserts: List[Tuple], states_only: List[Tuple], deletes: List[Tuple[int]]) -> None:
+        """Записывает изменения одной транзакцией; выполняется в потоке."""
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "INSERT INTO sessions (user_id, state, data, chats) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET state = excluded.state, data = excluded.data, "
+                "chats = excluded.chats",
+                upserts,
+            )
+            self._conn.executemany("UPDATE sessions SET state = ?, chats = ? WHERE user_id = ?", states_only)
+            self._conn.executemany("DELETE FROM sessions WHERE user_id = ?", deletes)
+        except sqlite3.Error:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    async def _write_dirty(self) -> None:
+        """Записывает измененные сессии, пока они есть."""
+
+        while self._dirty and self._conn is not None:
+            user_ids = list(self._dirty)
+            self._dirty.clear()
+            rows = self._rows(user_ids)
+            started = time.perf_counter()
+            try:
+                await self._run(self._write, *rows)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(user_ids)} sessions: {e}")
+                # Записи остаются измененными до следующего прохода приложения
+                self._dirty.update(user_ids)
+                return
+            metrics.summary("sessions_flush_seconds").observe(time.perf_counter() - started)
+            metrics.counter("sessions_written").inc(len(user_ids))
+
+    async def flush(self) -> None:
+        """Дописывает изменения и закрывает файл; вызывается приложением при остановке."""
+
+        if self._write_task is not None:
+            await self._write_task
+        await self._write_dirty()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # Остальные данные не сохраняются
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        return {}
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        pass
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
@@ -4,23 +4,189 @@
 Реализует сервисный слой для работы с вопросами, обеспечивая
 изоляцию хендлеров от структуры данных вопросов.
 
+Вопросы компилируются в неизменяемый банк ``QuestionBank``: один кортеж
+всех вопросов, где вопросы каждого раздела и каждой темы лежат подряд, и
+диапазоны (начало, конец) разделов и тем. Случайный вопрос выбирается
+одним вызовом генератора случайных чисел по диапазону без выделения
+памяти на запрос. Режим без повторений ведет для пользователя курсоры
+по псевдослучайным перестановкам диапазонов (см. модуль ``sampling``),
+режим по весам - таблицы псевдонимов диапазонов (см. модуль ``weighting``).
+Поиск по словам выполняется по инвертированному индексу версии банка
+(см. модуль ``search``), похожие вопросы - по таблице ближайших соседей
+(см. модуль ``similarity``); индекс и таблица строятся в отдельном потоке
+вне обработки запросов. Банк строится не более одного раза за процесс и
+разделяется всеми экземплярами ``Questionary``; исходные словари
+``questions_data`` при этом не изменяются.
+
 Classes:
+    QuestionBank: Неизменяемый скомпилированный банк вопросов
     Questionary: Основной класс для управления вопросами
+
+Functions:
+    build_question_bank: Компиляция банка вопросов из словарей разделов
+    load_question_bank: Загрузка банка вопросов по умолчанию (один раз за процесс)
     
 Methods:
     get_section_questions: Получение вопросов раздела
     get_section_description: Получение описания раздела
     get_random_question: Получение случайного вопроса
+    get_random_question_id: Получение ID случайного вопроса
+    get_next_question: Получение следующего вопроса без повторений
+    get_next_question_id: Получение ID следующего вопроса без повторений
+    get_similar_question_id: Получение ID похожего вопроса
+    prepare: Построение недостающих таблиц в фоне
+    prepare_neighbours: Построение таблицы похожих вопросов в отдельном потоке
+    prepare_search_index: Построение индекса поиска в отдельном потоке
+    get_question: Получение вопроса по ID
     get_themes: Получение списка тем раздела
     get_all_sections: Получение всех разделов
+    has_section: Проверка существования раздела
+    search: Поиск вопросов по словам
+    search_ids: Поиск ID вопросов по словам
 """
 
+import asyncio
+import hashlib
+import logging
 import random
-from typing import Dict, List, Optional
-from .questions_data import (
-    QUESTIONS_SELF_KNOWLEDGE, QUESTIONS_VECTOR, QUESTIONS_CHALLENGES,
-    QUESTIONS_ENVIRONMENT, QUESTIONS_INTEGRATION, QUESTIONS_MEMORIES
-)
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Awaitable, Callable, Dict, List, Mapping, MutableMapping, NamedTuple, Optional, Sequence, Tuple
+from .sampling import WeightSnapshot, draw
+from .search import SearchIndex, build_search_index
+from .similarity import NeighbourTable, build_neighbour_table
+
+logger = logging.getLogger(__name__)
+
+# Описания разделов
+SECTION_DESCRIPTIONS: Mapping[str, str] = MappingProxyType({
+    "Самопознание: Кто Я?": "Самопознание: Кто Я? - это вопросы, помогающие понять свою личность, ценности и убеждения",
+    "Вектор: Куда я движусь?": "Вектор: Куда я движусь? - вопросы о целях, мечтах и направлении жизни",
+    "Вызовы: Что мне мешает?": "Вызовы: Что мне мещается? - вопросы о трудностях, страхах и ограничениях",
+    "Окружение: Мои отношения?": "Окружение: Мои отношения? - вопросы о взаимодействии с людьми и социальной среде",
+    "Интеграция: Как я живу?": "Интеграция: Как я живу? - вопросы о повседневной жизни, привычках и ритуалах",
+    "Капсула Времени: История для моих детей": "Капсула Времени: История для моих детей - это то, что мы можем оставить себе будущему и потомкам"
+})
+
+
+class QuestionBank(NamedTuple):
+    """
+    Неизменяемый скомпилированный банк вопросов.
+
+    Все поля - кортежи, ``MappingProxyType`` или неизменяемые представления
+    (банк из файла, см. модуль ``bankfile``), поэтому один экземпляр
+    безопасно разделяется любым числом ``Questionary``.
+
+    Attributes
+    ----------
+    questions : Sequence[str]
+        Все вопросы; индекс вопроса служит его ID
+    sections : Mapping[str, Mapping[str, Sequence[str]]]
+        Разделы, темы и вопросы
+    section_descriptions : Mapping[str, str]
+        Описания разделов
+    section_names : Tuple[str, ...]
+        Названия разделов в порядке меню
+    themes : Mapping[str, Tuple[str, ...]]
+        Названия тем каждого раздела
+    section_ranges : Mapping[str, Tuple[int, int]]
+        Диапазоны ID вопросов разделов
+    theme_ranges : Mapping[Tuple[str, str], Tuple[int, int]]
+        Диапазоны ID вопросов тем по ключу (раздел, тема)
+    version : str
+        Контрольная сумма содержимого банка; меняется при любом изменении вопросов
+    """
+
+    questions: Sequence[str]
+    sections: Mapping[str, Mapping[str, Sequence[str]]]
+    section_descriptions: Mapping[str, str]
+    section_names: Tuple[str, ...]
+    themes: Mapping[str, Tuple[str, ...]]
+    section_ranges: Mapping[str, Tuple[int, int]]
+    theme_ranges: Mapping[Tuple[str, str], Tuple[int, int]]
+    version: str
+
+
+def build_question_bank(
+    sections: Mapping[str, Mapping[str, Sequence[str]]],
+    section_descriptions: Mapping[str, str],
+) -> QuestionBank:
+    """
+    Компилирует словари разделов в неизменяемый банк вопросов.
+
+    Вопросы раскладываются в один кортеж по разделам и темам, так что
+    каждому разделу и каждой теме соответствует непрерывный диапазон ID.
+    Исходные словари копируются и не изменяются.
+
+    Parameters
+    ----------
+    sections : Mapping[str, Mapping[str, Sequence[str]]]
+        Словарь {раздел: {тема: вопросы}}
+    section_descriptions : Mapping[str, str]
+        Словарь {раздел: описание}
+
+    Returns
+    -------
+    QuestionBank
+        Скомпилированный банк вопросов
+    """
+
+    questions: List[str] = []
+    frozen_sections: Dict[str, Mapping[str, Tuple[str, ...]]] = {}
+    themes: Dict[str, Tuple[str, ...]] = {}
+    section_ranges: Dict[str, Tuple[int, int]] = {}
+    theme_ranges: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    for section_name, questions_dict in sections.items():
+        section_start = len(questions)
+        frozen_themes: Dict[str, Tuple[str, ...]] = {}
+        for theme, theme_questions in questions_dict.items():
+            theme_start = len(questions)
+            frozen_themes[theme] = tuple(theme_questions)
+            questions.extend(frozen_themes[theme])
+            theme_ranges[(section_name, theme)] = (theme_start, len(questions))
+        section_ranges[section_name] = (section_start, len(questions))
+        frozen_sections[section_name] = MappingProxyType(frozen_themes)
+        themes[section_name] = tuple(frozen_themes)
+
+    digest = hashlib.blake2b(digest_size=8)
+    for section_name, themes_tuple in themes.items():
+        digest.update(f"{section_name}\0{section_ranges[section_name]}\0".encode())
+        for theme in themes_tuple:
+            digest.update(f"{theme}\0{theme_ranges[(section_name, theme)]}\0".encode())
+    for question in questions:
+        digest.update(question.encode())
+        digest.update(b"\0")
+
+    return QuestionBank(
+        questions=tuple(questions),
+        sections=MappingProxyType(frozen_sections),
+        section_descriptions=MappingProxyType(dict(section_descriptions)),
+        section_names=tuple(frozen_sections),
+        themes=MappingProxyType(themes),
+        section_ranges=MappingProxyType(section_ranges),
+        theme_ranges=MappingProxyType(theme_ranges),
+        version=digest.hexdigest(),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_question_bank() -> QuestionBank:
+    """
+    Возвращает банк вопросов из модуля questions_data.
+
+    Модуль вопросов импортируется и банк компилируется при первом
+    вызове и далее разделяется всеми вызывающими в пределах процесса.
+
+    Returns
+    -------
+    QuestionBank
+        Банк вопросов по умолчанию
+    """
+
+    from .questions_data import SECTION_QUESTIONS
+
+    return build_question_bank(SECTION_QUESTIONS, SECTION_DESCRIPTIONS)
 
 
 class Questionary:
@@ -29,56 +195,77 @@ class Questionary:
     
     Предоставляет интерфейс для доступа к вопросам, разбитым по разделам и темам.
     Реализует паттерн dependency injection для изоляции обработчиков от логики работы с вопросами.
+    Создание экземпляра не копирует вопросы: все экземпляры используют
+    общий неизменяемый банк.
     
     Attributes
     ----------
-    sections : Dict[str, Dict[str, List[str]]]
-        Словарь разделов, тем и списков вопросов
-    section_descriptions : Dict[str, str]
-        Словарь описаний разделов
+    bank : QuestionBank
+        Скомпилированный банк вопросов
+    weights : Optional[WeightSnapshot]
+        Таблицы псевдонимов для выбора по весам (см. модуль ``weighting``);
+        None или снимок другой версии банка - равномерный выбор
+    search_index : Optional[SearchIndex]
+        Индекс поиска по словам (см. модуль ``search``); пока он
+        отсутствует или построен для другой версии банка, поиск ничего не
+        находит, а индекс строится в фоне
+    neighbours : Optional[NeighbourTable]
+        Таблица похожих вопросов (см. модуль ``similarity``); пока она
+        отсутствует или построена для другой версии банка, похожих
+        вопросов нет, а таблица строится в фоне
     """
 
-    def __init__(self):
-        self.sections: Dict[str, Dict[str, List[str]]] = {}
-        self.section_descriptions: Dict[str, str] = {}
-        self._load_questions()
-    
-    def _load_questions(self) -> None:
+    def __init__(self, bank: Optional[QuestionBank] = None):
+        self.bank = bank if bank is not None else load_question_bank()
+        self.weights: Optional[WeightSnapshot] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.neighbours: Optional[NeighbourTable] = None
+        # Фоновые построения по имени индекса или таблицы
+        self._builds: Dict[str, asyncio.Task] = {}
+
+    def use_bank(self, bank: QuestionBank, search_index: Optional[SearchIndex] = None,
+                 neighbours: Optional[NeighbourTable] = None) -> None:
         """
-        Загружает все вопросы из модуля questions_data в память.
-        
-        Инициализирует структуры данных sections и section_descriptions,
-        добавляя категорию "Случайный вопрос" в каждый раздел.
-        """
-
-        # Основные разделы вопросов
-        self.sections = {
-            "Самопознание: Кто Я?": QUESTIONS_SELF_KNOWLEDGE,
-            "Вектор: Куда я движусь?": QUESTIONS_VECTOR,
-            "Вызовы: Что мне мешает?": QUESTIONS_CHALLENGES,
-            "Окружение: Мои отношения?": QUESTIONS_ENVIRONMENT,
-            "Интеграция: Как я живу?": QUESTIONS_INTEGRATION,
-            "Капсула Времени: История для моих детей": QUESTIONS_MEMORIES
-        }
-        
-        # Описания разделов
-        self.section_descriptions = {
-            "Самопознание: Кто Я?": "Самопознание: Кто Я? - это вопросы, помогающие понять свою личность, ценности и убеждения",
-            "Вектор: Куда я движусь?": "Вектор: Куда я движусь? - вопросы о целях, мечтах и направлении жизни",
-            "Вызовы: Что мне мешает?": "Вызовы: Что мне мещается? - вопросы о трудностях, страхах и ограничениях",
-            "Окружение: Мои отношения?": "Окружение: Мои отношения? - вопросы о взаимодействии с людьми и социальной среде",
-            "Интеграция: Как я живу?": "Интеграция: Как я живу? - вопросы о повседневной жизни, привычках и ритуалах",
-            "Капсула Времени: История для моих детей": "Капсула Времени: История для моих детей - это то, что мы можем оставить себе будущему и потомкам"
-        }
-        
-        # Добавляем пункт "Случайный вопрос" в каждый раздел
-        for section_name, questions_dict in self.sections.items():
-            questions_dict["Случайный вопрос"] = []
-            for theme_questions in questions_dict.values():
-                if isinstance(theme_questions, list):
-                    questions_dict["Случайный вопрос"].extend(theme_questions)
-    
-    def get_section_questions(self, section_name: str) -> Optional[Dict[str, List[str]]]:
+        Подменяет банк вопросов.
+
+        Подмена - одно присваивание, поэтому обработчики видят либо старый,
+        либо новый банк целиком. Курсоры выборки без повторений, созданные
+        для старого банка, сбрасываются по несовпадению версии.
+
+        Parameters
+        ----------
+        bank : QuestionBank
+            Новый банк вопросов
+        search_index : Optional[SearchIndex], optional
+            Заранее построенный индекс поиска нового банка; без него
+            индекс строится в фоне после первого поиска
+        neighbours : Optional[NeighbourTable], optional
+            Заранее построенная таблица похожих вопросов нового банка; без
+            нее таблица строится в фоне после первого запроса похожего вопроса
+        """
+
+        self.bank = bank
+        if search_index is not None:
+            self.search_index = search_index
+        if neighbours is not None:
+            self.neighbours = neighbours
+
+    @property
+    def sections(self) -> Mapping[str, Mapping[str, Sequence[str]]]:
+        """Разделы, темы и вопросы."""
+        return self.bank.sections
+
+    @property
+    def section_descriptions(self) -> Mapping[str, str]:
+        """Описания разделов."""
+        return self.bank.section_descriptions
+
+    @property
+    def questions(self) -> Sequence[str]:
+        """Все вопросы; индекс вопроса служит его ID."""
+        return self.bank.questions
+
+    def get_section_questions(self, section_name: str) -> Optional[Mapping[str, Sequence[str]]]:
         """
         Возвращает словарь тем и вопросов для указанного раздела.
         
@@ -89,11 +276,11 @@ class Questionary:
             
         Returns
         -------
-        Optional[Dict[str, List[str]]]
-            Словарь {тема: список_вопросов} или None если раздел не найден
+        Optional[Mapping[str, Sequence[str]]]
+            Неизменяемый словарь {тема: вопросы} или None если раздел не найден
         """
         
-        return self.sections.get(section_name)
+        return self.bank.sections.get(section_name)
     
     def get_section_description(self, section_name: str) -> str:
         """
@@ -110,7 +297,7 @@ class Questionary:
             Описание раздела или пустая строка если раздел не найден
         """
 
-        return self.section_descriptions.get(section_name, "")
+        return self.bank.section_descriptions.get(section_name, "")
     
     def get_random_question(self, section_name: str, theme: Optional[str] = None) -> Optional[str]:
         """
@@ -129,28 +316,241 @@ class Questionary:
             Случайный вопрос или None если вопросы не найдены
         """
 
-        questions_dict = self.get_section_questions(section_name)
-        if not questions_dict:
+        question_id = self.get_random_question_id(section_name, theme)
+        return self.bank.questions[question_id] if question_id is not None else None
+
+    def get_random_question_id(self, section_name: str, theme: Optional[str] = None) -> Optional[int]:
+        """
+        Возвращает ID случайного вопроса из указанного раздела и/или темы.
+
+        Если тема не указана или не найдена в разделе, вопрос выбирается
+        из всего раздела. Если для диапазона есть таблица весов текущей
+        версии банка, вопрос выбирается по весам, иначе равномерно.
+
+        Parameters
+        ----------
+        section_name : str
+            Название раздела
+        theme : Optional[str], optional
+            Название темы, по умолчанию None
+
+        Returns
+        -------
+        Optional[int]
+            ID вопроса или None если вопросы не найдены
+        """
+
+        bounds = self._bounds(section_name, theme)
+        if bounds is None:
             return None
-        
-        if theme and theme in questions_dict:
-            return random.choice(questions_dict[theme])
-        elif "Случайный вопрос" in questions_dict and questions_dict["Случайный вопрос"]:
-            return random.choice(questions_dict["Случайный вопрос"])
-        else:
-            # Если нет специальной категории, выбираем из всех вопросов раздела
-            all_questions = []
-            for theme_questions in questions_dict.values():
-                if isinstance(theme_questions, list):
-                    all_questions.extend(theme_questions)
-            return random.choice(all_questions) if all_questions else None
-    
-    def get_themes(self, section_name: str) -> List[str]:
+        start, end = bounds
+        weights = self.weights
+        if weights is not None and weights.version == self.bank.version:
+            table = weights.tables.get(bounds)
+            if table is not None:
+                return start + table.sample()
+        # Равномерный выбор в [start, end): дешевле randrange, смещение пренебрежимо мало
+        return start + int(random.random() * (end - start))
+
+    def get_next_question(
+        self,
+        section_name: str,
+        theme: Optional[str],
+        cursors: MutableMapping[str, object],
+    ) -> Optional[str]:
+        """
+        Возвращает следующий вопрос раздела или темы без повторений.
+
+        Вопросы диапазона выдаются в псевдослучайном порядке, пока диапазон
+        не исчерпан, после чего начинается новый цикл. Для каждого диапазона
+        в ``cursors`` хранится курсор ``[seed, позиция]``; курсоры созданы
+        для конкретной версии банка и сбрасываются при ее смене.
+
+        Parameters
+        ----------
+        section_name : str
+            Название раздела
+        theme : Optional[str]
+            Название темы или None (весь раздел)
+        cursors : MutableMapping[str, object]
+            Состояние выборки пользователя, например словарь в ``context.user_data``
+
+        Returns
+        -------
+        Optional[str]
+            Вопрос или None если вопросы не найдены
+        """
+
+        question_id = self.get_next_question_id(section_name, theme, cursors)
+        return self.bank.questions[question_id] if question_id is not None else None
+
+    def get_next_question_id(
+        self,
+        section_name: str,
+        theme: Optional[str],
+        cursors: MutableMapping[str, object],
+    ) -> Optional[int]:
+        """
+        Возвращает ID следующего вопроса раздела или темы без повторений.
+
+        То же, что ``get_next_question``, но возвращает ID вопроса.
+
+        Parameters
+        ----------
+        section_name : str
+            Название раздела
+        theme : Optional[str]
+            Название темы или None (весь раздел)
+        cursors : MutableMapping[str, object]
+            Состояние выборки пользователя
+
+        Returns
+        -------
+        Optional[int]
+            ID вопроса или None если вопросы не найдены
+        """
+
+        bounds = self._bounds(section_name, theme)
+        if bounds is None:
+            return None
+        if cursors.get("version") != self.bank.version:
+            cursors.clear()
+            cursors["version"] = self.bank.version
+
+        start, end = bounds
+        cursor = cursors.setdefault(f"{start}:{end}", [])
+        return start + draw(cursor, end - start)
+
+    def get_similar_question_id(self, question_id: int, k: int) -> Optional[int]:
+        """
+        Возвращает ID случайного из ``k`` вопросов банка, ближайших к данному.
+
+        Поиск - одно обращение к таблице соседей. Если таблицы нет или она
+        построена для другой версии банка или другого ``k``, таблица
+        строится в фоне (см. ``prepare_neighbours``), а метод возвращает None.
+
+        Parameters
+        ----------
+        question_id : int
+            ID вопроса текущей версии банка
+        k : int
+            Число ближайших соседей, из которых выбирается вопрос
+
+        Returns
+        -------
+        Optional[int]
+            ID похожего вопроса или None, если похожих нет или таблица еще строится
+        """
+
+        table = self.neighbours
+        if table is None or table.version != self.bank.version or table.k != k:
+            self._build_in_background('neighbours', lambda: self.prepare_neighbours(k))
+            return None
+        return table.sample(question_id)
+
+    def prepare(self, k: int) -> None:
+        """
+        Запускает в фоне построение недостающих таблиц текущего банка.
+
+        Вне цикла событий ничего не делает: таблицы строятся при первом
+        обращении из обработчика.
+
+        Parameters
+        ----------
+        k : int
+            Число ближайших соседей в таблице похожих вопросов
+        """
+
+        self._build_in_background('search index', self.prepare_search_index)
+        self._build_in_background('neighbours', lambda: self.prepare_neighbours(k))
+
+    async def prepare_search_index(self) -> None:
+        """
+        Строит индекс поиска текущего банка в отдельном потоке.
+
+        Индекс сохраняется, только если банк не подменили за время построения.
+        """
+
+        bank = self.bank
+        index = self.search_index
+        if index is not None and index.version == bank.version:
+            return
+        index = await asyncio.to_thread(build_search_index, bank)
+        if self.bank is bank:
+            self.search_index = index
+
+    async def prepare_neighbours(self, k: int) -> None:
+        """
+        Строит таблицу похожих вопросов текущего банка в отдельном потоке.
+
+        Для банка из 10 000 вопросов построение занимает секунды, поэтому
+        не выполняется в цикле событий. Таблица сохраняется, только если банк
+        не подменили за время построения.
+
+        Parameters
+        ----------
+        k : int
+            Число ближайших соседей
+        """
+
+        bank = self.bank
+        table = self.neighbours
+        if table is not None and table.version == bank.version and table.k == k:
+            return
+        table = await asyncio.to_thread(build_neighbour_table, bank, k)
+        if self.bank is bank:
+            self.neighbours = table
+
+    def _build_in_background(self, name: str, build: Callable[[], Awaitable[None]]) -> None:
+        """Запускает задачу построения таблицы, если она еще не выполняется."""
+
+        task = self._builds.get(name)
+        if task is not None and not task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._builds[name] = loop.create_task(self._build(name, build))
+
+    async def _build(self, name: str, build: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await build()
+        except Exception as e:
+            logger.error(f"Failed to build {name} for question bank {self.bank.version}: {e}")
+
+    def _bounds(self, section_name: str, theme: Optional[str]) -> Optional[Tuple[int, int]]:
+        """Диапазон ID вопросов темы, а если тема не указана или не найдена - раздела."""
+
+        bank = self.bank
+        bounds = bank.theme_ranges.get((section_name, theme)) if theme else None
+        if bounds is None:
+            bounds = bank.section_ranges.get(section_name)
+        if bounds is None or bounds[0] == bounds[1]:
+            return None
+        return bounds
+
+    def get_question(self, question_id: int) -> str:
+        """
+        Возвращает текст вопроса по его ID.
+
+        Parameters
+        ----------
+        question_id : int
+            ID вопроса из ``get_random_question_id``
+
+        Returns
+        -------
+        str
+            Текст вопроса
+        """
+
+        return self.bank.questions[question_id]
+
+    def get_themes(self, section_name: str) -> Tuple[str, ...]:
         """
         Возвращает список тем для указанного раздела.
         
-        Исключает категорию "Случайный вопрос" из результата.
-        
         Parameters
         ----------
         section_name : str
@@ -158,24 +558,94 @@ class Questionary:
             
         Returns
         -------
-        List[str]
-            Список названий тем
+        Tuple[str, ...]
+            Названия тем
         """
 
-        questions_dict = self.get_section_questions(section_name)
-        if not questions_dict:
-            return []
-        
-        return [key for key in questions_dict.keys() if key != "Случайный вопрос"]
-    
-    def get_all_sections(self) -> List[str]:
+        return self.bank.themes.get(section_name, ())
+
+    def get_all_sections(self) -> Tuple[str, ...]:
         """
         Возвращает список всех доступных разделов.
         
         Returns
         -------
-        List[str]
-            Список названий разделов
+        Tuple[str, ...]
+            Названия разделов
         """
-        
-        return list(self.sections.keys())
\ No newline at end of file
+
+        return self.bank.section_names
+
+    def has_section(self, section_name: str) -> bool:
+        """
+        Проверяет, есть ли раздел в банке, одним обращением к словарю.
+
+        Parameters
+        ----------
+        section_name : str
+            Название раздела
+
+        Returns
+        -------
+        bool
+            True если раздел существует
+        """
+
+        return section_name in self.bank.sections
+
+    def search(self, query: str, limit: int) -> Tuple[str, ...]:
+        """
+        Возвращает вопросы всего банка, лучше всего подходящие под запрос.
+
+        Пока индекс текущей версии банка строится, вопросов не находится
+        (см. ``search_ids``).
+
+        Parameters
+        ----------
+        query : str
+            Слова запроса
+        limit : int
+            Наибольшее число вопросов
+
+        Returns
+        -------
+        Tuple[str, ...]
+            Вопросы по убыванию релевантности; пустой кортеж, если ничего не найдено
+        """
+
+        bank = self.bank
+        return tuple(bank.questions[question_id] for question_id in self.search_ids(query, limit, bank) or ())
+
+    def search_ids(self, query: str, limit: int, bank: Optional[QuestionBank] = None) -> Optional[Tuple[int, ...]]:
+        """
+        Возвращает ID вопросов, лучше всего подходящих под запрос.
+
+        Если индекса версии банка нет, метод не строит его в цикле событий:
+        для текущего банка построение запускается в фоне (см.
+        ``prepare_search_index``), а метод возвращает None.
+
+        Parameters
+        ----------
+        query : str
+            Слова запроса
+        limit : int
+            Наибольшее число вопросов
+        bank : Optional[QuestionBank], optional
+            Банк, к которому относятся ID; по умолчанию текущий. Вызывающий,
+            который уже взял банк, передает его, чтобы ID не относились к
+            банку, подмененному между обращениями
+
+        Returns
+        -------
+        Optional[Tuple[int, ...]]
+            ID вопросов по убыванию релевантности или None, если индекс еще строится
+        """
+
+        if bank is None:
+            bank = self.bank
+        index = self.search_index
+        if index is None or index.version != bank.version:
+            if bank is self.bank:
+                self._build_in_background('search index', self.prepare_search_index)
+            return None
+        return tuple(index.search(query, limit))
@@ -354,10 +354,3 @@ SECTION_QUESTIONS = {
     "Интеграция: Как я живу?": QUESTIONS_INTEGRATION,
     "Капсула Времени: История для моих детей": QUESTIONS_MEMORIES
 }
-
-# Функция для добавления пункта "Случайный вопрос" в каждый раздел
-for section_name, questions_dict in SECTION_QUESTIONS.items():
-    questions_dict["Случайный вопрос"] = []
-    for theme_questions in questions_dict.values():
-        if isinstance(theme_questions, list): # Проверяем, что это список вопросов
-            questions_dict["Случайный вопрос"].extend(theme_questions)
\ No newline at end of file
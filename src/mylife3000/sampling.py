@@ -0,0 +1,200 @@
+"""
+Модуль выборки вопросов без повторений.
+
+Реализует курсор по псевдослучайной перестановке диапазона вопросов.
+Перестановка задается сетью Фейстеля с ключом ``seed`` и не
+материализуется, поэтому состояние курсора - два целых числа (seed и
+позиция), а память и время одного выбора не зависят от размера банка.
+Пока диапазон не исчерпан, вопросы не повторяются; затем начинается
+новый цикл с новым seed.
+
+Для взвешенного выбора модуль строит таблицы псевдонимов (alias method,
+алгоритм Воуза): после построения за O(n) выбор по весам стоит одного
+вызова генератора случайных чисел и одного сравнения.
+
+Classes:
+    AliasTable: Таблица псевдонимов для выбора по весам за O(1)
+    WeightSnapshot: Неизменяемый набор таблиц для версии банка вопросов
+
+Functions:
+    permute: Образ индекса в псевдослучайной перестановке диапазона
+    draw: Следующий индекс курсора с переходом на новый цикл
+    build_alias_table: Построение таблицы псевдонимов по весам
+"""
+
+import random
+from functools import lru_cache
+from typing import List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+_ROUNDS = 6
+_MASK64 = (1 << 64) - 1
+
+
+@lru_cache(maxsize=4096)
+def _round_keys(seed: int) -> Tuple[int, ...]:
+    """Раундовые ключи сети Фейстеля из seed (шаги splitmix64)."""
+
+    keys = []
+    state = seed & _MASK64
+    for _ in range(_ROUNDS):
+        state = (state + 0x9E3779B97F4A7C15) & _MASK64
+        mixed = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        keys.append(mixed ^ (mixed >> 31))
+    return tuple(keys)
+
+
+def _feistel(value: int, half_bits: int, keys: Tuple[int, ...]) -> int:
+    """Сеть Фейстеля над числами из ``2 * half_bits`` бит; биекция при любых ключах."""
+
+    mask = (1 << half_bits) - 1
+    left, right = value >> half_bits, value & mask
+    for key in keys:
+        mixed = ((right * 0x9E3779B97F4A7C15 + key) & _MASK64) ^ key >> 29
+        mixed = (mixed * 0xBF58476D1CE4E5B9) & _MASK64
+        left, right = right, left ^ ((mixed ^ mixed >> 32) & mask)
+    return (left << half_bits) | right
+
+
+def permute(index: int, size: int, seed: int) -> int:
+    """
+    Возвращает образ индекса в псевдослучайной перестановке ``range(size)``.
+
+    Перестановка над ближайшей степенью четверки не меньше ``size``
+    сужается до ``range(size)`` обходом цикла (cycle walking); в среднем
+    нужно не более четырех применений сети Фейстеля.
+
+    Parameters
+    ----------
+    index : int
+        Позиция в перестановке, ``0 <= index < size``
+    size : int
+        Размер диапазона
+    seed : int
+        Ключ перестановки
+
+    Returns
+    -------
+    int
+        Элемент перестановки на позиции ``index``
+    """
+
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    keys = _round_keys(seed)
+    value = _feistel(index, half_bits, keys)
+    while value >= size:
+        value = _feistel(value, half_bits, keys)
+    return value
+
+
+def draw(cursor: List[int], size: int) -> int:
+    """
+    Выдает следующий индекс из ``range(size)`` и сдвигает курсор.
+
+    Курсор ``[seed, позиция]`` изменяется на месте. После исчерпания
+    диапазона выбирается новый seed, при этом первый элемент нового цикла
+    не совпадает с последним элементом предыдущего.
+
+    Parameters
+    ----------
+    cursor : List[int]
+        Курсор ``[seed, позиция]``; пустой список инициализируется
+    size : int
+        Размер диапазона, больше нуля
+
+    Returns
+    -------
+    int
+        Индекс в диапазоне ``range(size)``
+    """
+
+    if not cursor:
+        cursor[:] = [random.getrandbits(32), 0]
+    seed, position = cursor
+    if position >= size:
+        last = permute(size - 1, size, seed)
+        seed = random.getrandbits(32)
+        while size > 1 and permute(0, size, seed) == last:
+            seed = random.getrandbits(32)
+        position = 0
+    cursor[0], cursor[1] = seed, position + 1
+    return permute(position, size, seed)
+
+
+class AliasTable(NamedTuple):
+    """
+    Таблица псевдонимов для выбора индекса по весам за O(1).
+
+    Attributes:
+        prob (Tuple[float, ...]): Вероятность оставить индекс ячейки
+        alias (Tuple[int, ...]): Индекс-псевдоним ячейки
+    """
+
+    prob: Tuple[float, ...]
+    alias: Tuple[int, ...]
+
+    def sample(self) -> int:
+        """Возвращает индекс с вероятностью, пропорциональной его весу."""
+
+        scaled = random.random() * len(self.prob)
+        index = int(scaled)
+        return index if scaled - index < self.prob[index] else self.alias[index]
+
+
+class WeightSnapshot(NamedTuple):
+    """
+    Таблицы псевдонимов диапазонов вопросов одной версии банка.
+
+    Снимок неизменяем и подменяется целиком, поэтому выбор вопроса не
+    ждет перестроения таблиц и видит либо старый, либо новый снимок.
+
+    Attributes:
+        version (str): Версия банка вопросов
+        tables (Mapping[Tuple[int, int], AliasTable]): Таблицы по диапазонам (начало, конец)
+    """
+
+    version: str
+    tables: Mapping[Tuple[int, int], AliasTable]
+
+
+def build_alias_table(weights: Sequence[float]) -> Optional[AliasTable]:
+    """
+    Строит таблицу псевдонимов по весам алгоритмом Воуза.
+
+    Parameters
+    ----------
+    weights : Sequence[float]
+        Неотрицательные веса индексов ``0..len(weights)-1``
+
+    Returns
+    -------
+    Optional[AliasTable]
+        Таблица или None, если сумма весов равна нулю
+
+    Raises
+    ------
+    ValueError
+        Если есть отрицательный вес
+    """
+
+    size = len(weights)
+    total = 0.0
+    for weight in weights:
+        if weight < 0:
+            raise ValueError(f"Negative weight: {weight}")
+        total += weight
+    if not size or total <= 0:
+        return None
+
+    scaled = [weight * size / total for weight in weights]
+    prob = [1.0] * size
+    alias = list(range(size))
+    small = [index for index, value in enumerate(scaled) if value < 1.0]
+    large = [index for index, value in enumerate(scaled) if value >= 1.0]
+    while small and large:
+        less, more = small.pop(), large.pop()
+        prob[less] = scaled[less]
+        alias[less] = more
+        scaled[more] += scaled[less] - 1.0
+        (small if scaled[more] < 1.0 else large).append(more)
+    # Оставшиеся ячейки заполнены полностью с точностью до ошибок округления
+    return AliasTable(tuple(prob), tuple(alias))
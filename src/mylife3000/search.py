@@ -0,0 +1,236 @@
+"""
+Модуль полнотекстового поиска вопросов.
+
+Индекс ``SearchIndex`` строится по всем вопросам банка один раз на версию
+банка. Текст нормализуется (нижний регистр, ``ё`` -> ``е``), разбивается
+на слова, служебные слова отбрасываются, остальные сводятся к основе
+легким стеммером: для кириллицы отсекается самое длинное окончание
+после первой гласной, для латиницы - английские суффиксы. Инвертированный
+индекс хранит для каждой основы кортеж ID вопросов и ее IDF.
+
+Слово запроса, основы которого нет в индексе (опечатка, другая форма),
+сопоставляется с ближайшими основами словаря по общим триграммам
+(коэффициент Дайса). Вопросы ранжируются суммой IDF совпавших основ,
+умноженных на сходство; поиск по словам из индекса - несколько обращений
+к словарю и проход по спискам вопросов.
+
+Classes:
+    SearchIndex: Инвертированный индекс вопросов одной версии банка
+
+Functions:
+    normalize: Разбиение текста на основы слов
+    stem: Основа слова
+    build_search_index: Построение индекса по банку вопросов
+"""
+
+import heapq
+import math
+import re
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Set, Tuple
+
+if TYPE_CHECKING:
+    from .questionary import QuestionBank
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+_RU_VOWELS = frozenset("аеиоуыэюя")
+
+# Окончания прилагательных, причастий, глаголов и существительных;
+# отсекается самое длинное подходящее
+_RU_ENDINGS: Tuple[str, ...] = tuple(sorted({
+    "ившись", "ывшись", "вшись", "ивши", "ывши", "вши", "ив", "ыв", "в",
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им", "ым", "ом",
+    "его", "ого", "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+    "ейше", "ейш", "ость", "ости", "остью", "остей", "остям", "остями", "остях",
+    "ла", "на", "ете", "йте", "ли", "й", "л", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь",
+    "нно", "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "уй", "ил", "ыл",
+    "ен", "ило", "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть", "ишь", "ю",
+    "а", "ев", "ов", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и", "ией",
+    "иям", "ям", "ием", "ам", "о", "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью",
+    "ия", "ья", "я",
+}, key=len, reverse=True))
+
+_RU_REFLEXIVE = ("ся", "сь")
+
+_EN_SUFFIXES: Tuple[str, ...] = ("ingly", "edly", "ness", "ment", "ing", "ies", "ied", "ed", "es", "ly", "s")
+
+_STOP_WORDS = frozenset((
+    "и", "в", "во", "не", "что", "он", "на", "я", "с", "со", "как", "а", "то", "все", "она",
+    "так", "его", "но", "да", "ты", "к", "у", "же", "вы", "за", "бы", "по", "ее", "мне",
+    "было", "вот", "от", "меня", "о", "из", "ему", "ли", "если", "уже", "или", "ни", "быть",
+    "был", "до", "вас", "нибудь", "тебя", "тебе", "ты", "твой", "твоя", "твое", "твои",
+    "твоем", "твоей", "твоих", "твоим", "твоими", "твоего", "твоему", "свой", "своей", "свои",
+    "своих", "своим", "своего", "это", "этот", "эти", "для", "при", "чем", "ли", "какой",
+    "какие", "какая", "какое", "каким", "какими", "каких", "когда", "где", "кто", "чтобы",
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "was",
+    "were", "be", "you", "your", "yours", "do", "does", "did", "what", "which", "who", "how",
+    "when", "where", "that", "this", "it", "its", "at", "by", "from", "as", "if", "would",
+))
+
+# Минимальная длина основы после отсечения окончания
+_MIN_STEM = 3
+# Минимальное сходство по триграммам для нечеткого совпадения
+_MIN_SIMILARITY = 0.5
+# Сколько ближайших основ словаря учитывать для слова без точного совпадения
+_FUZZY_CANDIDATES = 3
+
+
+def stem(word: str) -> str:
+    """
+    Возвращает основу нормализованного слова.
+
+    Parameters
+    ----------
+    word : str
+        Слово в нижнем регистре
+
+    Returns
+    -------
+    str
+        Основа слова
+    """
+
+    if "а" <= word[0] <= "я":
+        # Окончание отсекается только после первой гласной (область RV)
+        rv = next((i + 1 for i, ch in enumerate(word) if ch in _RU_VOWELS), len(word))
+        limit = max(rv, _MIN_STEM)
+        for ending in _RU_REFLEXIVE:
+            if word.endswith(ending) and len(word) - len(ending) >= limit:
+                word = word[:-len(ending)]
+                break
+        for ending in _RU_ENDINGS:
+            if word.endswith(ending) and len(word) - len(ending) >= limit:
+                return word[:-len(ending)]
+        return word
+    for suffix in _EN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize(text: str) -> List[str]:
+    """
+    Разбивает текст на основы значимых слов.
+
+    Parameters
+    ----------
+    text : str
+        Текст вопроса или запроса
+
+    Returns
+    -------
+    List[str]
+        Основы слов в порядке следования, без служебных слов
+    """
+
+    words = _WORD_RE.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if word not in _STOP_WORDS]
+
+
+def _trigrams(term: str) -> Set[str]:
+    """Триграммы основы с границами слова."""
+
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex(NamedTuple):
+    """
+    Неизменяемый инвертированный индекс вопросов одной версии банка.
+
+    Attributes
+    ----------
+    version : str
+        Версия банка, по которому построен индекс
+    postings : Mapping[str, Tuple[int, ...]]
+        ID вопросов по основе слова
+    idf : Mapping[str, float]
+        Обратная частота основы в вопросах банка
+    trigrams : Mapping[str, Tuple[str, ...]]
+        Основы словаря по триграмме
+    """
+
+    version: str
+    postings: Mapping[str, Tuple[int, ...]]
+    idf: Mapping[str, float]
+    trigrams: Mapping[str, Tuple[str, ...]]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Основы словаря для слова запроса с их сходством."""
+
+        if term in self.postings:
+            return [(term, 1.0)]
+        query = _trigrams(term)
+        overlap: Dict[str, int] = {}
+        for trigram in query:
+            for candidate in self.trigrams.get(trigram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+        matches = []
+        for candidate, shared in overlap.items():
+            # Число триграмм основы с границами не больше ее длины
+            similarity = 2 * shared / (len(query) + len(candidate))
+            if similarity >= _MIN_SIMILARITY:
+                matches.append((candidate, similarity))
+        return heapq.nlargest(_FUZZY_CANDIDATES, matches, key=lambda match: match[1])
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """
+        Возвращает ID вопросов, лучше всего подходящих под запрос.
+
+        Parameters
+        ----------
+        query : str
+            Слова запроса
+        limit : int
+            Наибольшее число результатов
+
+        Returns
+        -------
+        List[int]
+            ID вопросов по убыванию релевантности; при равной
+            релевантности - в порядке банка
+        """
+
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(normalize(query)):
+            for match, similarity in self._expand(term):
+                weight = similarity * self.idf[match]
+                for question_id in self.postings[match]:
+                    scores[question_id] = scores.get(question_id, 0.0) + weight
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [question_id for question_id, _ in best]
+
+
+def build_search_index(bank: "QuestionBank") -> SearchIndex:
+    """
+    Строит инвертированный индекс по вопросам банка.
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+
+    Returns
+    -------
+    SearchIndex
+        Индекс версии ``bank.version``
+    """
+
+    postings: Dict[str, List[int]] = {}
+    for question_id, question in enumerate(bank.questions):
+        for term in dict.fromkeys(normalize(question)):
+            postings.setdefault(term, []).append(question_id)
+
+    total = len(bank.questions)
+    trigrams: Dict[str, List[str]] = {}
+    for term in postings:
+        for trigram in _trigrams(term):
+            trigrams.setdefault(trigram, []).append(term)
+
+    return SearchIndex(
+        version=bank.version,
+        postings=MappingProxyType({term: tuple(ids) for term, ids in postings.items()}),
+        idf=MappingProxyType({term: math.log(1 + total / len(ids)) for term, ids in postings.items()}),
+        trigrams=MappingProxyType({trigram: tuple(terms) for trigram, terms in trigrams.items()}),
+    )
@@ -0,0 +1,266 @@
+"""
+Модуль ограничения памяти сессий пользователей.
+
+Сессия - состояние ``ConversationHandler`` и ``context.user_data``
+пользователя. Без ограничений они остаются в памяти у каждого, кто
+когда-либо отправил /start, а брошенные диалоги в хранилище не завершаются.
+
+``SessionManager`` хранит пользователей в порядке последней активности
+(LRU на ``OrderedDict``): обновление пользователя переносит его в конец
+за O(1). Сессия вытесняется, если пользователь неактивен дольше
+SESSION_IDLE_TTL или если число сессий в памяти превышает
+SESSION_MAX_RESIDENT (вытесняется самая давно неактивная). При вытеснении
+диалог завершается состоянием ``abandoned``, состояние диалога удаляется,
+а из ``user_data`` остается только явный выбор языка.
+
+Диалоги, оставшиеся незавершенными после перезапуска или сбоя, закрывает
+на стороне хранилища ``sweep_abandoned_periodically`` пачками по
+DB_ABANDONED_BATCH_SIZE.
+
+Classes:
+    SessionManager: Вытеснение неактивных сессий из памяти
+
+Functions:
+    sweep_abandoned_periodically: Фоновое завершение брошенных диалогов в хранилище
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import Application, ContextTypes, ConversationHandler
+
+from .database import db
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Ключи user_data, которые переживают вытеснение сессии
+PRESERVED_KEYS = ('locale',)
+
+
+class SessionManager:
+    """
+    Вытеснение неактивных сессий пользователей из памяти.
+
+    Метод ``touch`` регистрируется обработчиком ``TypeHandler(Update)`` в
+    группе, которая выполняется раньше остальных обработчиков.
+
+    Attributes:
+        conversation (ConversationHandler): Обработчик диалога
+        idle_ttl (float): Время неактивности до вытеснения, секунды (0 - не вытеснять по времени)
+        max_resident (int): Наибольшее число сессий в памяти (0 - без ограничения)
+    """
+
+    def __init__(self, conversation: ConversationHandler, idle_ttl: float, max_resident: int):
+        self.conversation = conversation
+        self.idle_ttl = idle_ttl
+        self.max_resident = max_resident
+        self.application: Optional[Application] = None
+        # ID пользователя -> (время последней активности, ID последнего чата)
+        self._seen: "OrderedDict[int, Tuple[float, int]]" = OrderedDict()
+        self._evicted_idle = metrics.counter("sessions_evicted_idle")
+        self._evicted_capacity = metrics.counter("sessions_evicted_capacity")
+        metrics.gauge("sessions_resident", lambda: len(self._seen))
+        metrics.gauge(
+            "sessions_user_data", lambda: len(self.application.user_data) if self.application else 0
+        )
+
+    def attach(self, application: Application) -> None:
+        """
+        Привязывает менеджер к приложению и учитывает восстановленные диалоги.
+
+        Вызывается после ``Application.initialize``: диалоги, восстановленные
+        хранилищем сессий, считаются активными с момента запуска.
+
+        Parameters
+        ----------
+        application : Application
+            Инициализированное приложение
+        """
+
+        self.application = application
+        now = time.monotonic()
+        for chat_id, user_id in list(self._conversations()):
+            self._seen[user_id] = (now, chat_id)
+        logger.info(f"Session manager tracks {len(self._seen)} restored session(s)")
+
+    def _conversations(self):
+        """Ключи ``(chat_id, user_id)`` активных диалогов."""
+
+        # PTB не дает публичного способа завершить диалог извне, кроме
+        # conversation_timeout с задачей JobQueue на каждый диалог
+        return self.conversation._conversations
+
+    async def touch(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Отмечает активность пользователя и вытесняет лишние сессии.
+
+        Parameters
+        ----------
+        update : Update
+            Объект обновления от Telegram API
+        context : ContextTypes.DEFAULT_TYPE
+            Контекст выполнения обработчика
+        """
+
+        user, chat = update.effective_user, update.effective_chat
+        if user is None:
+            return
+        self._seen[user.id] = (time.monotonic(), chat.id if chat else user.id)
+        self._seen.move_to_end(user.id)
+
+        if self.max_resident and len(self._seen) > self.max_resident:
+            dialog_ids = []
+            while len(self._seen) > self.max_resident:
+                user_id, (_, chat_id) = self._seen.popitem(last=False)
+                dialog_ids.extend(self._evict(user_id, chat_id))
+                self._evicted_capacity.inc()
+            if dialog_ids:
+                # Обновление пользователя не ждет записи в хранилище
+                context.application.create_task(end_abandoned(dialog_ids), name="end_abandoned")
+
+    async def settle(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Снова учитывает пользователя, вытесненного во время обработки его обновления.
+
+        Обновления разных чатов обрабатываются одновременно, поэтому ``touch``
+        другого пользователя может вытеснить сессию, обработчик которой еще
+        выполняется и после вытеснения снова задает состояние диалога. Метод
+        регистрируется в группе после остальных обработчиков, чтобы такая
+        сессия не осталась в памяти без учета.
+
+        Parameters
+        ----------
+        update : Update
+            Объект обновления от Telegram API
+        context : ContextTypes.DEFAULT_TYPE
+            Контекст выполнения обработчика
+        """
+
+        user, chat = update.effective_user, update.effective_chat
+        if user is not None and user.id not in self._seen:
+            self._seen[user.id] = (time.monotonic(), chat.id if chat else user.id)
+
+    def _evict(self, user_id: int, chat_id: int) -> List[int]:
+        """
+        Удаляет сессию пользователя из памяти.
+
+        Returns
+        -------
+        List[int]
+            ID диалога пользователя, который нужно завершить, или пустой список
+        """
+
+        self._conversations().pop((chat_id, user_id), None)
+        user_data = self.application.user_data.get(user_id)
+        if user_data is None:
+            return []
+        dialog_id = user_data.get('dialog_id')
+        preserved = {key: user_data[key] for key in PRESERVED_KEYS if key in user_data}
+        if preserved:
+            user_data.clear()
+            user_data.update(preserved)
+            # Вытеснение по таймеру идет вне обработки обновления, и PTB сам не
+            # отметит изменение: без отметки хранилище сессий сохранит прежние данные
+            self.application.mark_data_for_update_persistence(user_ids=user_id)
+        else:
+            self.application.drop_user_data(user_id)
+        return [dialog_id] if dialog_id is not None else []
+
+    async def evict_idle(self) -> int:
+        """
+        Вытесняет сессии пользователей, неактивных дольше ``idle_ttl``.
+
+        Returns
+        -------
+        int
+            Число вытесненных сессий
+        """
+
+        cutoff = time.monotonic() - self.idle_ttl
+        dialog_ids = []
+        evicted = 0
+        while self._seen:
+            user_id, (seen, chat_id) = next(iter(self._seen.items()))
+            if seen > cutoff:
+                break
+            del self._seen[user_id]
+            dialog_ids.extend(self._evict(user_id, chat_id))
+            evicted += 1
+        self._evicted_idle.inc(evicted)
+        await end_abandoned(dialog_ids)
+        return evicted
+
+    async def evict_idle_periodically(self, interval: float) -> None:
+        """
+        Фоновая задача вытеснения неактивных сессий.
+
+        Parameters
+        ----------
+        interval : float
+            Интервал между проверками, секунды
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = await self.evict_idle()
+                if evicted:
+                    logger.info(f"Evicted {evicted} idle session(s)")
+            except Exception as e:
+                logger.error(f"Error evicting idle sessions: {e}")
+
+
+async def end_abandoned(dialog_ids: List[int]) -> None:
+    """Завершает диалоги вытесненных сессий состоянием ``abandoned``."""
+
+    for dialog_id in dialog_ids:
+        try:
+            await db.end_dialog(dialog_id, 'abandoned')
+        except Exception as e:
+            logger.error(f"Error ending abandoned dialog {dialog_id}: {e}")
+
+
+async def sweep_abandoned_periodically(
+    idle: float, lookback_days: int, batch_size: int, interval: float
+) -> None:
+    """
+    Фоновое завершение брошенных диалогов на стороне хранилища.
+
+    Каждый проход вызывает ``close_abandoned`` пачками, пока пачка
+    заполняется целиком; каждая пачка - отдельная короткая транзакция.
+
+    Parameters
+    ----------
+    idle : float
+        Время без событий, после которого диалог считается брошенным, секунды
+    lookback_days : int
+        Глубина поиска по времени начала диалога, дни
+    batch_size : int
+        Число диалогов в пачке
+    interval : float
+        Интервал между проходами, секунды
+    """
+
+    swept = metrics.counter("sessions_abandoned_swept")
+    while True:
+        total = 0
+        try:
+            while True:
+                closed = await db.close_abandoned(
+                    timedelta(seconds=idle), timedelta(days=lookback_days), batch_size
+                )
+                total += closed
+                swept.inc(closed)
+                if closed < batch_size:
+                    break
+            if total:
+                logger.info(f"Closed {total} abandoned dialog(s) in storage")
+        except Exception as e:
+            logger.error(f"Error closing abandoned dialogs: {e}")
+        await asyncio.sleep(interval)
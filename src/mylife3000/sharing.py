@@ -0,0 +1,228 @@
+"""
+Модуль встроенного режима: поделиться вопросом из любого чата.
+
+Пользователь набирает ``@бот <слова>`` в любом чате, Telegram присылает
+боту ``InlineQuery`` на каждое изменение текста, и бот отвечает списком
+вопросов банка, лучше всего подходящих под запрос (см. модуль ``search``).
+Выбранный вопрос отправляется в чат от имени пользователя. Без слов
+показывается первый вопрос каждой темы.
+
+``InlineQuestions`` обслуживает запросы без обращений к хранилищу:
+
+- результаты кэшируются в LRU (``OrderedDict``) по локали, версии банка и
+  нормализованному запросу - множеству основ его слов, поэтому "Мечты",
+  "мечта" и "мечты " дают одну запись. В записи хранятся только ID
+  вопросов, а сами результаты ``InlineQueryResultArticle`` строятся один
+  раз на вопрос и версию банка;
+- ответ разбит на страницы по ``PAGE_SIZE`` с ``next_offset``, а Telegram
+  кэширует его у себя на INLINE_QUERY_CACHE_TIME секунд;
+- запросы одного пользователя, набирающего текст, обслуживаются не чаще
+  раза в INLINE_QUERY_DEBOUNCE секунд: запрос внутри интервала ждет его
+  конца и не получает ответа, если за это время пришел более новый.
+
+Classes:
+    InlineQuestions: Ответы на встроенные запросы с кэшем результатов
+
+Attributes:
+    PAGE_SIZE (int): Число результатов в одном ответе
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import ContextTypes
+
+from .handlers import user_catalogue
+from .locales import Catalogue
+from .metrics import metrics
+from .questionary import QuestionBank
+from .search import normalize
+
+# Результатов в одном ответе (Telegram допускает до 50)
+PAGE_SIZE = 20
+
+# Ключ кэша: локаль, версия банка, основы слов запроса
+CacheKey = Tuple[str, str, Tuple[str, ...]]
+
+
+class InlineQuestions:
+    """
+    Ответы на встроенные запросы с кэшем результатов.
+
+    Метод ``answer`` регистрируется в ``InlineQueryHandler`` с
+    ``block=False``: ожидание конца интервала не задерживает следующие
+    запросы того же пользователя, которые обрабатываются по очереди (см.
+    модуль ``updates``).
+
+    Attributes:
+        cache_size (int): Наибольшее число запросов в кэше
+        cache_time (int): Время кэширования ответа на стороне Telegram, секунды
+        debounce (float): Наименьший интервал между ответами одному пользователю, секунды (0 - без ограничения)
+        results_limit (int): Наибольшее число результатов запроса на всех страницах
+    """
+
+    def __init__(self, cache_size: int, cache_time: int, debounce: float, results_limit: int):
+        self.cache_size = cache_size
+        self.cache_time = cache_time
+        self.debounce = debounce
+        self.results_limit = results_limit
+        self._cache: "OrderedDict[CacheKey, Tuple[int, ...]]" = OrderedDict()
+        # Локаль -> (версия банка, результаты по ID вопроса)
+        self._articles: Dict[str, Tuple[str, Dict[int, InlineQueryResultArticle]]] = {}
+        # ID пользователя -> время monotonic последнего ответа, в порядке ответов
+        self._answered: "OrderedDict[int, float]" = OrderedDict()
+        # ID пользователя -> ID запроса, ждущего конца интервала
+        self._latest: Dict[int, str] = {}
+        self._queries = metrics.counter("inline_queries")
+        self._hits = metrics.counter("inline_cache_hits")
+        self._misses = metrics.counter("inline_cache_misses")
+        self._superseded = metrics.counter("inline_superseded")
+        self._lookup_seconds = metrics.summary("inline_lookup_seconds")
+        metrics.gauge("inline_cache_entries", lambda: len(self._cache))
+
+    async def answer(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Отвечает на встроенный запрос страницей вопросов.
+
+        Parameters
+        ----------
+        update : Update
+            Объект обновления от Telegram API
+        context : ContextTypes.DEFAULT_TYPE
+            Контекст выполнения обработчика
+        """
+
+        query = update.inline_query
+        self._queries.inc()
+        # Следующая страница - прокрутка уже показанных результатов, а не набор текста
+        if not query.offset and not await self._settle(query.from_user.id, query.id):
+            self._superseded.inc()
+            return
+
+        started = time.perf_counter()
+        catalogue = user_catalogue(update, context)
+        offset = int(query.offset) if query.offset.isdigit() else 0
+        results, next_offset = self.page(catalogue, query.query, offset)
+        self._lookup_seconds.observe(time.perf_counter() - started)
+        # Результаты зависят от локали пользователя, поэтому Telegram не должен
+        # отдавать их другим; общий для всех пользователей кэш - на стороне бота
+        await query.answer(
+            results, cache_time=self.cache_time, is_personal=True, next_offset=next_offset
+        )
+
+    def page(self, catalogue: Catalogue, text: str, offset: int) -> Tuple[List[InlineQueryResultArticle], str]:
+        """
+        Возвращает страницу результатов запроса.
+
+        Parameters
+        ----------
+        catalogue : Catalogue
+            Каталог локали пользователя
+        text : str
+            Текст запроса
+        offset : int
+            Номер первого результата страницы
+
+        Returns
+        -------
+        Tuple[List[InlineQueryResultArticle], str]
+            Результаты страницы и ``next_offset`` (пустая строка - страница последняя)
+        """
+
+        bank = catalogue.questionary.bank
+        question_ids = self._question_ids(catalogue, bank, text)
+        articles = self._bank_articles(catalogue.code, bank)
+        end = offset + PAGE_SIZE
+        results = []
+        for question_id in question_ids[offset:end]:
+            article = articles.get(question_id)
+            if article is None:
+                article = articles[question_id] = _article(bank, question_id)
+            results.append(article)
+        return results, str(end) if end < len(question_ids) else ""
+
+    def _question_ids(self, catalogue: Catalogue, bank: QuestionBank, text: str) -> Tuple[int, ...]:
+        """ID вопросов запроса из кэша или из поиска по банку."""
+
+        terms = tuple(sorted(set(normalize(text))))
+        key = (catalogue.code, bank.version, terms)
+        question_ids = self._cache.get(key)
+        if question_ids is not None:
+            self._hits.inc()
+            self._cache.move_to_end(key)
+            return question_ids
+
+        self._misses.inc()
+        if terms:
+            # Запросы с одними основами дают одинаковые оценки, поэтому запись
+            # не зависит от того, какой из них заполнил кэш
+            question_ids = catalogue.questionary.search_ids(text, self.results_limit, bank)
+            if question_ids is None:
+                # Индекс версии банка еще строится: пустой ответ не кэшируется
+                return ()
+        else:
+            question_ids = tuple(start for start, _ in bank.theme_ranges.values())[:self.results_limit]
+        self._cache[key] = question_ids
+        if len(self._cache) > self.cache_size:
+            # Записи прежних версий банка вытесняются так же, как редкие запросы
+            self._cache.popitem(last=False)
+        return question_ids
+
+    def _bank_articles(self, locale: str, bank: QuestionBank) -> Dict[int, InlineQueryResultArticle]:
+        """Построенные результаты вопросов текущей версии банка локали."""
+
+        entry = self._articles.get(locale)
+        if entry is None or entry[0] != bank.version:
+            entry = self._articles[locale] = (bank.version, {})
+        return entry[1]
+
+    async def _settle(self, user_id: int, query_id: str) -> bool:
+        """
+        Ждет конца интервала между ответами пользователю.
+
+        Returns
+        -------
+        bool
+            True, если на запрос нужно ответить; False, если за время
+            ожидания пришел более новый запрос того же пользователя
+        """
+
+        if not self.debounce:
+            return True
+        now = time.monotonic()
+        delay = self._answered.get(user_id, now - self.debounce) + self.debounce - now
+        if delay > 0:
+            self._latest[user_id] = query_id
+            await asyncio.sleep(delay)
+            if self._latest.get(user_id) != query_id:
+                return False
+            del self._latest[user_id]
+            now = time.monotonic()
+
+        self._answered[user_id] = now
+        self._answered.move_to_end(user_id)
+        # Отметки, интервал которых закончился, больше не нужны; самые старые - в начале
+        # (последняя отметка - только что добавленная, поэтому цикл останавливается на ней)
+        while now - next(iter(self._answered.values())) >= self.debounce:
+            self._answered.popitem(last=False)
+        return True
+
+
+def _article(bank: QuestionBank, question_id: int) -> InlineQueryResultArticle:
+    """Результат встроенного запроса для вопроса банка."""
+
+    question = bank.questions[question_id]
+    description = next(
+        (f"{section} · {theme}" for (section, theme), (start, end) in bank.theme_ranges.items()
+         if start <= question_id < end),
+        None,
+    )
+    return InlineQueryResultArticle(
+        id=str(question_id),
+        title=question,
+        input_message_content=InputTextMessageContent(question),
+        description=description,
+    )
@@ -0,0 +1,135 @@
+"""
+Модуль похожих вопросов.
+
+Каждый вопрос представляется разреженным вектором TF-IDF по основам слов
+(нормализация - ``search.normalize``), нормированным к единичной длине;
+сходство двух вопросов - косинус, то есть скалярное произведение векторов.
+Матрица сходства X·Xᵀ вычисляется построчно через инвертированный
+индекс: для вопроса перебираются только вопросы с общими основами, а
+основы, встречающиеся больше чем в доле MAX_DF_SHARE вопросов, не
+учитываются - они почти не влияют на косинус, но дают квадратичное число
+пар. Для каждой строки сохраняются ``k`` ближайших соседей, поэтому
+построение укладывается в O(число пар с общими основами) времени и
+O(n·k) памяти и подходит для банков в десятки тысяч вопросов.
+
+Таблица соседей - плоский массив ``array('i')`` размером n·k; выбор
+похожего вопроса - одно обращение к массиву по индексу.
+
+Classes:
+    NeighbourTable: Таблица ближайших соседей вопросов одной версии банка
+
+Functions:
+    build_neighbour_table: Построение таблицы соседей по банку вопросов
+"""
+
+import heapq
+import math
+import random
+from array import array
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+from .search import normalize
+
+if TYPE_CHECKING:
+    from .questionary import QuestionBank
+
+# Основы, встречающиеся в большей доле вопросов, не участвуют в сходстве
+MAX_DF_SHARE = 0.05
+# Для малых банков основа учитывается, если встречается не более чем в стольких вопросах
+MIN_MAX_DF = 20
+
+
+class NeighbourTable(NamedTuple):
+    """
+    Неизменяемая таблица ближайших соседей вопросов одной версии банка.
+
+    Attributes
+    ----------
+    version : str
+        Версия банка, по которому построена таблица
+    k : int
+        Число соседей в строке
+    neighbours : array
+        ID соседей: строка вопроса ``i`` - элементы ``[i * k, (i + 1) * k)``
+        по убыванию сходства
+    counts : array
+        Число найденных соседей каждого вопроса (не больше ``k``)
+    """
+
+    version: str
+    k: int
+    neighbours: array
+    counts: array
+
+    def sample(self, question_id: int) -> Optional[int]:
+        """
+        Возвращает ID случайного из ближайших соседей вопроса.
+
+        Parameters
+        ----------
+        question_id : int
+            ID вопроса
+
+        Returns
+        -------
+        Optional[int]
+            ID соседа или None, если у вопроса нет общих слов с другими
+        """
+
+        count = self.counts[question_id]
+        if not count:
+            return None
+        return self.neighbours[question_id * self.k + int(random.random() * count)]
+
+
+def build_neighbour_table(bank: "QuestionBank", k: int) -> NeighbourTable:
+    """
+    Строит таблицу ``k`` ближайших соседей каждого вопроса банка.
+
+    Parameters
+    ----------
+    bank : QuestionBank
+        Банк вопросов
+    k : int
+        Число соседей вопроса
+
+    Returns
+    -------
+    NeighbourTable
+        Таблица версии ``bank.version``
+    """
+
+    documents = [tuple(dict.fromkeys(normalize(question))) for question in bank.questions]
+    total = len(documents)
+    df: Dict[str, int] = {}
+    for terms in documents:
+        for term in terms:
+            df[term] = df.get(term, 0) + 1
+    max_df = max(MIN_MAX_DF, int(total * MAX_DF_SHARE))
+
+    # Нормированные векторы вопросов и столбцы матрицы по основам
+    vectors: List[Tuple[Tuple[str, float], ...]] = []
+    postings: Dict[str, List[Tuple[int, float]]] = {}
+    for question_id, terms in enumerate(documents):
+        weights = [(term, math.log(1 + total / df[term])) for term in terms if df[term] <= max_df]
+        norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1.0
+        vector = tuple((term, weight / norm) for term, weight in weights)
+        vectors.append(vector)
+        for term, weight in vector:
+            postings.setdefault(term, []).append((question_id, weight))
+
+    neighbours = array("i", [-1]) * (total * k)
+    counts = array("H", [0]) * total
+    for question_id, vector in enumerate(vectors):
+        scores: Dict[int, float] = {}
+        for term, weight in vector:
+            for other, other_weight in postings[term]:
+                scores[other] = scores.get(other, 0.0) + weight * other_weight
+        scores.pop(question_id, None)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        offset = question_id * k
+        for position, (other, _) in enumerate(best):
+            neighbours[offset + position] = other
+        counts[question_id] = len(best)
+
+    return NeighbourTable(version=bank.version, k=k, neighbours=neighbours, counts=counts)
@@ -0,0 +1,158 @@
+"""
+Модуль локального спула событий диалога.
+
+Реализует append-only файловый спул, в который очередь отложенной записи
+сбрасывает события диалогов, пока PostgreSQL недоступен. События пишутся
+пачками с одним ``fsync`` на пачку и разбиваются на сегменты ограниченного
+размера; после восстановления БД сегменты воспроизводятся по порядку и удаляются.
+
+Classes:
+    Spool: Файловый спул событий диалога
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Событие диалога: (вид, dialog_id, состояние, время события), см. database.DialogEvent
+SpoolEvent = Tuple[int, int, str, datetime]
+
+
+class Spool:
+    """
+    Append-only файловый спул событий диалога.
+
+    Каждое событие хранится строкой JSON ``[вид, dialog_id, состояние, время]``.
+    Запись ведется в текущий сегмент ``spool-<номер>.jsonl``; при превышении
+    ``segment_bytes`` открывается следующий. Общий объем спула ограничен
+    ``max_bytes``: пачка, не помещающаяся в лимит, не записывается.
+
+    Методы выполняют блокирующий файловый ввод-вывод и предназначены для
+    вызова через ``asyncio.to_thread`` из одной задачи.
+
+    Attributes
+    ----------
+    directory : str
+        Каталог сегментов спула
+    max_bytes : int
+        Предельный суммарный размер спула
+    segment_bytes : int
+        Размер сегмента, после которого начинается новый
+    """
+
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int = 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[str] = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith("spool-") and name.endswith(".jsonl")
+        )
+        self.size = sum(os.path.getsize(self._path(name)) for name in self._segments)
+        self._next_number = int(self._segments[-1][6:-6]) + 1 if self._segments else 0
+        self._current = None
+        self._current_size = 0
+
+        if self._segments:
+            logger.info(f"Found {len(self._segments)} pending spool segment(s), {self.size} bytes")
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли в спуле невоспроизведенные события."""
+        return bool(self._segments)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def append(self, events: List[SpoolEvent]) -> bool:
+        """
+        Дописывает пачку событий в спул и выполняет ``fsync``.
+
+        Parameters
+        ----------
+        events : List[SpoolEvent]
+            События диалога в порядке поступления
+
+        Returns
+        -------
+        bool
+            False, если пачка не поместилась в предельный размер спула
+        """
+
+        data = "".join(
+            json.dumps([kind, dialog_id, state, ts.isoformat()], ensure_ascii=False) + "\n"
+            for kind, dialog_id, state, ts in events
+        ).encode("utf-8")
+        if self.size + len(data) > self.max_bytes:
+            return False
+
+        if self._current is None or self._current_size >= self.segment_bytes:
+            self._open_segment()
+        self._current.write(data)
+        self._current.flush()
+        os.fsync(self._current.fileno())
+        self._current_size += len(data)
+        self.size += len(data)
+        return True
+
+    def _open_segment(self):
+        self._close_segment()
+        name = f"spool-{self._next_number:08d}.jsonl"
+        self._next_number += 1
+        self._current = open(self._path(name), "ab")
+        self._current_size = 0
+        self._segments.append(name)
+
+    def _close_segment(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+    def segments(self) -> List[str]:
+        """
+        Закрывает текущий сегмент и возвращает все сегменты в порядке записи.
+
+        Returns
+        -------
+        List[str]
+            Имена сегментов, ожидающих воспроизведения
+        """
+
+        self._close_segment()
+        return list(self._segments)
+
+    def read(self, name: str) -> List[SpoolEvent]:
+        """
+        Читает события сегмента.
+
+        Недописанная последняя строка (обрыв записи при аварии) пропускается.
+        """
+
+        events = []
+        with open(self._path(name), "rb") as f:
+            for line in f:
+                try:
+                    kind, dialog_id, state, ts = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping corrupted record in spool segment {name}")
+                    continue
+                events.append((kind, dialog_id, state, datetime.fromisoformat(ts)))
+        return events
+
+    def remove(self, name: str) -> None:
+        """Удаляет воспроизведенный сегмент."""
+
+        path = self._path(name)
+        self.size -= os.path.getsize(path)
+        os.remove(path)
+        self._segments.remove(name)
+
+    def close(self) -> None:
+        """Закрывает текущий сегмент."""
+        self._close_segment()
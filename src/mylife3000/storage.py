@@ -0,0 +1,352 @@
+"""
+Модуль хранилищ статистики диалогов.
+
+Определяет общий интерфейс хранилища, которым пользуются обработчики,
+и реализации, не требующие PostgreSQL: in-memory для нагрузочного
+тестирования и бенчмарков и SQLite для небольших установок без контейнера
+с БД. Реализация на PostgreSQL находится в модуле ``database``.
+
+Кроме статистики диалогов хранилище ведет подписчиков рассылки "Вопрос
+дня" (только ID чатов) и прогресс рассылки каждого дня (см. модуль
+``broadcast``).
+
+Classes:
+    Storage: Абстрактный интерфейс хранилища диалогов
+    BroadcastProgress: Прогресс рассылки одного дня
+    MemoryStorage: Хранилище в памяти процесса
+    SQLiteStorage: Хранилище в файле SQLite
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Позиция рассылки до первого подписчика: ID чатов - 64-битные целые, группы отрицательные
+FIRST_POSITION = -2 ** 63
+
+
+class BroadcastProgress(NamedTuple):
+    """
+    Прогресс рассылки одного дня.
+
+    Attributes
+    ----------
+    day : date
+        День рассылки (UTC)
+    question : str
+        Текст рассылаемого вопроса; после перезапуска досылается тот же вопрос
+    position : int
+        ID чата, до которого включительно рассылка обработана (подписчики
+        обходятся по возрастанию ID)
+    sent : int
+        Доставлено сообщений
+    failed : int
+        Не доставлено сообщений
+    finished : bool
+        Рассылка завершена
+    """
+
+    day: date
+    question: str
+    position: int = FIRST_POSITION
+    sent: int = 0
+    failed: int = 0
+    finished: bool = False
+
+
+class Storage(ABC):
+    """
+    Абстрактный интерфейс хранилища статистики диалогов.
+
+    Хранилище не получает персональных данных: только ID диалога,
+    время и имя состояния, а для рассылки - ID подписанных чатов.
+    """
+
+    @abstractmethod
+    async def init_pool(self):
+        """Открывает подключение к хранилищу и проверяет его схему."""
+
+    @abstractmethod
+    async def start_dialog(self) -> int:
+        """Создает запись о начале диалога и возвращает ее ID."""
+
+    @abstractmethod
+    async def update_dialog_state(self, dialog_id: int, state: str):
+        """Записывает новое состояние диалога."""
+
+    @abstractmethod
+    async def end_dialog(self, dialog_id: int, state: str = 'completed'):
+        """Отмечает диалог как завершенный с финальным состоянием."""
+
+    async def register_states(self, names: Iterable[str]):
+        """Регистрирует известные состояния диалога; по умолчанию ничего не делает."""
+
+    async def close_abandoned(self, idle: timedelta, lookback: timedelta, limit: int) -> int:
+        """
+        Завершает состоянием ``abandoned`` до ``limit`` брошенных диалогов.
+
+        Брошенный диалог начат не раньше ``lookback`` назад, не завершен и
+        не имеет событий за последние ``idle``. По умолчанию ничего не делает.
+
+        Returns
+        -------
+        int
+            Число завершенных диалогов
+        """
+
+        return 0
+
+    @abstractmethod
+    async def subscribe(self, chat_id: int) -> bool:
+        """Подписывает чат на рассылку; False - чат уже подписан."""
+
+    @abstractmethod
+    async def unsubscribe(self, chat_id: int) -> bool:
+        """Отписывает чат от рассылки; False - чат не был подписан."""
+
+    @abstractmethod
+    async def subscribers_after(self, position: int, limit: int) -> List[int]:
+        """Возвращает до ``limit`` ID подписанных чатов больше ``position`` по возрастанию."""
+
+    @abstractmethod
+    async def load_broadcast(self, day: date) -> Optional[BroadcastProgress]:
+        """Возвращает сохраненный прогресс рассылки дня или None, если она не начиналась."""
+
+    @abstractmethod
+    async def save_broadcast(self, progress: BroadcastProgress):
+        """Сохраняет прогресс рассылки дня."""
+
+    @abstractmethod
+    async def close(self):
+        """Закрывает подключение к хранилищу, дописав накопленные данные."""
+
+
+class MemoryStorage(Storage):
+    """
+    Хранилище диалогов в памяти процесса.
+
+    Предназначено для нагрузочного тестирования обработчиков и запуска
+    без внешних зависимостей; данные теряются при остановке.
+
+    Attributes:
+        dialogs (Dict[int, List]): Диалоги {id: [время начала, время завершения, состояние]}
+        subscribers (Set[int]): ID подписанных чатов
+        broadcasts (Dict[date, BroadcastProgress]): Прогресс рассылок по дням
+    """
+
+    def __init__(self):
+        self.dialogs: Dict[int, List] = {}
+        self.subscribers: Set[int] = set()
+        self.broadcasts: Dict[date, BroadcastProgress] = {}
+        self._ids = itertools.count(1)
+
+    async def init_pool(self):
+        logger.info("In-memory storage initialized")
+
+    async def start_dialog(self) -> int:
+        dialog_id = next(self._ids)
+        self.dialogs[dialog_id] = [datetime.now(timezone.utc), None, 'started']
+        return dialog_id
+
+    async def update_dialog_state(self, dialog_id: int, state: str):
+        dialog = self.dialogs.get(dialog_id)
+        if dialog is not None:
+            dialog[2] = state
+
+    async def end_dialog(self, dialog_id: int, state: str = 'completed'):
+        dialog = self.dialogs.get(dialog_id)
+        if dialog is not None:
+            dialog[1] = datetime.now(timezone.utc)
+            dialog[2] = state
+
+    async def subscribe(self, chat_id: int) -> bool:
+        if chat_id in self.subscribers:
+            return False
+        self.subscribers.add(chat_id)
+        return True
+
+    async def unsubscribe(self, chat_id: int) -> bool:
+        if chat_id not in self.subscribers:
+            return False
+        self.subscribers.remove(chat_id)
+        return True
+
+    async def subscribers_after(self, position: int, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, (chat_id for chat_id in self.subscribers if chat_id > position))
+
+    async def load_broadcast(self, day: date) -> Optional[BroadcastProgress]:
+        return self.broadcasts.get(day)
+
+    async def save_broadcast(self, progress: BroadcastProgress):
+        self.broadcasts[progress.day] = progress
+
+    async def close(self):
+        logger.info("In-memory storage closed")
+
+
+class SQLiteStorage(Storage):
+    """
+    Хранилище диалогов в файле SQLite.
+
+    Запросы выполняются модулем ``sqlite3`` в отдельном потоке, чтобы не
+    блокировать цикл событий; единственный поток исполнителя сериализует
+    доступ к подключению. Схема повторяет журнал событий PostgreSQL:
+    строка диалога создается один раз, изменения состояния дописываются
+    в ``dialog_events``.
+
+    Attributes:
+        path (str): Путь к файлу базы данных
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS dialogs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            start_time TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS dialog_events (
+            dialog_id INTEGER NOT NULL,
+            ts TEXT NOT NULL,
+            state TEXT NOT NULL,
+            ended INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS dialog_events_dialog_id_ts_idx ON dialog_events (dialog_id, ts);
+        CREATE TABLE IF NOT EXISTS subscribers (
+            chat_id INTEGER PRIMARY KEY
+        );
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            day TEXT PRIMARY KEY,
+            question TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            sent INTEGER NOT NULL,
+            failed INTEGER NOT NULL,
+            finished INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def _run(self, func, *args):
+        """Выполняет функцию над подключением в потоке исполнителя."""
+
+        if not self._conn:
+            raise RuntimeError("SQLite storage not initialized")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def init_pool(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+        def connect():
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            return conn
+
+        self._conn = await asyncio.get_running_loop().run_in_executor(self._executor, connect)
+        logger.info(f"SQLite storage initialized at {self.path}")
+
+    async def start_dialog(self) -> int:
+        def insert() -> int:
+            now = datetime.now(timezone.utc).isoformat()
+            with self._conn:
+                cursor = self._conn.execute("INSERT INTO dialogs (start_time) VALUES (?)", (now,))
+                self._conn.execute(
+                    "INSERT INTO dialog_events (dialog_id, ts, state) VALUES (?, ?, 'started')",
+                    (cursor.lastrowid, now)
+                )
+            return cursor.lastrowid
+
+        return await self._run(insert)
+
+    def _insert_event(self, dialog_id: int, state: str, ended: bool):
+        self._conn.execute(
+            "INSERT INTO dialog_events (dialog_id, ts, state, ended) VALUES (?, ?, ?, ?)",
+            (dialog_id, datetime.now(timezone.utc).isoformat(), state, int(ended))
+        )
+
+    async def update_dialog_state(self, dialog_id: int, state: str):
+        await self._run(self._insert_event, dialog_id, state, False)
+
+    async def end_dialog(self, dialog_id: int, state: str = 'completed'):
+        await self._run(self._insert_event, dialog_id, state, True)
+
+    async def close_abandoned(self, idle: timedelta, lookback: timedelta, limit: int) -> int:
+        def close() -> int:
+            now = datetime.now(timezone.utc)
+            cutoff = (now - idle).isoformat()
+            cursor = self._conn.execute("""
+                INSERT INTO dialog_events (dialog_id, ts, state, ended)
+                SELECT d.id, ?, 'abandoned', 1
+                FROM dialogs d
+                WHERE d.start_time >= ? AND d.start_time < ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM dialog_events e
+                      WHERE e.dialog_id = d.id AND (e.ended OR e.ts >= ?)
+                  )
+                LIMIT ?
+            """, (now.isoformat(), (now - lookback).isoformat(), cutoff, cutoff, limit))
+            return cursor.rowcount
+
+        return await self._run(close)
+
+    async def subscribe(self, chat_id: int) -> bool:
+        def insert() -> bool:
+            return self._conn.execute(
+                "INSERT OR IGNORE INTO subscribers (chat_id) VALUES (?)", (chat_id,)
+            ).rowcount > 0
+
+        return await self._run(insert)
+
+    async def unsubscribe(self, chat_id: int) -> bool:
+        def delete() -> bool:
+            return self._conn.execute("DELETE FROM subscribers WHERE chat_id = ?", (chat_id,)).rowcount > 0
+
+        return await self._run(delete)
+
+    async def subscribers_after(self, position: int, limit: int) -> List[int]:
+        def select() -> List[int]:
+            rows = self._conn.execute(
+                "SELECT chat_id FROM subscribers WHERE chat_id > ? ORDER BY chat_id LIMIT ?", (position, limit)
+            )
+            return [row[0] for row in rows]
+
+        return await self._run(select)
+
+    async def load_broadcast(self, day: date) -> Optional[BroadcastProgress]:
+        def select() -> Optional[BroadcastProgress]:
+            row = self._conn.execute(
+                "SELECT question, position, sent, failed, finished FROM broadcasts WHERE day = ?",
+                (day.isoformat(),)
+            ).fetchone()
+            return BroadcastProgress(day, row[0], row[1], row[2], row[3], bool(row[4])) if row else None
+
+        return await self._run(select)
+
+    async def save_broadcast(self, progress: BroadcastProgress):
+        def upsert():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO broadcasts (day, question, position, sent, failed, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (progress.day.isoformat(), progress.question, progress.position,
+                 progress.sent, progress.failed, int(progress.finished))
+            )
+
+        await self._run(upsert)
+
+    async def close(self):
+        if self._conn:
+            await self._run(self._conn.close)
+            self._conn = None
+            self._executor.shutdown()
+            logger.info("SQLite storage closed")
@@ -0,0 +1,130 @@
+"""
+Модуль параллельной обработки обновлений Telegram.
+
+``ChatOrderedUpdateProcessor`` обрабатывает обновления разных чатов
+параллельно, а обновления одного чата - строго по очереди в порядке
+поступления, поэтому состояние ``ConversationHandler`` пользователя
+меняется так же, как при последовательной обработке. Медленный вызов
+БД в обработчике одного пользователя не задерживает остальных.
+
+Обновление сначала ждет завершения предыдущих обновлений своего чата и
+только затем занимает один из UPDATE_CONCURRENCY слотов обработки: очередь
+сообщений одного пользователя не занимает слоты, нужные другим.
+
+Classes:
+    ChatOrderedUpdateProcessor: Обработчик обновлений с порядком внутри чата
+
+Functions:
+    chat_key: Ключ очереди обновления
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from .metrics import metrics
+
+# Предел базового семафора PTB: ограничение применяется после очереди чата
+_UNBOUNDED = 2 ** 31 - 1
+
+
+def chat_key(update: object) -> Optional[int]:
+    """
+    Возвращает ключ очереди обновления: ID чата, а без чата - ID пользователя.
+
+    Parameters
+    ----------
+    update : object
+        Обновление Telegram
+
+    Returns
+    -------
+    Optional[int]
+        Ключ или None, если обновление не относится ни к чату, ни к пользователю
+    """
+
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Параллельная обработка обновлений с сохранением порядка внутри чата.
+
+    Для каждого чата с необработанными обновлениями хранится замок и
+    число ожидающих обновлений; запись удаляется, когда очередь чата
+    пустеет, поэтому память не растет с числом пользователей.
+
+    Attributes:
+        limit (int): Наибольшее число одновременно обрабатываемых обновлений
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        super().__init__(_UNBOUNDED)
+        self.limit = limit
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._chats: Dict[int, List[Any]] = {}
+        self._active = 0
+        metrics.gauge("updates_active", lambda: self._active)
+        metrics.gauge("updates_pending_chats", lambda: len(self._chats))
+
+    async def initialize(self) -> None:
+        """Создает семафор слотов в цикле событий приложения."""
+
+        self._slots = asyncio.Semaphore(self.limit)
+
+    async def shutdown(self) -> None:
+        """Ничего не освобождает: очереди чатов пустеют вместе с обработкой."""
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        """
+        Обрабатывает обновление после предыдущих обновлений того же чата.
+
+        Parameters
+        ----------
+        update : object
+            Обновление Telegram
+        coroutine : Awaitable[Any]
+            Обработка обновления приложением
+        """
+
+        arrived = time.perf_counter()
+        key = chat_key(update)
+        if key is None:
+            await self._run(coroutine, arrived)
+            return
+
+        entry = self._chats.get(key)
+        if entry is None:
+            entry = self._chats[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            # Замок asyncio выдается ожидающим по очереди, поэтому порядок обновлений сохраняется
+            async with entry[0]:
+                metrics.summary("updates_chat_wait_seconds").observe(time.perf_counter() - arrived)
+                await self._run(coroutine, arrived)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chats[key]
+
+    async def _run(self, coroutine: Awaitable[Any], arrived: float) -> None:
+        """Занимает слот обработки и выполняет обработку обновления."""
+
+        async with self._slots:
+            metrics.summary("updates_queue_wait_seconds").observe(time.perf_counter() - arrived)
+            self._active += 1
+            try:
+                await coroutine
+            finally:
+                self._active -= 1
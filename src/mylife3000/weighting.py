@@ -0,0 +1,252 @@
+"""
+Модуль весов вопросов.
+
+Вес вопроса - произведение базового веса от редакции (файл
+QUESTION_WEIGHTS_PATH) и множителя обратной связи пользователей. После
+показа вопроса нажатие "Еще вопрос" или "Похожий вопрос" считается продолжением диалога,
+"Завершить" - уходом; множитель
+
+    2 * (more + prior) / (more + finish + 2 * prior)
+
+равен 1 без сигналов и лежит в интервале (0, 2). Сглаживание ``prior``
+(QUESTION_FEEDBACK_PRIOR) не дает нескольким нажатиям резко изменить вес.
+
+По весам строятся таблицы псевдонимов (см. ``sampling.build_alias_table``)
+для диапазонов всех разделов и тем банка. Перестроение выполняется в
+фоне: сигналы копятся в счетчиках, затем перестраиваются только таблицы
+диапазонов с изменившимися вопросами, и новый снимок ``WeightSnapshot``
+подменяется в ``Questionary`` одним присваиванием. Выбор вопроса никогда
+не ждет перестроения; до первого снимка и после смены банка вопросы
+выбираются равномерно.
+
+Счетчики обратной связи хранятся в памяти процесса по тексту вопроса и
+переживают перезагрузку банка, но не перезапуск бота.
+
+Classes:
+    QuestionWeights: Веса и обратная связь для вопросов одного Questionary
+
+Functions:
+    load_weights: Чтение базовых весов из файла JSON
+    rebuild_weights_periodically: Фоновая задача перестроения таблиц весов
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+from .bankfile import bank_signature
+from .config import QUESTION_FEEDBACK_PRIOR, QUESTION_WEIGHTS_PATH
+from .metrics import metrics
+from .questionary import QuestionBank, Questionary
+from .sampling import AliasTable, WeightSnapshot, build_alias_table
+
+logger = logging.getLogger(__name__)
+
+# Индексы сигналов в счетчиках обратной связи
+SIGNALS = {'more': 0, 'finish': 1}
+
+
+def load_weights(path: str) -> Dict[str, float]:
+    """
+    Читает базовые веса вопросов из файла JSON ``{"текст вопроса": вес}``.
+
+    Вопросы, которых нет в файле, имеют вес 1; вес 0 исключает вопрос из
+    выбора по весам.
+
+    Parameters
+    ----------
+    path : str
+        Путь к файлу
+
+    Returns
+    -------
+    Dict[str, float]
+        Веса по тексту вопроса
+
+    Raises
+    ------
+    ValueError
+        Если файл не является объектом JSON с неотрицательными числами
+    OSError
+        Если файл недоступен
+    """
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object of question weights")
+    weights = {}
+    for text, weight in data.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"{path}: invalid weight {weight!r} for question {text!r}")
+        weights[text] = float(weight)
+    return weights
+
+
+class QuestionWeights:
+    """
+    Веса и обратная связь для вопросов одного экземпляра Questionary.
+
+    Все методы, кроме построения таблиц, вызываются из цикла событий;
+    таблицы строятся в отдельном потоке по копии счетчиков.
+
+    Attributes:
+        questionary (Questionary): Вопросы, для которых строятся таблицы
+        path (str): Файл базовых весов (пусто - все базовые веса равны 1)
+        prior (float): Сглаживание множителя обратной связи
+        base_weights (Mapping[str, float]): Базовые веса по тексту вопроса
+        feedback (Dict[str, Tuple[int, int]]): Счетчики (more, finish) по тексту вопроса
+    """
+
+    def __init__(self, questionary: Questionary, path: str = QUESTION_WEIGHTS_PATH,
+                 prior: float = QUESTION_FEEDBACK_PRIOR):
+        self.questionary = questionary
+        self.path = path
+        self.prior = prior
+        self.base_weights: Mapping[str, float] = MappingProxyType({})
+        self.feedback: Dict[str, Tuple[int, int]] = {}
+        self._dirty: Set[int] = set()
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._lock = asyncio.Lock()
+
+    def record(self, version: str, question_id: int, signal: str) -> None:
+        """
+        Учитывает действие пользователя после показа вопроса.
+
+        Parameters
+        ----------
+        version : str
+            Версия банка, из которого был показан вопрос
+        question_id : int
+            ID показанного вопроса
+        signal : str
+            ``'more'`` или ``'finish'``
+        """
+
+        bank = self.questionary.bank
+        if version != bank.version:
+            # Вопрос показан из прежнего банка, его ID больше ничего не значит
+            return
+        text = bank.questions[question_id]
+        counts = list(self.feedback.get(text, (0, 0)))
+        counts[SIGNALS[signal]] += 1
+        # Кортеж заменяется целиком, чтобы копия словаря была согласованной
+        self.feedback[text] = tuple(counts)
+        self._dirty.add(question_id)
+        metrics.counter(f"question_weights_{signal}").inc()
+
+    def weight(self, text: str, feedback: Optional[Mapping[str, Tuple[int, int]]] = None) -> float:
+        """
+        Возвращает вес вопроса: базовый вес, умноженный на множитель обратной связи.
+
+        Parameters
+        ----------
+        text : str
+            Текст вопроса
+        feedback : Optional[Mapping[str, Tuple[int, int]]], optional
+            Счетчики обратной связи, по умолчанию текущие
+
+        Returns
+        -------
+        float
+            Вес вопроса
+        """
+
+        more, finish = (self.feedback if feedback is None else feedback).get(text, (0, 0))
+        base = self.base_weights.get(text, 1.0)
+        if not more and not finish:
+            return base
+        return base * 2 * (more + self.prior) / (more + finish + 2 * self.prior)
+
+    def _build(self, bank: QuestionBank, ranges: Iterable[Tuple[int, int]],
+               feedback: Mapping[str, Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[AliasTable]]:
+        """Строит таблицы псевдонимов диапазонов; выполняется в отдельном потоке."""
+
+        questions = bank.questions
+        return {
+            (start, end): build_alias_table([self.weight(questions[i], feedback) for i in range(start, end)])
+            for start, end in ranges
+        }
+
+    async def rebuild(self) -> bool:
+        """
+        Перестраивает таблицы весов и подменяет снимок в Questionary.
+
+        Если сменились банк вопросов или файл базовых весов, перестраиваются
+        все таблицы, иначе - только таблицы диапазонов с новыми сигналами.
+
+        Returns
+        -------
+        bool
+            True если снимок был заменен
+        """
+
+        async with self._lock:
+            started = time.perf_counter()
+            full = False
+            signature = bank_signature(self.path) if self.path else None
+            if signature != self._signature:
+                try:
+                    weights = await asyncio.to_thread(load_weights, self.path) if self.path else {}
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to load question weights: {e}")
+                else:
+                    self.base_weights = MappingProxyType(weights)
+                    full = True
+                # Ошибочный файл не перечитывается, пока его не заменят
+                self._signature = signature
+
+            bank = self.questionary.bank
+            snapshot = self.questionary.weights
+            ranges = list(bank.section_ranges.values()) + list(bank.theme_ranges.values())
+            if full or snapshot is None or snapshot.version != bank.version:
+                self._dirty.clear()
+                previous = {}
+            elif self._dirty:
+                dirty = sorted(self._dirty)
+                self._dirty.clear()
+                # Диапазон затронут, если в [start, end) есть измененный вопрос
+                ranges = [r for r in ranges if bisect.bisect_left(dirty, r[0]) < bisect.bisect_left(dirty, r[1])]
+                previous = snapshot.tables
+            else:
+                return False
+
+            tables = await asyncio.to_thread(self._build, bank, ranges, dict(self.feedback))
+            if self.questionary.bank is not bank:
+                # Банк подменили во время построения; следующий вызов перестроит все
+                return False
+            merged = dict(previous)
+            for bounds, table in tables.items():
+                if table is None:
+                    merged.pop(bounds, None)
+                else:
+                    merged[bounds] = table
+            self.questionary.weights = WeightSnapshot(bank.version, MappingProxyType(merged))
+            metrics.summary("question_weights_rebuild_seconds").observe(time.perf_counter() - started)
+            logger.debug(f"Rebuilt {len(tables)} question weight tables for bank {bank.version}")
+            return True
+
+
+async def rebuild_weights_periodically(registry: Mapping[str, QuestionWeights], interval: float) -> None:
+    """
+    Фоновая задача перестроения таблиц весов всех зарегистрированных банков.
+
+    Parameters
+    ----------
+    registry : Mapping[str, QuestionWeights]
+        Веса по коду локали; пополняется обработчиками
+    interval : float
+        Интервал между перестроениями, секунды
+    """
+
+    while True:
+        await asyncio.sleep(interval)
+        for weights in list(registry.values()):
+            try:
+                await weights.rebuild()
+            except Exception as e:
+                logger.error(f"Failed to rebuild question weights: {e}")